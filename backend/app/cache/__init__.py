@@ -0,0 +1,243 @@
+"""Pluggable result cache shared by the search and AI services.
+
+``get_cache()`` returns the backend selected by ``CACHE_BACKEND``:
+
+* ``memory`` — per-process LRU (default)
+* ``sqlite`` — file at ``CACHE_URL`` shared by all workers on the host
+* ``redis``  — any Redis-protocol server at ``CACHE_URL``
+* ``none``   — caching disabled
+
+Services opt in by decorating their public coroutines with :func:`cached`,
+so callers keep calling them exactly as before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import struct
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+from app.cache.base import CacheBackend
+from app.cache.codec import Codec, CodecError
+from app.cache.memory import MemoryCache
+from app.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_cache: CacheBackend | None = None
+_cache_initialized = False
+
+
+def create_cache(settings: Settings) -> CacheBackend | None:
+    backend = settings.cache_backend.lower()
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return MemoryCache(settings.cache_max_bytes, settings.cache_max_item_bytes)
+    if backend == "sqlite":
+        from app.cache.sqlite import SQLiteCache
+
+        return SQLiteCache(
+            settings.cache_url or "researchhub-cache.sqlite3",
+            settings.cache_max_bytes,
+            settings.cache_max_item_bytes,
+        )
+    if backend == "redis":
+        from app.cache.redis import RedisCache
+
+        return RedisCache(
+            settings.cache_url or "redis://localhost:6379/0",
+            max_item_bytes=settings.cache_max_item_bytes,
+        )
+    raise ValueError(f"Unknown cache backend: {settings.cache_backend}")
+
+
+def get_cache() -> CacheBackend | None:
+    global _cache, _cache_initialized
+    if not _cache_initialized:
+        _cache = create_cache(get_settings())
+        _cache_initialized = True
+    return _cache
+
+
+def set_cache(cache: CacheBackend | None) -> None:
+    """Replace the process-wide cache (used by tests and tooling)."""
+    global _cache, _cache_initialized
+    _cache = cache
+    _cache_initialized = True
+
+
+def make_key(namespace: str, arguments: dict[str, Any]) -> str:
+    blob = json.dumps(arguments, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{namespace}:{hashlib.sha256(blob.encode()).hexdigest()[:32]}"
+
+
+_STAMPED = b"t"  # entry prefix: tag + float64 wall-clock time it was stored
+_STAMP = struct.Struct(">d")
+
+_background: set[asyncio.Task] = set()
+
+
+def _stamp(data: bytes) -> bytes:
+    return _STAMPED + _STAMP.pack(time.time()) + data
+
+
+def _unstamp(data: bytes) -> tuple[bytes, float]:
+    """Split a stamped entry into ``(payload, age in seconds)``."""
+    if data[:1] != _STAMPED or len(data) < 1 + _STAMP.size:
+        raise CodecError("Entry is not stamped")
+    (stored_at,) = _STAMP.unpack_from(data, 1)
+    return data[1 + _STAMP.size:], max(0.0, time.time() - stored_at)
+
+
+def cached(
+    namespace: str,
+    codec: Codec[T],
+    ttl: Callable[[], float],
+    should_cache: Callable[[T], bool] = lambda value: True,
+    stale_while_revalidate: Callable[[], float] | None = None,
+    stale_if_error: Callable[[], float] | None = None,
+    is_error: Callable[[T], bool] = lambda value: False,
+    mark_stale: Callable[[T], T] = lambda value: value,
+    key_arguments: Callable[[dict[str, Any]], dict[str, Any]] = lambda arguments: arguments,
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """Cache the result of an ``async def`` keyed by its bound arguments.
+
+    Cache failures are logged and treated as misses — a broken cache must
+    never fail the request it was meant to speed up. ``wrapper.refresh``
+    recomputes an entry unconditionally (used by cache warming).
+    ``key_arguments`` maps the bound arguments to the ones the key is built
+    from, so equivalent calls can share an entry while ``fn`` still gets
+    the arguments as passed.
+
+    With the stale windows set, entries are kept past ``ttl`` (as in
+    RFC 5861): for ``stale_while_revalidate`` seconds an expired entry is
+    returned at once while one background call per process refreshes it,
+    and for ``stale_if_error`` seconds it is returned, passed through
+    ``mark_stale``, when a fresh call raises or its result ``is_error``.
+    """
+
+    def decorator(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(fn)
+        stamped = stale_while_revalidate is not None or stale_if_error is not None
+        refreshing: set[str] = set()
+
+        def key_for(*args: Any, **kwargs: Any) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return make_key(namespace, key_arguments(dict(bound.arguments)))
+
+        def window(extra: Callable[[], float] | None) -> float:
+            return extra() if extra is not None else 0.0
+
+        async def lookup(cache: CacheBackend, key: str) -> tuple[T, float] | None:
+            """Return ``(value, age)`` for a decodable entry, else ``None``."""
+            try:
+                data = await cache.get(key)
+                if data is None:
+                    return None
+                age = 0.0
+                if stamped:
+                    data, age = _unstamp(data)
+                return codec.loads(data), age
+            except CodecError:
+                logger.info("Discarding undecodable cache entry %s", key)
+            except Exception as exc:
+                logger.warning("Cache read failed for %s: %s", key, exc)
+            return None
+
+        @functools.wraps(fn)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            cache = get_cache()
+            if cache is None:
+                return await fn(*args, **kwargs)
+
+            key = key_for(*args, **kwargs)
+            stale: T | None = None
+            entry = await lookup(cache, key)
+            if entry is not None:
+                value, age = entry
+                fresh_for = ttl()
+                if age < fresh_for:
+                    return value
+                if age < fresh_for + window(stale_while_revalidate):
+                    revalidate(cache, key, args, kwargs)
+                    return value
+                if age < fresh_for + window(stale_if_error):
+                    stale = value
+
+            try:
+                value = await fn(*args, **kwargs)
+            except Exception as exc:
+                if stale is None:
+                    raise
+                logger.warning("Serving stale %s after error: %s", key, exc)
+                return mark_stale(stale)
+            if stale is not None and is_error(value):
+                logger.warning("Serving stale %s after a failed refresh", key)
+                return mark_stale(stale)
+            return await store(cache, key, value)
+
+        async def store(cache: CacheBackend, key: str, value: T) -> T:
+            if should_cache(value):
+                try:
+                    data = codec.dumps(value)
+                    lifetime = ttl()
+                    if stamped:
+                        data = _stamp(data)
+                        lifetime += max(window(stale_while_revalidate), window(stale_if_error))
+                    await cache.set(key, data, lifetime)
+                except Exception as exc:
+                    logger.warning("Cache write failed for %s: %s", key, exc)
+            return value
+
+        def revalidate(cache: CacheBackend, key: str, args: tuple, kwargs: dict) -> None:
+            """Refresh ``key`` in the background, once at a time per process."""
+            if key in refreshing:
+                return
+            refreshing.add(key)
+
+            async def run() -> None:
+                try:
+                    await store(cache, key, await fn(*args, **kwargs))
+                except Exception as exc:
+                    logger.warning("Background refresh of %s failed: %s", key, exc)
+                finally:
+                    refreshing.discard(key)
+
+            task = asyncio.create_task(run())
+            _background.add(task)
+            task.add_done_callback(_background.discard)
+
+        async def refresh(*args: Any, **kwargs: Any) -> T:
+            """Recompute and re-store the entry, ignoring what is cached."""
+            cache = get_cache()
+            value = await fn(*args, **kwargs)
+            if cache is None:
+                return value
+            return await store(cache, key_for(*args, **kwargs), value)
+
+        wrapper.cache_key = key_for  # type: ignore[attr-defined]
+        wrapper.refresh = refresh  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
+__all__ = [
+    "CacheBackend",
+    "MemoryCache",
+    "cached",
+    "create_cache",
+    "get_cache",
+    "make_key",
+    "set_cache",
+]
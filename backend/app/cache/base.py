@@ -0,0 +1,38 @@
+"""Cache backend interface."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+
+class CacheBackend(ABC):
+    """Async byte-oriented key/value store with per-entry TTLs.
+
+    Backends only deal in ``bytes``; turning models into bytes is the job of
+    the codecs in :mod:`app.cache.codec`.
+    """
+
+    def __init__(self, max_item_bytes: int = 1024 * 1024) -> None:
+        self.max_item_bytes = max_item_bytes
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        """Return the stored value, or ``None`` if missing or expired."""
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        """Store *value* for *ttl* seconds."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Remove *key* if present."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Remove every entry owned by this cache."""
+
+    async def close(self) -> None:
+        """Release connections or file handles."""
+
+    def accepts(self, value: bytes) -> bool:
+        return len(value) <= self.max_item_bytes
@@ -0,0 +1,177 @@
+"""Compact binary codecs for cached values.
+
+Models are flattened to positional rows (no repeated field names), encoded
+as JSON and zlib-compressed when that pays off. Each payload carries a
+fingerprint of the model's field layout, so entries written by an older
+deploy with a different schema decode as a miss instead of garbage.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import typing
+import zlib
+from functools import lru_cache
+from typing import Any, Generic, Protocol, TypeVar
+
+from pydantic import BaseModel
+
+from app.models.paper import GeneratedText, Paper, PaperFacets, PaperSearchResult
+
+T = TypeVar("T")
+M = TypeVar("M", bound=BaseModel)
+
+_RAW = b"r"
+_ZLIB = b"z"
+_COMPRESS_ABOVE = 512
+
+
+class CodecError(ValueError):
+    """Payload cannot be decoded with this codec."""
+
+
+class Codec(Protocol[T]):
+    def dumps(self, value: T) -> bytes: ...
+
+    def loads(self, data: bytes) -> T: ...
+
+
+def _pack(raw: bytes) -> bytes:
+    if len(raw) > _COMPRESS_ABOVE:
+        return _ZLIB + zlib.compress(raw, 6)
+    return _RAW + raw
+
+
+def _unpack(data: bytes) -> bytes:
+    tag, body = data[:1], data[1:]
+    if tag == _RAW:
+        return body
+    if tag == _ZLIB:
+        try:
+            return zlib.decompress(body)
+        except zlib.error as exc:
+            raise CodecError(str(exc)) from exc
+    raise CodecError(f"Unknown payload tag {tag!r}")
+
+
+def _dump_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _load_json(data: bytes) -> Any:
+    try:
+        return json.loads(_unpack(data))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise CodecError(str(exc)) from exc
+
+
+def _nested_model(annotation: Any) -> tuple[type[BaseModel] | None, bool]:
+    """Return ``(model, is_list)`` for ``Model`` / ``list[Model]`` fields."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, False
+    if typing.get_origin(annotation) is list:
+        (arg,) = typing.get_args(annotation) or (None,)
+        if isinstance(arg, type) and issubclass(arg, BaseModel):
+            return arg, True
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def _layout(model: type[BaseModel]) -> tuple[tuple[str, type[BaseModel] | None, bool], ...]:
+    return tuple(
+        (name, *_nested_model(field.annotation))
+        for name, field in model.model_fields.items()
+    )
+
+
+def _schema_fingerprint(model: type[BaseModel]) -> str:
+    parts: list[str] = []
+    for name, nested, is_list in _layout(model):
+        parts.append(name)
+        if nested is not None:
+            parts.append(("[" if is_list else "{") + _schema_fingerprint(nested))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:8]
+
+
+def _to_row(value: BaseModel) -> list[Any]:
+    row: list[Any] = []
+    for name, nested, is_list in _layout(type(value)):
+        item = getattr(value, name)
+        if nested is not None and item is not None:
+            item = [_to_row(v) for v in item] if is_list else _to_row(item)
+        row.append(item)
+    return row
+
+
+def _from_row(model: type[M], row: list[Any]) -> M:
+    layout = _layout(model)
+    if len(row) != len(layout):
+        raise CodecError(f"{model.__name__} row has {len(row)} fields, expected {len(layout)}")
+    values: dict[str, Any] = {}
+    for (name, nested, is_list), item in zip(layout, row):
+        if nested is not None and item is not None:
+            item = [_from_row(nested, v) for v in item] if is_list else _from_row(nested, item)
+        values[name] = item
+    return model.model_construct(**values)
+
+
+class ModelCodec(Generic[M]):
+    """Positional-row codec for a single pydantic model."""
+
+    def __init__(self, model: type[M]) -> None:
+        self.model = model
+        self.fingerprint = _schema_fingerprint(model)
+
+    def dumps(self, value: M) -> bytes:
+        return _pack(_dump_json([self.fingerprint, _to_row(value)]))
+
+    def loads(self, data: bytes) -> M:
+        fingerprint, row = _load_json(data)
+        if fingerprint != self.fingerprint:
+            raise CodecError("Schema fingerprint mismatch")
+        return _from_row(self.model, row)
+
+
+class ModelListCodec(Generic[M]):
+    """Positional-row codec for a list of pydantic models."""
+
+    def __init__(self, model: type[M]) -> None:
+        self.model = model
+        self.fingerprint = _schema_fingerprint(model)
+
+    def dumps(self, value: list[M]) -> bytes:
+        return _pack(_dump_json([self.fingerprint, [_to_row(v) for v in value]]))
+
+    def loads(self, data: bytes) -> list[M]:
+        fingerprint, rows = _load_json(data)
+        if fingerprint != self.fingerprint:
+            raise CodecError("Schema fingerprint mismatch")
+        return [_from_row(self.model, row) for row in rows]
+
+
+class TextCodec:
+    def dumps(self, value: str) -> bytes:
+        return _pack(value.encode())
+
+    def loads(self, data: bytes) -> str:
+        try:
+            return _unpack(data).decode()
+        except UnicodeDecodeError as exc:
+            raise CodecError(str(exc)) from exc
+
+
+class JsonCodec:
+    def dumps(self, value: Any) -> bytes:
+        return _pack(_dump_json(value))
+
+    def loads(self, data: bytes) -> Any:
+        return _load_json(data)
+
+
+PAPER_LIST_CODEC: ModelListCodec[Paper] = ModelListCodec(Paper)
+SEARCH_RESULT_CODEC: ModelCodec[PaperSearchResult] = ModelCodec(PaperSearchResult)
+FACETS_CODEC: ModelCodec[PaperFacets] = ModelCodec(PaperFacets)
+GENERATED_TEXT_CODEC: ModelCodec[GeneratedText] = ModelCodec(GeneratedText)
+TEXT_CODEC = TextCodec()
+JSON_CODEC = JsonCodec()
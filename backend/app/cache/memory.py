@@ -0,0 +1,51 @@
+"""In-process LRU cache backend."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+
+from app.cache.base import CacheBackend
+
+
+class MemoryCache(CacheBackend):
+    """LRU bounded by the total size of the stored values."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, max_item_bytes: int = 1024 * 1024) -> None:
+        super().__init__(max_item_bytes)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, tuple[bytes, float]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if not self.accepts(value) or ttl <= 0:
+            return
+        self._remove(key)
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self.size += len(value)
+        while self.size > self.max_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    async def delete(self, key: str) -> None:
+        self._remove(key)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
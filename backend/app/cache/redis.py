@@ -0,0 +1,142 @@
+"""Redis-protocol cache backend.
+
+Speaks RESP2 directly over asyncio streams so it works against Redis,
+Valkey, KeyDB or any stand-in server without an extra client dependency.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from urllib.parse import unquote, urlparse
+
+from app.cache.base import CacheBackend
+
+
+class RedisError(Exception):
+    """Error reply from the server or a protocol violation."""
+
+
+class RedisCache(CacheBackend):
+    """Cache stored in Redis under a key prefix.
+
+    The total size is bounded by the server's own ``maxmemory`` policy; this
+    class only enforces the per-item limit.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "researchhub:",
+        max_item_bytes: int = 1024 * 1024,
+        timeout: float = 2.0,
+    ) -> None:
+        super().__init__(max_item_bytes)
+        parsed = urlparse(url)
+        if parsed.scheme not in ("redis", ""):
+            raise ValueError(f"Unsupported cache URL scheme: {parsed.scheme}")
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self.timeout = timeout
+        self._reader: asyncio.StreamReader | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._command(b"GET", self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if not self.accepts(value) or ttl <= 0:
+            return
+        await self._command(b"SET", self.prefix + key, value, b"PX", str(int(ttl * 1000)))
+
+    async def delete(self, key: str) -> None:
+        await self._command(b"DEL", self.prefix + key)
+
+    async def clear(self) -> None:
+        cursor = b"0"
+        while True:
+            cursor, keys = await self._command(b"SCAN", cursor, b"MATCH", self.prefix + "*", b"COUNT", b"500")
+            if keys:
+                await self._command(b"DEL", *keys)
+            if cursor == b"0":
+                break
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._disconnect()
+
+    # ── Protocol ─────────────────────────────────────────────
+
+    async def _command(self, *parts: bytes | str):
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    await self._connect()
+                return await asyncio.wait_for(self._roundtrip(parts), self.timeout)
+            except RedisError:
+                raise
+            except BaseException:
+                # A half-read reply leaves the stream out of sync — drop the
+                # connection so the next call reconnects cleanly.
+                self._disconnect()
+                raise
+
+    async def _connect(self) -> None:
+        self._reader, self._writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port), self.timeout
+        )
+        try:
+            if self.password:
+                await asyncio.wait_for(self._roundtrip((b"AUTH", self.password)), self.timeout)
+            if self.db:
+                await asyncio.wait_for(self._roundtrip((b"SELECT", str(self.db))), self.timeout)
+        except BaseException:
+            # A connection that failed AUTH or SELECT must not be reused: it
+            # would run later commands unauthenticated or against DB 0
+            self._disconnect()
+            raise
+
+    def _disconnect(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    async def _roundtrip(self, parts):
+        assert self._writer is not None
+        self._writer.write(_encode_command(parts))
+        await self._writer.drain()
+        return await _read_reply(self._reader)
+
+
+def _encode_command(parts) -> bytes:
+    out = [b"*%d\r\n" % len(parts)]
+    for part in parts:
+        data = part.encode() if isinstance(part, str) else part
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+async def _read_reply(reader: asyncio.StreamReader):
+    line = await reader.readuntil(b"\r\n")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body
+    if kind == b"-":
+        raise RedisError(body.decode(errors="replace"))
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        count = int(body)
+        if count < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(count)]
+    raise RedisError(f"Unexpected reply type {kind!r}")
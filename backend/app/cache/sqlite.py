@@ -0,0 +1,157 @@
+"""On-disk SQLite cache backend shared by workers on the same host."""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import threading
+import time
+
+from app.cache.base import CacheBackend
+
+# cache_size holds the running SUM(size), kept by triggers so every worker
+# sharing the file sees the same total without scanning the table.
+_SCHEMA = """
+BEGIN IMMEDIATE;
+CREATE TABLE IF NOT EXISTS cache (
+  key         TEXT PRIMARY KEY,
+  value       BLOB NOT NULL,
+  size        INTEGER NOT NULL,
+  expires_at  REAL NOT NULL,
+  accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache(accessed_at);
+CREATE INDEX IF NOT EXISTS idx_cache_expires_at ON cache(expires_at);
+CREATE TABLE IF NOT EXISTS cache_size (
+  id    INTEGER PRIMARY KEY CHECK (id = 0),
+  bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_size VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM cache));
+CREATE TRIGGER IF NOT EXISTS cache_size_insert AFTER INSERT ON cache BEGIN
+  UPDATE cache_size SET bytes = bytes + NEW.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_size_update AFTER UPDATE OF size ON cache BEGIN
+  UPDATE cache_size SET bytes = bytes + NEW.size - OLD.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_size_delete AFTER DELETE ON cache BEGIN
+  UPDATE cache_size SET bytes = bytes - OLD.size;
+END;
+COMMIT;
+"""
+
+_TOUCH_BATCH = 256  # reads whose access times are buffered before a write
+
+
+class SQLiteCache(CacheBackend):
+    """Cache stored in a WAL-mode SQLite file with a memory-mapped read path.
+
+    Every uvicorn worker opens the same file, so a result computed by one
+    worker is served by the others. Queries run in a worker thread to keep
+    disk I/O off the event loop. Reads only read: their access times are
+    buffered and written with the next ``set`` (or every ``_TOUCH_BATCH``
+    reads), so LRU order lags slightly behind actual use.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_item_bytes: int = 1024 * 1024,
+    ) -> None:
+        super().__init__(max_item_bytes)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._touched: dict[str, float] = {}
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={max(max_bytes, 0)}")
+        self._conn.executescript(_SCHEMA)
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        if not self.accepts(value) or ttl <= 0:
+            return
+        await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache WHERE key = ?", (key,))
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM cache", ())
+
+    async def close(self) -> None:
+        with self._lock:
+            self._flush_touched()
+            self._conn.close()
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def _get(self, key: str) -> bytes | None:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None  # expired rows are swept by the next set
+            self._touched[key] = now
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touched()
+        return bytes(row[0])
+
+    def _set(self, key: str, value: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # An upsert, not INSERT OR REPLACE: REPLACE's implicit delete
+                # does not fire the size trigger
+                self._conn.execute(
+                    "INSERT INTO cache (key, value, size, expires_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                    "value = excluded.value, size = excluded.size, "
+                    "expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+                    (key, value, len(value), now + ttl, now),
+                )
+                self._touched.pop(key, None)
+                self._flush_touched()
+                self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+                self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _flush_touched(self) -> None:
+        if not self._touched:
+            return
+        own_transaction = not self._conn.in_transaction
+        if own_transaction:
+            self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.executemany(
+            "UPDATE cache SET accessed_at = ? WHERE key = ?",
+            [(at, key) for key, at in self._touched.items()],
+        )
+        self._touched.clear()
+        if own_transaction:
+            self._conn.execute("COMMIT")
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT bytes FROM cache_size").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims: list[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM cache ORDER BY accessed_at"):
+            victims.append(key)
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM cache WHERE key = ?", [(k,) for k in victims])
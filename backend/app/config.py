@@ -7,7 +7,116 @@ class Settings(BaseSettings):
     supabase_url: str = ""
     supabase_anon_key: str = ""
     supabase_jwt_secret: str = ""
+    supabase_service_role_key: str = ""  # background jobs only; never sent to clients
     allowed_origins: str = "http://localhost:3000,http://localhost:8080,http://localhost:5000"
+    auth_token_cache_size: int = 1024  # verified JWTs kept in memory; 0 disables
+
+    # Upstream APIs. Overridden by the load-test harness to point at local
+    # stand-ins; gemini_api_endpoint is a host:port gRPC endpoint.
+    arxiv_api_url: str = "https://export.arxiv.org/api/query"
+    openalex_api_url: str = "https://api.openalex.org"
+    semantic_scholar_api_url: str = "https://api.semanticscholar.org/graph/v1"
+    gemini_api_endpoint: str = ""
+
+    # Result cache shared by search and AI services: memory | sqlite | redis | none
+    cache_backend: str = "memory"
+    cache_url: str = ""  # SQLite file path or redis://host:port/db
+    cache_max_bytes: int = 64 * 1024 * 1024
+    cache_max_item_bytes: int = 1024 * 1024
+    search_cache_ttl: int = 300
+    # Past its TTL a search is served at once while it refreshes in the
+    # background, and served marked stale when every source fails
+    search_stale_while_revalidate: int = 300
+    search_stale_if_error: int = 24 * 3600
+    ai_cache_ttl: int = 7 * 24 * 3600
+    facets_cache_ttl: int = 3600  # year/source/open-access counts per query
+
+    # Source fan-out when no source filter is given: "all" queries every
+    # source at once; "adaptive" starts with the fastest high-yield sources
+    # and calls the rest only when the page isn't full after dedup
+    search_routing: str = "all"
+
+    # POST /api/papers/search/multi: distinct searches run at once per request
+    multi_search_concurrency: int = 4
+
+    # Where large upstream payloads are parsed: thread | process | none
+    # (inline). Smaller payloads are always parsed inline on the event loop.
+    offload_executor: str = "thread"
+    offload_workers: int = 0  # 0 = one per CPU
+    offload_min_bytes: int = 32 * 1024
+
+    # Cache warming (opt-in): popular searches/summaries are recorded per
+    # worker and merged into WARMUP_STATE_PATH; the top N are re-executed at
+    # startup and, if requested since the last cycle, before their TTLs
+    # expire. With a cache shared by several workers, set
+    # WARMUP_EXECUTE=false on all but one so each entry is warmed once.
+    warmup_top_n: int = 0  # 0 disables
+    warmup_rate: float = 2.0  # warm-up calls per second
+    warmup_state_path: str = "data/warmup_state.json"  # holds user queries; owner-only
+    warmup_execute: bool = True
+
+    # HTTP response caching / compression
+    search_client_max_age: int = 60  # Cache-Control max-age for search pages
+    gzip_minimum_size: int = 1024  # responses smaller than this are sent as-is
+
+    # is_favorite flags on search results: each user's favorited IDs are
+    # reused this many seconds before an incremental refresh from Supabase
+    favorites_index_refresh: float = 2.0
+
+    # Background PDF analysis (POST /api/ai/analyze-pdf/jobs)
+    ai_job_concurrency: int = 2  # analyses run at once per worker
+    ai_job_queue_size: int = 100
+    ai_job_ttl: int = 3600  # finished jobs are kept this long
+
+    # Collection synthesis (POST /api/ai/synthesize): per-paper summaries are
+    # merged level by level, at most FANOUT notes / MAX_CHARS characters per
+    # prompt, until one synthesis remains
+    ai_synthesis_concurrency: int = 4  # Gemini calls at once per request
+    ai_synthesis_fanout: int = 8
+    ai_synthesis_max_chars: int = 24_000
+
+    # Questions about a PDF (POST /api/ai/ask-pdf): the PDF is transcribed
+    # once and split into overlapping word windows; each question sends only
+    # the PDF_TOP_K chunks that match it best (BM25)
+    pdf_chunk_words: int = 200
+    pdf_chunk_overlap: int = 40
+    pdf_top_k: int = 6
+
+    # Citation graph expansion: concurrent upstream requests per source
+    graph_openalex_concurrency: int = 4
+    graph_s2_concurrency: int = 2
+    graph_cache_ttl: int = 24 * 3600
+
+    # Saved-search alerts. The background poller runs only when the interval
+    # is > 0 and SUPABASE_SERVICE_ROLE_KEY is set.
+    alerts_poll_interval: int = 0
+    alerts_min_poll_age: int = 6 * 3600  # don't re-poll a search more often than this
+    alerts_max_new_per_poll: int = 200
+
+    # "More like this" vector index; off by default. Only the first worker to
+    # open a directory uses it (the others run without the index)
+    similarity_index_dir: str = ""
+    similarity_dim: int = 256
+
+    # Event-loop watchdog: exports loop-lag percentiles at /metrics and logs
+    # the loop thread's stack (with route and request ID) whenever a callback
+    # blocks the loop for longer than the threshold
+    loop_watchdog: bool = False
+    loop_block_threshold_ms: float = 100.0
+
+    # Gemini model tiers: prompts up to AI_LIGHT_MAX_CHARS (abstract summaries)
+    # go to the light model, larger ones and PDFs to the strong model. A call
+    # that errors or takes longer than AI_MODEL_TIMEOUT is retried on the
+    # other tier, then on AI_MODEL_FALLBACKS (comma-separated) in order.
+    ai_model_light: str = "gemini-2.5-flash-lite"
+    ai_model_strong: str = "gemini-2.5-flash"
+    ai_model_fallbacks: str = ""
+    ai_light_max_chars: int = 8000
+    ai_model_timeout: float = 90.0
+
+    # Import the Gemini SDK in the background at startup instead of on the
+    # first /api/ai request
+    ai_warmup_on_startup: bool = False
 
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
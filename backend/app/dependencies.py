@@ -2,7 +2,13 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, NamedTuple
 
 import jwt
 from jwt import PyJWKClient
@@ -12,17 +18,108 @@ from app.config import Settings, get_settings
 
 logger = logging.getLogger(__name__)
 
+
+class _VerifiedTokenCache:
+    """Bounded LRU mapping a token digest to its already-verified claims.
+
+    Entries expire at the token's ``exp`` claim and are tagged with the id of
+    the key that verified them, so a secret change or JWKS rotation makes the
+    old entries unreachable.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[dict[str, Any], float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, digest: str, key_id: str) -> dict[str, Any] | None:
+        entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        claims, expires_at, entry_key_id = entry
+        if entry_key_id != key_id or expires_at <= time.time():
+            del self._entries[digest]
+            return None
+        self._entries.move_to_end(digest)
+        return claims
+
+    def put(self, digest: str, claims: dict[str, Any], key_id: str) -> None:
+        exp = claims.get("exp")
+        # Tokens without an expiry are never cached — there is nothing to
+        # bound how long a revoked token would keep being accepted.
+        if self.maxsize <= 0 or not isinstance(exp, (int, float)):
+            return
+        self._entries[digest] = (claims, float(exp), key_id)
+        self._entries.move_to_end(digest)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def discard_keys(self, key_ids: set[str]) -> None:
+        """Drop every entry verified by one of *key_ids*."""
+        if not key_ids:
+            return
+        stale = [d for d, (_, _, k) in self._entries.items() if k in key_ids]
+        for digest in stale:
+            del self._entries[digest]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class _RotationAwareJWKClient(PyJWKClient):
+    """``PyJWKClient`` that evicts cached tokens when the JWK set rotates."""
+
+    def __init__(self, uri: str, **kwargs: Any) -> None:
+        super().__init__(uri, **kwargs)
+        self._key_fingerprints: dict[str, str] = {}
+
+    def fetch_data(self) -> Any:
+        jwk_set = super().fetch_data()
+        fingerprints = {
+            f"jwks:{key.get('kid', '')}": hashlib.sha256(
+                json.dumps(key, sort_keys=True).encode()
+            ).hexdigest()
+            for key in jwk_set.get("keys", [])
+            if isinstance(key, dict)
+        }
+        rotated = {
+            key_id
+            for key_id, fp in self._key_fingerprints.items()
+            if fingerprints.get(key_id) != fp
+        }
+        if rotated and _token_cache is not None:
+            logger.info("JWKS rotated, dropping cached tokens for %s", sorted(rotated))
+            _token_cache.discard_keys(rotated)
+        self._key_fingerprints = fingerprints
+        return jwk_set
+
+
 _jwks_client: PyJWKClient | None = None
+_token_cache: _VerifiedTokenCache | None = None
 
 
 def _get_jwks_client(supabase_url: str) -> PyJWKClient:
     global _jwks_client
     if _jwks_client is None:
         jwks_url = f"{supabase_url}/auth/v1/.well-known/jwks.json"
-        _jwks_client = PyJWKClient(jwks_url, cache_keys=True)
+        _jwks_client = _RotationAwareJWKClient(jwks_url, cache_keys=True)
     return _jwks_client
 
 
+def _get_token_cache(maxsize: int) -> _VerifiedTokenCache:
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = _VerifiedTokenCache(maxsize)
+    return _token_cache
+
+
+@lru_cache(maxsize=4)
+def _secret_key_id(secret: str) -> str:
+    return "hs:" + hashlib.sha256(secret.encode()).hexdigest()[:16]
+
+
 async def require_auth(
     request: Request,
     settings: Settings = Depends(get_settings),
@@ -34,6 +131,7 @@ async def require_auth(
         raise HTTPException(status_code=401, detail="Missing authorization token")
 
     token = auth_header[len("Bearer "):]
+    cache = _get_token_cache(settings.auth_token_cache_size)
 
     try:
         header = jwt.get_unverified_header(token)
@@ -43,22 +141,32 @@ async def require_auth(
             # Symmetric — use JWT secret
             if not settings.supabase_jwt_secret:
                 raise HTTPException(status_code=500, detail="Authentication is not configured on the server")
-            payload = jwt.decode(
-                token,
-                settings.supabase_jwt_secret,
-                algorithms=["HS256", "HS384", "HS512"],
-                audience="authenticated",
-            )
+            key_id = _secret_key_id(settings.supabase_jwt_secret)
         else:
-            # Asymmetric (ES256, RS256, etc.) — use JWKS public key
-            client = _get_jwks_client(settings.supabase_url)
-            signing_key = client.get_signing_key_from_jwt(token)
-            payload = jwt.decode(
-                token,
-                signing_key.key,
-                algorithms=[alg],
-                audience="authenticated",
-            )
+            key_id = f"jwks:{header.get('kid', '')}"
+
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        payload = cache.get(digest, key_id)
+
+        if payload is None:
+            if alg.startswith("HS"):
+                payload = jwt.decode(
+                    token,
+                    settings.supabase_jwt_secret,
+                    algorithms=["HS256", "HS384", "HS512"],
+                    audience="authenticated",
+                )
+            else:
+                # Asymmetric (ES256, RS256, etc.) — use JWKS public key
+                client = _get_jwks_client(settings.supabase_url)
+                signing_key = client.get_signing_key_from_jwt(token)
+                payload = jwt.decode(
+                    token,
+                    signing_key.key,
+                    algorithms=[alg],
+                    audience="authenticated",
+                )
+            cache.put(digest, payload, key_id)
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
     except jwt.InvalidTokenError as e:
@@ -70,3 +178,30 @@ async def require_auth(
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
     return user_id
+
+
+class AuthContext(NamedTuple):
+    user_id: str
+    access_token: str
+
+
+async def require_auth_context(
+    request: Request,
+    user_id: str = Depends(require_auth),
+) -> AuthContext:
+    """Like :func:`require_auth`, but also returns the verified token so it
+    can be forwarded to Supabase and RLS applies to the user's queries."""
+    token = request.headers.get("Authorization", "")[len("Bearer "):]
+    return AuthContext(user_id=user_id, access_token=token)
+
+
+async def optional_auth_context(
+    request: Request,
+    settings: Settings = Depends(get_settings),
+) -> AuthContext | None:
+    """:func:`require_auth_context` for endpoints that also serve anonymous
+    clients: ``None`` without an ``Authorization`` header, 401 for a bad one."""
+    if not request.headers.get("Authorization"):
+        return None
+    user_id = await require_auth(request, settings)
+    return await require_auth_context(request, user_id)
@@ -0,0 +1,69 @@
+"""Cancel a request's work when its client goes away.
+
+A type-ahead search or a screen the user has left still has its upstream
+fan-out or Gemini call in flight. :func:`until_disconnect` runs that work
+as a task next to a listener for ``http.disconnect``; whichever finishes
+first wins, so a dropped client cancels the task — and with it the
+``asyncio.gather`` fan-out, PDF download or model call it is awaiting.
+Streamed (SSE) responses need no help: Starlette stops their generator
+once the client has gone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Awaitable
+from typing import TypeVar
+
+from fastapi import HTTPException, Request
+
+from app import metrics, request_id
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# nginx's "client closed request"; never seen by the client that left
+CLIENT_CLOSED_REQUEST = 499
+
+_cancelled = metrics.Counter(
+    "client_disconnect_cancellations_total",
+    "Requests whose upstream/model work was cancelled because the client disconnected",
+)
+
+
+async def _disconnected(request: Request) -> None:
+    # The body has been read by the time an endpoint runs, so the next
+    # message is the disconnect (any leftover body chunks are skipped)
+    while (await request.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def until_disconnect(request: Request, work: Awaitable[T]) -> T:
+    """Await ``work``, cancelling it if the client disconnects first.
+
+    Raises ``HTTPException(499)`` after a cancellation.
+    """
+    # A coroutine gets a task registered under the request, so the loop
+    # watchdog can still name the route if it blocks
+    task = request_id.create_task(work) if asyncio.iscoroutine(work) else asyncio.ensure_future(work)
+    listener = asyncio.ensure_future(_disconnected(request))
+    try:
+        await asyncio.wait((task, listener), return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    finally:
+        listener.cancel()
+    if task.done():
+        return task.result()
+
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    _cancelled.inc(route=route)
+    logger.info("Client disconnected, cancelled %s %s", request.method, route)
+    raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed request")
@@ -0,0 +1,40 @@
+"""Response encodings negotiated through ``Accept``.
+
+JSON is the default. Clients that send ``Accept: application/msgpack``
+get MessagePack instead, packed by the ``msgpack`` C extension.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import msgpack
+from pydantic_core import to_json
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = {MSGPACK: MSGPACK, "application/x-msgpack": MSGPACK}
+
+
+def negotiate(accept: str) -> str:
+    """Pick JSON or MessagePack for an ``Accept`` header (JSON if unsure)."""
+    for item in accept.split(","):
+        media_type, _, params = item.partition(";")
+        chosen = _MSGPACK_TYPES.get(media_type.strip().lower())
+        if chosen is None:
+            continue
+        q = next(
+            (p.split("=", 1)[1] for p in params.split(";") if p.strip().startswith("q=")), "1"
+        )
+        try:
+            if float(q) > 0:
+                return chosen
+        except ValueError:
+            pass
+    return JSON
+
+
+def encode(value: Any, media_type: str) -> bytes:
+    if media_type == MSGPACK:
+        return msgpack.packb(value)
+    return to_json(value)
@@ -0,0 +1,148 @@
+"""Detect callbacks that block the event loop, and export loop lag.
+
+A heartbeat task sleeps for a short interval on the loop and records how
+late it wakes up; the recent samples are exported at ``/metrics`` as
+percentiles. A daemon thread watches the heartbeat: once the loop has not
+beaten for ``LOOP_BLOCK_THRESHOLD_MS``, it captures the loop thread's
+stack while the offending callback is still running and logs it with the
+route and request ID of the task being run, if any. Opt-in through
+``LOOP_WATCHDOG``, as the heartbeat costs a few wake-ups per second.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from dataclasses import dataclass
+
+from app import metrics
+from app.request_id import request_for_task
+
+logger = logging.getLogger(__name__)
+
+_HEARTBEAT = 0.02  # seconds between heartbeats
+_WINDOW = 3000  # lag samples kept (~1 minute)
+_QUANTILES = (0.5, 0.9, 0.99)
+
+_blocked = metrics.Counter(
+    "event_loop_blocked_total", "Callbacks that blocked the event loop past the threshold"
+)
+
+
+@dataclass(frozen=True)
+class BlockReport:
+    blocked_ms: float
+    stack: str
+    task: str | None
+    route: str | None
+    request_id: str | None
+
+
+class LoopWatchdog:
+    def __init__(self, threshold: float, heartbeat: float = _HEARTBEAT) -> None:
+        self.threshold = threshold
+        self.heartbeat = heartbeat
+        self.lag: deque[float] = deque(maxlen=_WINDOW)
+        self.reports: deque[BlockReport] = deque(maxlen=20)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread = 0
+        self._last_beat = 0.0
+        self._beat_task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start watching the running loop (call from the loop thread)."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stopped.clear()
+        self._beat_task = self._loop.create_task(self._beat(), name="loop-watchdog")
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._beat_task is not None:
+            self._beat_task.cancel()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    async def _beat(self) -> None:
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.heartbeat)
+            self._last_beat = now = time.monotonic()
+            self.lag.append(max(0.0, now - started - self.heartbeat))
+
+    def _watch(self) -> None:
+        reported_beat = 0.0
+        while not self._stopped.wait(min(self.threshold / 4, 0.05)):
+            last_beat = self._last_beat
+            blocked = time.monotonic() - last_beat - self.heartbeat
+            if blocked >= self.threshold and last_beat != reported_beat:
+                reported_beat = last_beat
+                self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        task = asyncio.current_task(self._loop)
+        request = request_for_task(task)
+        report = BlockReport(
+            blocked_ms=round(blocked * 1000, 1),
+            stack=stack,
+            task=task.get_name() if task is not None else None,
+            route=request.route if request else None,
+            request_id=request.request_id if request else None,
+        )
+        self.reports.append(report)
+        _blocked.inc(route=report.route or "")
+        logger.warning(
+            "Event loop blocked for %.0f ms+ (route=%s request_id=%s task=%s):\n%s",
+            report.blocked_ms, report.route, report.request_id, report.task, stack,
+        )
+
+    def quantiles(self) -> dict[float, float]:
+        samples = sorted(self.lag)
+        if not samples:
+            return {}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in _QUANTILES}
+
+
+_watchdog: LoopWatchdog | None = None
+
+
+def _lag_metrics():
+    if _watchdog is None:
+        return
+    yield "# HELP event_loop_lag_seconds Heartbeat wake-up delay over the last minute"
+    yield "# TYPE event_loop_lag_seconds summary"
+    for q, value in _watchdog.quantiles().items():
+        yield metrics.sample("event_loop_lag_seconds", value, quantile=str(q))
+    yield metrics.sample("event_loop_lag_seconds_sum", sum(_watchdog.lag))
+    yield metrics.sample("event_loop_lag_seconds_count", len(_watchdog.lag))
+
+
+metrics.register_collector(_lag_metrics)
+
+
+def start(threshold_ms: float) -> LoopWatchdog:
+    global _watchdog
+    _watchdog = LoopWatchdog(threshold_ms / 1000)
+    _watchdog.start()
+    return _watchdog
+
+
+def stop() -> None:
+    global _watchdog
+    if _watchdog is not None:
+        _watchdog.stop()
+        _watchdog = None
@@ -0,0 +1,66 @@
+"""Process-local metrics served at ``GET /metrics`` in Prometheus text format.
+
+Counters are created at import time by the modules that own them;
+modules whose values are computed on demand (e.g. loop-lag percentiles)
+register a collector that yields ready-made exposition lines. Each worker
+reports its own numbers; aggregate across workers in Prometheus.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Iterable
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: _Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def sample(name: str, value: float, **labels: str) -> str:
+    """One exposition line, for collectors."""
+    return f"{name}{_format_labels(tuple(sorted(labels.items())))} {value:g}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str) -> None:
+        self.name = name
+        self.help = help
+        self._values: dict[_Labels, float] = {}
+        self._lock = threading.Lock()
+        register_collector(self.lines)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(sorted(labels.items())), 0.0)
+
+    def lines(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values or [((), 0.0)]:
+            yield f"{self.name}{_format_labels(labels)} {value:g}"
+
+
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[str]]) -> None:
+    """Add a callable yielding exposition lines (including HELP/TYPE)."""
+    _collectors.append(collector)
+
+
+def render() -> str:
+    return "".join(f"{line}\n" for collector in _collectors for line in collector())
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+from app.models.paper import Paper
+
+
+class SavedSearchCreate(BaseModel):
+    query: str = Field(..., min_length=1, max_length=300)
+    source: str | None = Field(None, pattern=r"^(arxiv|openalex|semantic_scholar)$")
+    year_from: int | None = Field(None, ge=1900, le=2100)
+    year_to: int | None = Field(None, ge=1900, le=2100)
+
+
+class SavedSearch(BaseModel):
+    id: str
+    query: str
+    source: str | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+    high_water_mark: str | None = None
+    last_polled_at: str | None = None
+    created_at: str | None = None
+
+
+class AlertHit(BaseModel):
+    saved_search_id: str
+    paper: Paper
+    found_at: str
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from pydantic import BaseModel
+
+
+class Favorite(BaseModel):
+    id: str
+    paper_id: str
+    title: str
+    authors: list[str] = []
+    abstract: str = ""
+    published_date: str | None = None
+    source: str = ""
+    url: str = ""
+    pdf_url: str = ""
+    collection_id: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+
+
+class FavoriteTombstone(BaseModel):
+    id: str
+    paper_id: str
+    deleted_at: str
+
+
+class FavoritesSyncResponse(BaseModel):
+    changes: list[Favorite]
+    deleted: list[FavoriteTombstone]
+    next_cursor: str
+    has_more: bool
+
+
+class FavoriteSearchResponse(BaseModel):
+    results: list[Favorite]
+    page: int
+    per_page: int
+    has_more: bool
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, Field
 
 
 class Paper(BaseModel):
@@ -18,6 +20,8 @@ class SourceStatus(BaseModel):
     name: str
     ok: bool
     error: str | None = None
+    latency_ms: float | None = None
+    routing: str | None = None  # adaptive mode: primary | fallback | skipped
 
 
 class PaperSearchResult(BaseModel):
@@ -27,6 +31,79 @@ class PaperSearchResult(BaseModel):
     has_more: bool = True
     papers: list[Paper]
     sources: list[SourceStatus] = []
+    stale: bool = False  # last good result, served because every source failed
+
+
+class SearchPaper(Paper):
+    is_favorite: bool | None = None  # GET /search for a signed-in user only
+
+
+class FlaggedSearchResult(PaperSearchResult):
+    papers: list[SearchPaper]
+
+
+class SearchSpec(BaseModel):
+    query: str = Field(..., min_length=1, max_length=300)
+    page: int = Field(1, ge=1)
+    per_page: int = Field(10, ge=1, le=50)
+    source: str | None = Field(None, pattern=r"^(arxiv|openalex|semantic_scholar)$")
+    year_from: int | None = Field(None, ge=1900, le=2100)
+    year_to: int | None = Field(None, ge=1900, le=2100)
+
+
+class MultiSearchRequest(BaseModel):
+    queries: list[SearchSpec] = Field(..., min_length=1, max_length=20)
+
+
+class MultiSearchEntry(BaseModel):
+    paper_ids: list[str] = []  # keys into MultiSearchResult.papers, in rank order
+    total: int = 0
+    page: int
+    per_page: int
+    has_more: bool = False
+    sources: list[SourceStatus] = []
+    stale: bool = False
+    error: str | None = None
+
+
+class MultiSearchResult(BaseModel):
+    results: list[MultiSearchEntry]  # one per query, in request order
+    papers: dict[str, Paper]  # each paper once, however many queries found it
+
+
+class YearCount(BaseModel):
+    year: int
+    count: int
+
+
+class SourceTotal(BaseModel):
+    name: str
+    ok: bool
+    total: int | None = None  # matching works as reported by the source
+    error: str | None = None
+
+
+class PaperFacets(BaseModel):
+    query: str
+    years: list[YearCount] = []  # OpenAlex publication years, ascending
+    open_access: int | None = None  # OpenAlex works with free full text
+    closed_access: int | None = None
+    sources: list[SourceTotal] = []
+
+
+class SimilarPaper(BaseModel):
+    paper: Paper
+    score: float
+
+
+class SimilarPapersResponse(BaseModel):
+    paper_id: str
+    results: list[SimilarPaper]
+
+
+class ExportRequest(BaseModel):
+    paper_ids: list[str] = Field(..., min_length=1, max_length=10_000)
+    format: str = Field("bibtex", pattern=r"^(bibtex|ris|csv)$")
 
 
 class SummarizeRequest(BaseModel):
@@ -38,6 +115,7 @@ class SummarizeRequest(BaseModel):
 class SummarizeResponse(BaseModel):
     summary: str
     language: str
+    model: str | None = None  # Gemini model that wrote the summary
 
 
 class AnalyzePdfRequest(BaseModel):
@@ -48,3 +126,50 @@ class AnalyzePdfRequest(BaseModel):
 class AnalyzePdfResponse(BaseModel):
     analysis: str
     language: str
+    model: str | None = None
+
+
+class GeneratedText(BaseModel):
+    text: str
+    model: str  # the model that answered, after any fallback
+    fallback: bool = False  # not the first model in the chain
+
+
+class AskPdfRequest(BaseModel):
+    pdf_url: str
+    question: str = Field(..., min_length=1, max_length=2000)
+    language: str = "en"  # en | ru | kk
+
+
+class PdfPassage(BaseModel):
+    chunk: int  # position of the chunk in the document
+    score: float  # BM25; 0 when no chunk matched and the opening ones were used
+    text: str
+
+
+class AskPdfResponse(BaseModel):
+    answer: str
+    language: str
+    passages: list[PdfPassage]
+
+
+class SynthesisItem(BaseModel):
+    title: str
+    abstract: str = ""
+    paper_id: str | None = None
+
+
+class SynthesizeRequest(BaseModel):
+    # Papers are looked up by ID, or passed in directly; up to 200 in total
+    paper_ids: list[str] = Field(default_factory=list, max_length=200)
+    papers: list[SynthesisItem] = Field(default_factory=list, max_length=200)
+    language: str = "en"  # en | ru | kk
+
+
+class AnalyzePdfJob(BaseModel):
+    job_id: str
+    status: str  # queued | running | done | failed
+    created_at: datetime
+    updated_at: datetime
+    result: AnalyzePdfResponse | None = None
+    error: str | None = None
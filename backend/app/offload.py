@@ -0,0 +1,80 @@
+"""Run CPU-heavy parsing of upstream payloads off the event loop.
+
+``OFFLOAD_EXECUTOR`` selects where :func:`run_cpu` sends work:
+
+* ``thread``  — a thread pool (default). Parsing still holds the GIL, but
+  the interpreter hands it back to the event loop every few milliseconds,
+  so one large payload no longer stalls every other request.
+* ``process`` — a process pool, which also spreads parsing across cores.
+* ``none``    — parse inline on the event loop.
+
+Payloads smaller than ``OFFLOAD_MIN_BYTES`` are always parsed inline; for
+them the executor hop costs more than it saves. Functions passed to
+:func:`run_cpu` must be module-level and return plain tuples and lists, so
+results cross a process boundary cheaply; models are built on the loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_EXECUTORS = ("thread", "process", "none")
+
+_executor: tuple[str, Executor] | None = None
+
+
+def _create_executor(kind: str, workers: int) -> Executor:
+    workers = workers or os.cpu_count() or 1
+    if kind == "process":
+        # spawn, not fork: forking a process that runs an event loop and
+        # client threads can deadlock the child
+        return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    return ThreadPoolExecutor(workers, thread_name_prefix="offload")
+
+
+def get_executor() -> Executor | None:
+    """The shared executor for the configured kind, created on first use."""
+    global _executor
+    settings = get_settings()
+    kind = settings.offload_executor.lower()
+    if kind not in _EXECUTORS:
+        raise ValueError(f"Unknown offload executor: {settings.offload_executor}")
+    if kind == "none":
+        return None
+    if _executor is None or _executor[0] != kind:
+        shutdown()
+        _executor = (kind, _create_executor(kind, settings.offload_workers))
+        logger.info("Offloading parsing to a %s pool", kind)
+    return _executor[1]
+
+
+async def run_cpu(fn: Callable[..., T], *args: Any, size: int) -> T:
+    """Call ``fn(*args)`` in the executor, or inline for small payloads.
+
+    ``size`` is the payload size in bytes that ``fn`` is about to parse.
+    """
+    if size < get_settings().offload_min_bytes:
+        return fn(*args)
+    executor = get_executor()
+    if executor is None:
+        return fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+
+def shutdown() -> None:
+    """Stop the executor; the next :func:`run_cpu` call starts a new one."""
+    global _executor
+    if _executor is not None:
+        _executor[1].shutdown(wait=False, cancel_futures=True)
+        _executor = None
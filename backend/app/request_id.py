@@ -0,0 +1,95 @@
+"""Per-request IDs, echoed in ``X-Request-ID`` and attached to diagnostics.
+
+An incoming ``X-Request-ID`` is reused when it looks sane, so IDs set by a
+proxy carry through; otherwise a new one is generated. The ID and route of
+the request being served are available both from the request's own task
+(:func:`current_request`) and, for diagnostics running on another thread,
+by task (:func:`request_for_task`). Work a request hands to a task of its
+own should start it with :func:`create_task` to keep that attribution.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import uuid
+import weakref
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from collections.abc import Coroutine
+from typing import Any, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+T = TypeVar("T")
+
+HEADER = "X-Request-ID"
+_VALID = re.compile(r"[A-Za-z0-9._:-]{1,128}")
+
+
+@dataclass
+class RequestInfo:
+    request_id: str
+    method: str
+    path: str
+    _scope: dict[str, Any] = field(repr=False)
+
+    @property
+    def route(self) -> str:
+        """The matched route template once routing has run, else the path."""
+        route = self._scope.get("route")
+        return getattr(route, "path", None) or self.path
+
+
+_current: ContextVar[RequestInfo | None] = ContextVar("request_info", default=None)
+_by_task: weakref.WeakKeyDictionary[asyncio.Task, RequestInfo] = weakref.WeakKeyDictionary()
+
+
+def current_request() -> RequestInfo | None:
+    return _current.get()
+
+
+def request_for_task(task: asyncio.Task | None) -> RequestInfo | None:
+    return _by_task.get(task) if task is not None else None
+
+
+def create_task(coro: Coroutine[Any, Any, T]) -> asyncio.Task[T]:
+    """``asyncio.create_task``, registered under the current request."""
+    task = asyncio.create_task(coro)
+    info = _current.get()
+    if info is not None:
+        _by_task[task] = info
+    return task
+
+
+class RequestIdMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = next(
+            (v.decode("latin-1") for k, v in scope["headers"] if k == b"x-request-id"), ""
+        )
+        request_id = incoming if _VALID.fullmatch(incoming) else uuid.uuid4().hex
+        info = RequestInfo(request_id, scope["method"], scope["path"], scope)
+        token = _current.set(info)
+        task = asyncio.current_task()
+        if task is not None:
+            _by_task[task] = info
+
+        async def send_with_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[HEADER] = request_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            _current.reset(token)
+            if task is not None:
+                _by_task.pop(task, None)
@@ -2,16 +2,25 @@ from __future__ import annotations
 
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 
 from app.dependencies import require_auth
+from app.disconnect import until_disconnect
 from app.models.paper import (
+    AnalyzePdfJob,
     AnalyzePdfRequest,
     AnalyzePdfResponse,
+    AskPdfRequest,
+    AskPdfResponse,
     SummarizeRequest,
     SummarizeResponse,
+    SynthesizeRequest,
 )
+from app.services import pdf_jobs, pdf_qa, synthesis
 from app.services.gemini_service import analyze_pdf, summarize_paper
+from app.services.warmup import record_summary
+from app.streaming import sse_response
 
 logger = logging.getLogger(__name__)
 
@@ -20,27 +29,31 @@ router = APIRouter(prefix="/ai", tags=["AI"])
 
 @router.post("/summarize", response_model=SummarizeResponse)
 async def summarize(
+    request: Request,
     body: SummarizeRequest,
     user_id: str = Depends(require_auth),
 ) -> SummarizeResponse:
     if body.language not in ("en", "ru", "kk"):
         raise HTTPException(status_code=400, detail="Unsupported language")
 
+    record_summary(body.title, body.abstract, body.language)
     try:
-        summary = await summarize_paper(
-            title=body.title,
-            abstract=body.abstract,
-            language=body.language,
+        generated = await until_disconnect(
+            request,
+            summarize_paper(title=body.title, abstract=body.abstract, language=body.language),
         )
+    except HTTPException:
+        raise
     except Exception as exc:
         logger.exception("AI summarization failed for user %s", user_id)
         raise HTTPException(status_code=502, detail="AI service is temporarily unavailable")
 
-    return SummarizeResponse(summary=summary, language=body.language)
+    return SummarizeResponse(summary=generated.text, language=body.language, model=generated.model)
 
 
 @router.post("/analyze-pdf", response_model=AnalyzePdfResponse)
 async def analyze_pdf_endpoint(
+    request: Request,
     body: AnalyzePdfRequest,
     user_id: str = Depends(require_auth),
 ) -> AnalyzePdfResponse:
@@ -48,14 +61,125 @@ async def analyze_pdf_endpoint(
         raise HTTPException(status_code=400, detail="Unsupported language")
 
     try:
-        analysis = await analyze_pdf(
-            pdf_url=body.pdf_url,
-            language=body.language,
+        generated = await until_disconnect(
+            request, analyze_pdf(pdf_url=body.pdf_url, language=body.language)
         )
+    except HTTPException:
+        raise
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
     except Exception as exc:
         logger.exception("PDF analysis failed for user %s", user_id)
         raise HTTPException(status_code=502, detail="AI service is temporarily unavailable")
 
-    return AnalyzePdfResponse(analysis=analysis, language=body.language)
+    return AnalyzePdfResponse(
+        analysis=generated.text, language=body.language, model=generated.model
+    )
+
+
+@router.post("/ask-pdf", response_model=AskPdfResponse)
+async def ask_pdf(
+    request: Request,
+    body: AskPdfRequest,
+    user_id: str = Depends(require_auth),
+) -> AskPdfResponse:
+    """Answer a question about a PDF from its most relevant passages.
+
+    The first question about a document transcribes and indexes it; later
+    ones only send the matching chunks to the model.
+    """
+    if body.language not in ("en", "ru", "kk"):
+        raise HTTPException(status_code=400, detail="Unsupported language")
+
+    try:
+        return await until_disconnect(
+            request, pdf_qa.ask(body.pdf_url, body.question, body.language)
+        )
+    except HTTPException:
+        raise
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except Exception as exc:
+        logger.exception("PDF question failed for user %s", user_id)
+        raise HTTPException(status_code=502, detail="AI service is temporarily unavailable")
+
+
+@router.post("/synthesize")
+async def synthesize(
+    body: SynthesizeRequest,
+    user_id: str = Depends(require_auth),
+) -> StreamingResponse:
+    """Stream a literature-review synthesis of up to 200 papers as SSE.
+
+    Emits a ``note`` per summarized paper, ``level``/``partial`` events as
+    the notes are merged, and a final ``synthesis``; papers that can't be
+    used are reported as ``skipped``.
+    """
+    if body.language not in ("en", "ru", "kk"):
+        raise HTTPException(status_code=400, detail="Unsupported language")
+    total = len(body.paper_ids) + len(body.papers)
+    if not total:
+        raise HTTPException(status_code=400, detail="No papers to synthesize")
+    if total > synthesis.MAX_PAPERS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {synthesis.MAX_PAPERS} papers can be synthesized"
+        )
+
+    return sse_response(synthesis.synthesize(body.paper_ids, body.papers, body.language))
+
+
+# ── Background jobs ──────────────────────────────────────────
+
+
+@router.post(
+    "/analyze-pdf/jobs",
+    response_model=AnalyzePdfJob,
+    status_code=202,
+    responses={200: {"description": "The analysis had already finished"}},
+)
+async def submit_pdf_job(
+    body: AnalyzePdfRequest,
+    response: Response,
+    user_id: str = Depends(require_auth),
+) -> AnalyzePdfJob:
+    """Start a PDF analysis in the background and return its job at once.
+
+    Identical ``(pdf_url, language)`` submissions share one job, so a
+    client can safely resubmit after losing the connection.
+    """
+    if body.language not in ("en", "ru", "kk"):
+        raise HTTPException(status_code=400, detail="Unsupported language")
+
+    try:
+        job = await pdf_jobs.submit(body.pdf_url, body.language)
+    except pdf_jobs.JobQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many analyses queued, try again later",
+            headers={"Retry-After": "30"},
+        )
+    response.headers["Location"] = f"/api/ai/jobs/{job.job_id}"
+    if job.status in ("done", "failed"):
+        response.status_code = 200
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=AnalyzePdfJob)
+async def get_pdf_job(
+    job_id: str,
+    user_id: str = Depends(require_auth),
+) -> AnalyzePdfJob:
+    job = await pdf_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@router.get("/jobs/{job_id}/events")
+async def pdf_job_events(
+    job_id: str,
+    user_id: str = Depends(require_auth),
+) -> StreamingResponse:
+    """Server-Sent Events: a ``job`` event on every status change, ending
+    once the job is done or failed."""
+    return sse_response(pdf_jobs.watch(job_id))
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+
+from app.dependencies import AuthContext, require_auth_context
+from app.models.alert import AlertHit, SavedSearch, SavedSearchCreate
+from app.services.supabase_client import SupabaseError, user_client
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/alerts", tags=["Alerts"])
+
+_SAVED_SEARCH_COLUMNS = "id,query,source,year_from,year_to,high_water_mark,last_polled_at,created_at"
+
+
+def _upstream_error(exc: SupabaseError) -> HTTPException:
+    logger.warning("Supabase request failed: %s", exc)
+    return HTTPException(status_code=502, detail="Database is temporarily unavailable")
+
+
+@router.post("", response_model=SavedSearch, status_code=201)
+async def create_saved_search(
+    body: SavedSearchCreate,
+    auth: AuthContext = Depends(require_auth_context),
+) -> SavedSearch:
+    row = {"user_id": auth.user_id, **body.model_dump()}
+    try:
+        created = await user_client(auth.access_token).insert("saved_searches", row)
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    return SavedSearch(**created[0])
+
+
+@router.get("", response_model=list[SavedSearch])
+async def list_saved_searches(
+    auth: AuthContext = Depends(require_auth_context),
+) -> list[SavedSearch]:
+    try:
+        rows = await user_client(auth.access_token).select(
+            "saved_searches",
+            {"select": _SAVED_SEARCH_COLUMNS, "order": "created_at.desc"},
+        )
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    return [SavedSearch(**r) for r in rows]
+
+
+@router.delete("/{saved_search_id}", status_code=204)
+async def delete_saved_search(
+    saved_search_id: UUID,
+    auth: AuthContext = Depends(require_auth_context),
+) -> Response:
+    try:
+        deleted = await user_client(auth.access_token).delete(
+            "saved_searches", {"id": f"eq.{saved_search_id}"}
+        )
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+    return Response(status_code=204)
+
+
+@router.get("/hits", response_model=list[AlertHit])
+async def list_hits(
+    saved_search_id: UUID | None = None,
+    include_delivered: bool = False,
+    limit: int = Query(100, ge=1, le=500),
+    auth: AuthContext = Depends(require_auth_context),
+) -> list[AlertHit]:
+    """New papers found for the user's saved searches, newest first."""
+    params = {
+        "select": "saved_search_id,paper,found_at",
+        "order": "found_at.desc",
+        "limit": limit,
+    }
+    if not include_delivered:
+        params["delivered_at"] = "is.null"
+    if saved_search_id:
+        params["saved_search_id"] = f"eq.{saved_search_id}"
+    try:
+        rows = await user_client(auth.access_token).select("saved_search_hits", params)
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    return [AlertHit(**r) for r in rows]
+
+
+@router.post("/{saved_search_id}/ack", status_code=204)
+async def acknowledge_hits(
+    saved_search_id: UUID,
+    auth: AuthContext = Depends(require_auth_context),
+) -> Response:
+    """Mark every undelivered hit of a saved search as delivered."""
+    try:
+        await user_client(auth.access_token).update(
+            "saved_search_hits",
+            {"saved_search_id": f"eq.{saved_search_id}", "delivered_at": "is.null"},
+            {"delivered_at": datetime.now(timezone.utc).isoformat()},
+        )
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    return Response(status_code=204)
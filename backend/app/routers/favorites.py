@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import json
+import logging
+from datetime import datetime, timezone
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.dependencies import AuthContext, require_auth_context
+from app.models.favorite import (
+    Favorite,
+    FavoriteSearchResponse,
+    FavoritesSyncResponse,
+    FavoriteTombstone,
+)
+from app.models.paper import Paper
+from app.services import similarity
+from app.services.favorites import SETTLE, keyset_params
+from app.services.supabase_client import SupabaseError, user_client
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/favorites", tags=["Favorites"])
+
+_FAVORITE_COLUMNS = (
+    "id,paper_id,title,authors,abstract,published_date,source,url,pdf_url,"
+    "collection_id,created_at,updated_at"
+)
+_TOMBSTONE_COLUMNS = "id,paper_id,deleted_at"
+
+
+def _observe(favorites: list[Favorite]) -> None:
+    """Feed the user's saved papers to the similarity index."""
+    similarity.observe([Paper(**f.model_dump(include=set(Paper.model_fields))) for f in favorites])
+
+
+def _upstream_error(exc: SupabaseError) -> HTTPException:
+    logger.warning("Supabase request failed: %s", exc)
+    return HTTPException(status_code=502, detail="Database is temporarily unavailable")
+
+
+# ── Cursor ─────────────────────────────────────────────────────────
+# An opaque token holding the last (timestamp, id) seen in each stream.
+
+
+def _encode_cursor(position: dict[str, list[str] | None]) -> str:
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str | None) -> dict[str, list[str] | None]:
+    if not cursor:
+        return {"f": None, "t": None}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        for key in ("f", "t"):
+            value = position.get(key)
+            if value is not None and not (
+                isinstance(value, list) and len(value) == 2 and all(isinstance(v, str) for v in value)
+            ):
+                raise ValueError(key)
+        return {"f": position.get("f"), "t": position.get("t")}
+    except (binascii.Error, ValueError, AttributeError):
+        raise HTTPException(status_code=400, detail="Invalid sync cursor")
+
+
+@router.get("/sync", response_model=FavoritesSyncResponse)
+async def sync_favorites(
+    cursor: str | None = Query(None, description="next_cursor from the previous sync"),
+    limit: int = Query(500, ge=1, le=1000),
+    auth: AuthContext = Depends(require_auth_context),
+) -> FavoritesSyncResponse:
+    """Favorites changed and deleted since ``cursor``.
+
+    Without a cursor this returns everything (a full initial sync). Clients
+    store ``next_cursor`` and keep calling while ``has_more`` is true.
+    Tombstones carry the deleted row's ``id``; match on it rather than
+    ``paper_id``, since a paper that is removed and re-added gets a new row.
+    """
+    position = _decode_cursor(cursor)
+    horizon = (datetime.now(timezone.utc) - SETTLE).isoformat()
+    try:
+        client = user_client(auth.access_token)
+        rows, tombstones = await asyncio.gather(
+            client.select(
+                "favorites",
+                {"select": _FAVORITE_COLUMNS,
+                 **keyset_params(auth.user_id, "updated_at", position["f"], horizon, limit)},
+            ),
+            client.select(
+                "favorite_tombstones",
+                {"select": _TOMBSTONE_COLUMNS,
+                 **keyset_params(auth.user_id, "deleted_at", position["t"], horizon, limit)},
+            ),
+        )
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+
+    has_more = len(rows) > limit or len(tombstones) > limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+    if rows:
+        position["f"] = [rows[-1]["updated_at"], rows[-1]["id"]]
+    if tombstones:
+        position["t"] = [tombstones[-1]["deleted_at"], tombstones[-1]["id"]]
+
+    changes = [Favorite(**r) for r in rows]
+    _observe(changes)
+    return FavoritesSyncResponse(
+        changes=changes,
+        deleted=[FavoriteTombstone(**t) for t in tombstones],
+        next_cursor=_encode_cursor(position),
+        has_more=has_more,
+    )
+
+
+@router.get("/search", response_model=FavoriteSearchResponse)
+async def search_favorites(
+    q: str = Query(..., min_length=1, max_length=300),
+    collection_id: UUID | None = None,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    auth: AuthContext = Depends(require_auth_context),
+) -> FavoriteSearchResponse:
+    """Ranked full-text search over the user's favorites.
+
+    Runs the ``search_favorites`` RPC against the GIN-indexed
+    ``search_vector`` column; ``q`` accepts web-search syntax
+    (``"exact phrase"``, ``-exclude``, ``or``).
+    """
+    try:
+        rows = await user_client(auth.access_token).rpc(
+            "search_favorites",
+            {
+                "q": q,
+                "collection": str(collection_id) if collection_id else None,
+                "result_limit": per_page + 1,
+                "result_offset": (page - 1) * per_page,
+            },
+        ) or []
+    except SupabaseError as exc:
+        raise _upstream_error(exc)
+    results = [Favorite(**r) for r in rows[:per_page]]
+    _observe(results)
+    return FavoriteSearchResponse(
+        results=results,
+        page=page,
+        per_page=per_page,
+        has_more=len(rows) > per_page,
+    )
@@ -1,27 +1,300 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Query
+import asyncio
+import hashlib
+from collections.abc import AsyncIterator
 
-from app.models.paper import PaperSearchResult
-from app.services.paper_aggregator import search_papers
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app import request_id
+from app.config import Settings, get_settings
+from app.dependencies import AuthContext, optional_auth_context
+from app.disconnect import until_disconnect
+from app.encoding import JSON, encode, negotiate
+from app.models.paper import (
+    ExportRequest,
+    FlaggedSearchResult,
+    MultiSearchRequest,
+    MultiSearchResult,
+    Paper,
+    PaperFacets,
+    PaperSearchResult,
+    SearchPaper,
+    SimilarPaper,
+    SimilarPapersResponse,
+)
+from app.services.citation_graph import expand_graph
+from app.services.exporter import FORMATS, export_stream, iter_papers_by_ids, iter_search_results
+from app.services.favorites import favorite_ids, mark_favorites
+from app.services.paper_aggregator import (
+    fetch_papers_by_ids,
+    get_facets,
+    search_many,
+    search_papers,
+)
+from app.services.similarity import IndexUnavailableError, add_papers, similar_papers
+from app.services.warmup import record_search
+from app.streaming import sse_response
 
 router = APIRouter(prefix="/papers", tags=["Papers"])
 
 
-@router.get("/search", response_model=PaperSearchResult)
+def _etag(body: bytes) -> str:
+    # Weak validator: the same page is equivalent whether or not the
+    # compression middleware gzips it on the way out.
+    return f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def _conditional_response(
+    request: Request,
+    body: bytes,
+    media_type: str,
+    max_age: int,
+    vary: str | None = None,
+    private: bool = False,
+) -> Response:
+    """Return *body* with an ETag, or an empty 304 if the client has it."""
+    etag = _etag(body)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"{'private' if private else 'public'}, max-age={max_age}",
+    }
+    if vary:
+        headers["Vary"] = vary
+    if _etag_matches(request.headers.get("If-None-Match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+_PAPER_FIELDS = tuple(SearchPaper.model_fields)
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if fields is None:
+        return None
+    names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in names if f not in _PAPER_FIELDS]
+    if unknown or not names:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown paper fields: {', '.join(unknown) or '(none given)'}",
+        )
+    return names
+
+
+def _snippet(text: str, limit: int) -> str:
+    """Cut ``text`` to at most ``limit`` characters at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    if " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "…"
+
+
+def _project(
+    result: PaperSearchResult,
+    fields: list[str] | None,
+    abstract_chars: int | None,
+    max_authors: int | None,
+) -> dict:
+    """The search response as plain data, trimmed for list views."""
+    body = result.model_dump(exclude={"papers"})
+    papers = []
+    for paper in result.papers:
+        row = {f: getattr(paper, f, None) for f in fields or type(paper).model_fields}
+        if abstract_chars is not None and "abstract" in row:
+            row["abstract"] = _snippet(row["abstract"], abstract_chars)
+        if max_authors is not None and "authors" in row:
+            row["authors"] = row["authors"][:max_authors]
+        papers.append(row)
+    body["papers"] = papers
+    return body
+
+
+@router.get(
+    "/search",
+    response_model=FlaggedSearchResult,
+    responses={
+        200: {"content": {"application/msgpack": {}}},
+        304: {"description": "Not modified"},
+    },
+)
 async def search(
+    request: Request,
     query: str = Query(..., min_length=1, max_length=300),
     page: int = Query(1, ge=1),
     per_page: int = Query(10, ge=1, le=50),
     source: str | None = Query(None, pattern=r"^(arxiv|openalex|semantic_scholar)$"),
     year_from: int | None = Query(None, ge=1900, le=2100),
     year_to: int | None = Query(None, ge=1900, le=2100),
-) -> PaperSearchResult:
-    return await search_papers(
-        query=query,
-        page=page,
-        per_page=per_page,
-        source=source,
-        year_from=year_from,
-        year_to=year_to,
+    fields: str | None = Query(
+        None,
+        description="Comma-separated Paper fields to return, e.g. paper_id,title,authors",
+    ),
+    abstract_chars: int | None = Query(
+        None, ge=0, le=5000, description="Cut abstracts to a snippet of this many characters"
+    ),
+    max_authors: int | None = Query(None, ge=1, le=100, description="Keep only the first N authors"),
+    settings: Settings = Depends(get_settings),
+    auth: AuthContext | None = Depends(optional_auth_context),
+) -> Response:
+    """Search papers across sources.
+
+    ``fields``, ``abstract_chars`` and ``max_authors`` trim each paper for
+    list views; ``Accept: application/msgpack`` returns MessagePack. With
+    a bearer token each paper's ``is_favorite`` says whether the user has
+    saved it (the response is then ``Cache-Control: private``).
+    """
+    projection = _parse_fields(fields)
+    media_type = negotiate(request.headers.get("Accept", ""))
+    record_search(query, page, per_page, source, year_from, year_to)
+
+    async def saved() -> frozenset[str] | None:
+        return None if auth is None else await favorite_ids(auth.user_id, auth.access_token)
+
+    result, saved_ids = await until_disconnect(
+        request,
+        asyncio.gather(
+            request_id.create_task(
+                search_papers(
+                    query=query,
+                    page=page,
+                    per_page=per_page,
+                    source=source,
+                    year_from=year_from,
+                    year_to=year_to,
+                )
+            ),
+            request_id.create_task(saved()),
+        ),
+    )
+    if saved_ids is not None:
+        result = mark_favorites(result, saved_ids)
+    if media_type == JSON and projection is None and abstract_chars is None and max_authors is None:
+        body = result.model_dump_json().encode()
+    else:
+        body = encode(_project(result, projection, abstract_chars, max_authors), media_type)
+    # A stale fallback should be re-requested as soon as sources recover
+    max_age = 0 if result.stale else settings.search_client_max_age
+    return _conditional_response(
+        request, body, media_type, max_age, vary="Accept, Authorization", private=auth is not None
+    )
+
+
+@router.post("/search/multi", response_model=MultiSearchResult)
+async def search_multi(request: Request, body: MultiSearchRequest) -> MultiSearchResult:
+    """Run up to 20 searches in one request (e.g. a dashboard's topics).
+
+    ``results[i]`` answers ``queries[i]`` and lists paper IDs; each paper
+    appears once in ``papers`` even when several queries found it.
+    """
+    for spec in body.queries:
+        record_search(spec.query, spec.page, spec.per_page, spec.source, spec.year_from, spec.year_to)
+    return await until_disconnect(request, search_many(body.queries))
+
+
+@router.get(
+    "/facets",
+    response_model=PaperFacets,
+    responses={304: {"description": "Not modified"}},
+)
+async def facets(
+    request: Request,
+    query: str = Query(..., min_length=1, max_length=300),
+    settings: Settings = Depends(get_settings),
+) -> Response:
+    """Counts for narrowing a search before running it: works per
+    publication year, open-access split and the total at each source."""
+    result = await until_disconnect(request, get_facets(query))
+    body = result.model_dump_json().encode()
+    return _conditional_response(request, body, JSON, settings.search_client_max_age)
+
+
+def _export_response(batches: AsyncIterator[list[Paper]], fmt: str) -> StreamingResponse:
+    media_type, extension = FORMATS[fmt]
+    return StreamingResponse(
+        export_stream(batches, fmt),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="researchhub-export.{extension}"'},
+    )
+
+
+@router.get("/export")
+async def export_search(
+    query: str = Query(..., min_length=1, max_length=300),
+    format: str = Query("bibtex", pattern=r"^(bibtex|ris|csv)$"),
+    max_results: int = Query(500, ge=1, le=10_000),
+    source: str | None = Query(None, pattern=r"^(arxiv|openalex|semantic_scholar)$"),
+    year_from: int | None = Query(None, ge=1900, le=2100),
+    year_to: int | None = Query(None, ge=1900, le=2100),
+) -> StreamingResponse:
+    """Stream every search result page as BibTeX, RIS or CSV."""
+    batches = iter_search_results(query, max_results, source, year_from, year_to)
+    return _export_response(batches, format)
+
+
+@router.post("/export")
+async def export_papers(body: ExportRequest) -> StreamingResponse:
+    """Stream the given papers (e.g. a favorites collection) as BibTeX, RIS or CSV."""
+    return _export_response(iter_papers_by_ids(body.paper_ids), body.format)
+
+
+@router.get("/{paper_id:path}/graph")
+async def citation_graph(
+    paper_id: str,
+    depth: int = Query(1, ge=1, le=3),
+    direction: str = Query("both", pattern=r"^(references|citations|both)$"),
+    limit: int = Query(20, ge=1, le=100, description="Max neighbours per node"),
+    max_nodes: int = Query(200, ge=1, le=2000),
+):
+    """Stream the citation graph around a paper as Server-Sent Events.
+
+    Emits ``node`` and ``edge`` events breadth-first, then one ``done``.
+    """
+    root = (await fetch_papers_by_ids([paper_id])).get(paper_id)
+    if root is None:
+        raise HTTPException(status_code=404, detail="Paper not found")
+    return sse_response(
+        expand_graph(root, depth=depth, direction=direction, limit=limit, max_nodes=max_nodes)
+    )
+
+
+@router.get("/{paper_id:path}/similar", response_model=SimilarPapersResponse)
+async def similar(
+    paper_id: str,
+    limit: int = Query(10, ge=1, le=50),
+) -> SimilarPapersResponse:
+    """Papers most similar to ``paper_id`` among those the backend has seen.
+
+    A paper that isn't indexed yet is looked up by ID and added first.
+    503 when ``SIMILARITY_INDEX_DIR`` is unset (or another worker holds
+    the index).
+    """
+    try:
+        results = await similar_papers(paper_id, limit)
+    except IndexUnavailableError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    if results is None:
+        paper = (await fetch_papers_by_ids([paper_id])).get(paper_id)
+        if paper is None:
+            raise HTTPException(status_code=404, detail="Paper not found")
+        await add_papers([paper])
+        results = await similar_papers(paper_id, limit) or []
+    return SimilarPapersResponse(
+        paper_id=paper_id,
+        results=[SimilarPaper(paper=p, score=round(score, 4)) for p, score in results],
     )
@@ -0,0 +1,164 @@
+"""Saved-search alerts: incremental polling for newly published papers.
+
+Saved searches that share the same normalised query are polled together,
+once per cycle, from the oldest high-water mark in the group. Only papers
+newer than each search's own mark are recorded for it. The mark then
+advances to the time the poll started, but only if every source answered
+in full. If a source failed, the mark stays put and the next cycle retries.
+If results were capped, the mark moves only to the newest paper delivered.
+
+Run a single cycle from cron with ``python -m app.services.alerts``, or set
+``ALERTS_POLL_INTERVAL`` on exactly one worker to poll in the background.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from app.config import get_settings
+from app.services.paper_aggregator import NewPapers, fetch_new_papers
+from app.services.supabase_client import SupabaseClient, service_client
+
+logger = logging.getLogger(__name__)
+
+_DUE_BATCH = 500
+_GROUP_CONCURRENCY = 4
+
+SpecKey = tuple[str, str | None, int | None, int | None]
+
+
+def spec_key(row: dict) -> SpecKey:
+    """Normalised (query, source, year_from, year_to) shared by equivalent searches."""
+    query = " ".join(row["query"].lower().split())
+    return (query, row.get("source"), row.get("year_from"), row.get("year_to"))
+
+
+def _parse_ts(value: str | None) -> datetime:
+    if not value:
+        return datetime.now(timezone.utc)
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _next_mark(poll: NewPapers, started: datetime) -> datetime | None:
+    """Where the group's marks may advance to; ``None`` keeps them."""
+    if poll.failed:
+        logger.warning("Alert poll incomplete (%s failed); keeping marks", ", ".join(poll.failed))
+        return None
+    if poll.truncated:
+        newest = max((changed_at for _, changed_at in poll.papers), default=None)
+        return min(newest, started) if newest is not None else None
+    return started
+
+
+async def _poll_group(client: SupabaseClient, key: SpecKey, searches: list[dict]) -> int:
+    query, source, year_from, year_to = key
+    started = datetime.now(timezone.utc)
+    since = min(_parse_ts(s.get("high_water_mark")) for s in searches)
+
+    poll = await fetch_new_papers(
+        query,
+        since,
+        source=source,
+        year_from=year_from,
+        year_to=year_to,
+        max_results=get_settings().alerts_max_new_per_poll,
+    )
+
+    hits: list[dict] = []
+    for search in searches:
+        mark = _parse_ts(search.get("high_water_mark"))
+        hits.extend(
+            {
+                "saved_search_id": search["id"],
+                "user_id": search["user_id"],
+                "paper_id": paper.paper_id,
+                "paper": paper.model_dump(),
+            }
+            for paper, changed_at in poll.papers
+            if changed_at >= mark
+        )
+    if hits:
+        # Re-polls of date-granular sources return the same day's papers
+        # again; the primary key makes those inserts no-ops.
+        await client.insert(
+            "saved_search_hits",
+            hits,
+            on_conflict="saved_search_id,paper_id",
+            ignore_duplicates=True,
+            returning=False,
+        )
+
+    ids = ",".join(s["id"] for s in searches)
+    new_mark = _next_mark(poll, started)
+    if new_mark == started:
+        await client.update(
+            "saved_searches",
+            {"id": f"in.({ids})"},
+            {"high_water_mark": started.isoformat(), "last_polled_at": started.isoformat()},
+        )
+        return len(hits)
+
+    await client.update(
+        "saved_searches", {"id": f"in.({ids})"}, {"last_polled_at": started.isoformat()}
+    )
+    if new_mark is not None:
+        # Only searches behind the new mark move; none goes backwards
+        await client.update(
+            "saved_searches",
+            {"id": f"in.({ids})",
+             "or": f"(high_water_mark.is.null,high_water_mark.lt.{new_mark.isoformat()})"},
+            {"high_water_mark": new_mark.isoformat()},
+        )
+    return len(hits)
+
+
+async def poll_saved_searches(client: SupabaseClient | None = None) -> int:
+    """Poll every saved search that is due; return the number of hits stored."""
+    settings = get_settings()
+    client = client or service_client()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.alerts_min_poll_age)
+    due = await client.select("saved_searches", {
+        "select": "id,user_id,query,source,year_from,year_to,high_water_mark",
+        "or": f"(last_polled_at.is.null,last_polled_at.lt.{cutoff.isoformat()})",
+        "order": "last_polled_at.asc.nullsfirst",
+        "limit": _DUE_BATCH,
+    })
+
+    groups: dict[SpecKey, list[dict]] = defaultdict(list)
+    for row in due:
+        groups[spec_key(row)].append(row)
+
+    semaphore = asyncio.Semaphore(_GROUP_CONCURRENCY)
+
+    async def run(key: SpecKey, searches: list[dict]) -> int:
+        async with semaphore:
+            try:
+                return await _poll_group(client, key, searches)
+            except Exception:
+                logger.exception("Alert poll failed for query %r", key[0])
+                return 0
+
+    stored = await asyncio.gather(*(run(k, v) for k, v in groups.items()))
+    logger.info(
+        "Polled %d saved searches in %d groups, %d new hits",
+        len(due), len(groups), sum(stored),
+    )
+    return sum(stored)
+
+
+async def run_scheduler(interval: float) -> None:
+    """Poll forever, sleeping *interval* seconds between cycles."""
+    while True:
+        try:
+            await poll_saved_searches()
+        except Exception:
+            logger.exception("Saved-search poll cycle failed")
+        await asyncio.sleep(interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(poll_saved_searches())
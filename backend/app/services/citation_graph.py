@@ -0,0 +1,181 @@
+"""Breadth-first expansion of citation and reference graphs.
+
+OpenAlex nodes are expanded with batched ``ids.openalex`` / ``cites``
+filters; Semantic Scholar and arXiv nodes through S2's per-paper
+references/citations endpoints. Each node's neighbour list is cached, so
+overlapping graphs only fetch the edges nobody has asked for yet. Failed,
+rate-limited or partial fetches are shown but not cached.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.cache import get_cache, make_key
+from app.cache.codec import PAPER_LIST_CODEC, CodecError
+from app.config import get_settings
+from app.models.paper import Paper
+from app.services.paper_aggregator import (
+    fetch_openalex_citations,
+    fetch_openalex_references,
+    fetch_s2_neighbours,
+)
+
+logger = logging.getLogger(__name__)
+
+# Frontier nodes sent in one OpenAlex OR-filter request
+_OPENALEX_BATCH = 25
+_OPENALEX_CITATIONS_PAGE = 200  # rows per citations request
+
+_BatchFetcher = Callable[[list[str], str], Awaitable[dict[str, list[Paper]]]]
+
+
+def _graph_family(paper_id: str) -> str:
+    return "openalex" if paper_id.startswith("openalex:") else "s2"
+
+
+def _s2_lookup_id(paper_id: str) -> str:
+    prefix, _, raw = paper_id.partition(":")
+    return f"arXiv:{raw}" if prefix == "arxiv" else raw
+
+
+class _Crawler:
+    """Fetches neighbour lists for a frontier, honouring per-source limits."""
+
+    def __init__(self, family: str, limit: int) -> None:
+        settings = get_settings()
+        self.family = family
+        self.limit = limit
+        self.ttl = settings.graph_cache_ttl
+        concurrency = (
+            settings.graph_openalex_concurrency if family == "openalex"
+            else settings.graph_s2_concurrency
+        )
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    def tasks(self, frontier: list[str], direction: str) -> list[asyncio.Task]:
+        """One task per upstream batch; each returns ``(direction, {node: neighbours})``."""
+        size = 1
+        if self.family == "openalex":
+            size = _OPENALEX_BATCH
+            if direction == "citations":
+                # Room on one 200-row page for a full list per node
+                size = max(1, min(size, _OPENALEX_CITATIONS_PAGE // self.limit))
+        return [
+            asyncio.create_task(self._fetch(frontier[i:i + size], direction))
+            for i in range(0, len(frontier), size)
+        ]
+
+    async def _fetch(self, node_ids: list[str], direction: str) -> tuple[str, dict[str, list[Paper]]]:
+        found = await self._cached(node_ids, direction)
+        missing = [n for n in node_ids if n not in found]
+        if missing:
+            async with self._semaphore:
+                try:
+                    fetched, complete = await self._fetch_upstream(missing, direction)
+                except Exception as exc:
+                    logger.warning("Graph expansion failed for %s (%s): %s", missing, direction, exc)
+                    fetched, complete = {}, False
+            if complete:
+                await self._store(fetched, direction)
+            found.update(fetched)
+        return direction, found
+
+    async def _fetch_upstream(
+        self, node_ids: list[str], direction: str
+    ) -> tuple[dict[str, list[Paper]], bool]:
+        """``({node: neighbours}, complete)``; only complete lists are cached."""
+        if self.family == "openalex":
+            raw_ids = [n.removeprefix("openalex:") for n in node_ids]
+            if direction == "references":
+                by_raw, complete = await fetch_openalex_references(raw_ids, self.limit)
+            else:
+                by_raw, complete = await fetch_openalex_citations(raw_ids, self.limit), True
+            return {f"openalex:{raw}": papers for raw, papers in by_raw.items()}, complete
+        (node_id,) = node_ids
+        neighbours = await fetch_s2_neighbours(_s2_lookup_id(node_id), direction, self.limit)
+        return {node_id: neighbours}, True
+
+    def _key(self, node_id: str, direction: str) -> str:
+        return make_key("graph-edges", {"node": node_id, "direction": direction, "limit": self.limit})
+
+    async def _cached(self, node_ids: list[str], direction: str) -> dict[str, list[Paper]]:
+        cache = get_cache()
+        found: dict[str, list[Paper]] = {}
+        if cache is None:
+            return found
+        for node_id in node_ids:
+            try:
+                data = await cache.get(self._key(node_id, direction))
+                if data is not None:
+                    found[node_id] = PAPER_LIST_CODEC.loads(data)
+            except CodecError:
+                pass
+            except Exception as exc:
+                logger.warning("Graph cache read failed: %s", exc)
+        return found
+
+    async def _store(self, fetched: dict[str, list[Paper]], direction: str) -> None:
+        cache = get_cache()
+        if cache is None:
+            return
+        for node_id, papers in fetched.items():
+            try:
+                await cache.set(self._key(node_id, direction), PAPER_LIST_CODEC.dumps(papers), self.ttl)
+            except Exception as exc:
+                logger.warning("Graph cache write failed: %s", exc)
+
+
+async def expand_graph(
+    root: Paper,
+    depth: int = 1,
+    direction: str = "both",
+    limit: int = 20,
+    max_nodes: int = 200,
+) -> AsyncIterator[dict]:
+    """Yield ``node``/``edge`` events breadth-first, then a final ``done``.
+
+    Edges always point from the citing paper to the cited one. Events are
+    yielded as soon as each upstream batch arrives, not per level.
+    """
+    crawler = _Crawler(_graph_family(root.paper_id), limit)
+    directions = ["references", "citations"] if direction == "both" else [direction]
+
+    seen = {root.paper_id}
+    edges: set[tuple[str, str]] = set()
+    truncated = False
+    frontier = [root.paper_id]
+    yield {"type": "node", "depth": 0, "paper": root.model_dump()}
+
+    for level in range(1, depth + 1):
+        next_frontier: list[str] = []
+        tasks = [t for d in directions for t in crawler.tasks(frontier, d)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                batch_direction, neighbours = await next_done
+                for node_id, papers in neighbours.items():
+                    for paper in papers:
+                        if paper.paper_id not in seen:
+                            if len(seen) >= max_nodes:
+                                truncated = True
+                                continue
+                            seen.add(paper.paper_id)
+                            next_frontier.append(paper.paper_id)
+                            yield {"type": "node", "depth": level, "paper": paper.model_dump()}
+                        edge = (
+                            (node_id, paper.paper_id) if batch_direction == "references"
+                            else (paper.paper_id, node_id)
+                        )
+                        if edge not in edges:
+                            edges.add(edge)
+                            yield {"type": "edge", "source": edge[0], "target": edge[1]}
+        finally:
+            for task in tasks:
+                task.cancel()
+        frontier = next_frontier
+        if not frontier:
+            break
+
+    yield {"type": "done", "nodes": len(seen), "edges": len(edges), "truncated": truncated}
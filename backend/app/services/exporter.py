@@ -0,0 +1,160 @@
+"""Streaming citation export (BibTeX, RIS, CSV).
+
+Papers are pulled from an async source one batch at a time and formatted
+straight into the response, so memory stays flat however many papers are
+exported and the first bytes go out before the last page is fetched.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import re
+from collections.abc import AsyncIterator
+
+from app.models.paper import Paper
+from app.services.paper_aggregator import fetch_papers_by_ids, search_papers
+
+FORMATS = {
+    "bibtex": ("application/x-bibtex; charset=utf-8", "bib"),
+    "ris": ("application/x-research-info-systems; charset=utf-8", "ris"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+_CSV_COLUMNS = ["paper_id", "title", "authors", "published_date", "source", "url", "pdf_url", "abstract"]
+_EXPORT_PAGE_SIZE = 50
+
+
+# ── Sources ──────────────────────────────────────────────────
+
+async def iter_search_results(
+    query: str,
+    max_results: int,
+    source: str | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+) -> AsyncIterator[list[Paper]]:
+    """Yield successive pages of ``search_papers`` until exhausted."""
+    exported = 0
+    page = 1
+    # Pages are deduplicated independently, so the same paper can show up
+    # on two pages. Tracking IDs is bounded by max_results.
+    seen: set[str] = set()
+    while exported < max_results:
+        result = await search_papers(
+            query=query,
+            page=page,
+            per_page=_EXPORT_PAGE_SIZE,
+            source=source,
+            year_from=year_from,
+            year_to=year_to,
+        )
+        batch = [p for p in result.papers if p.paper_id not in seen][: max_results - exported]
+        seen.update(p.paper_id for p in batch)
+        if batch:
+            exported += len(batch)
+            yield batch
+        if not result.has_more or not result.papers:
+            break
+        page += 1
+
+
+async def iter_papers_by_ids(paper_ids: list[str]) -> AsyncIterator[list[Paper]]:
+    """Yield papers for *paper_ids* in order, looking them up in batches."""
+    for i in range(0, len(paper_ids), _EXPORT_PAGE_SIZE):
+        chunk = paper_ids[i:i + _EXPORT_PAGE_SIZE]
+        found = await fetch_papers_by_ids(chunk)
+        batch = [found[pid] for pid in chunk if pid in found]
+        if batch:
+            yield batch
+
+
+# ── Formatters ───────────────────────────────────────────────
+
+def _year(paper: Paper) -> str:
+    return (paper.published_date or "")[:4]
+
+
+def _bibtex_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("{", "\\{").replace("}", "\\}")
+
+
+def bibtex_key(paper: Paper) -> str:
+    # Same "lastname + year" scheme as the app's CitationFormatter, plus a
+    # short paper_id hash so keys stay unique without tracking used keys.
+    last = paper.authors[0].split()[-1].lower() if paper.authors and paper.authors[0].split() else "unknown"
+    last = re.sub(r"[^a-z0-9]", "", last) or "unknown"
+    suffix = hashlib.sha1(paper.paper_id.encode()).hexdigest()[:4]
+    return f"{last}{_year(paper) or 'nd'}{suffix}"
+
+
+def format_bibtex(paper: Paper) -> str:
+    lines = [f"@article{{{bibtex_key(paper)},", f"  title     = {{{_bibtex_escape(paper.title)}}},"]
+    if paper.authors:
+        lines.append(f"  author    = {{{_bibtex_escape(' and '.join(paper.authors))}}},")
+    if _year(paper):
+        lines.append(f"  year      = {{{_year(paper)}}},")
+    if paper.url:
+        lines.append(f"  url       = {{{paper.url}}},")
+    if paper.abstract:
+        lines.append(f"  abstract  = {{{_bibtex_escape(paper.abstract)}}},")
+    lines.append("}\n")
+    return "\n".join(lines) + "\n"
+
+
+def _ris_value(value: str) -> str:
+    # RIS is one tag per line: a newline inside a value (common in
+    # abstracts) would start a line readers reject or misparse
+    return " ".join(value.split())
+
+
+def format_ris(paper: Paper) -> str:
+    fields = [("TY", "JOUR"), ("TI", paper.title)]
+    fields.extend(("AU", author) for author in paper.authors)
+    if _year(paper):
+        fields.append(("PY", _year(paper)))
+    if paper.published_date:
+        fields.append(("DA", paper.published_date.replace("-", "/")))
+    if paper.abstract:
+        fields.append(("AB", paper.abstract))
+    if paper.url:
+        fields.append(("UR", paper.url))
+    if paper.pdf_url:
+        fields.append(("L1", paper.pdf_url))
+    fields.append(("ID", paper.paper_id))
+    lines = [f"{tag}  - {_ris_value(value)}" for tag, value in fields]
+    lines.append("ER  - ")
+    return "\n".join(lines) + "\n\n"
+
+
+def _csv_rows(rows: list[list[str]]) -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    return buf.getvalue()
+
+
+def _csv_row(paper: Paper) -> list[str]:
+    return [
+        paper.paper_id,
+        paper.title,
+        "; ".join(paper.authors),
+        paper.published_date or "",
+        paper.source,
+        paper.url,
+        paper.pdf_url,
+        paper.abstract,
+    ]
+
+
+async def export_stream(batches: AsyncIterator[list[Paper]], fmt: str) -> AsyncIterator[str]:
+    """Format each batch as soon as it arrives."""
+    if fmt == "csv":
+        yield _csv_rows([_CSV_COLUMNS])
+    async for batch in batches:
+        if fmt == "bibtex":
+            yield "".join(format_bibtex(p) for p in batch)
+        elif fmt == "ris":
+            yield "".join(format_ris(p) for p in batch)
+        else:
+            yield _csv_rows([_csv_row(p) for p in batch])
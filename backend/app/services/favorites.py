@@ -0,0 +1,168 @@
+"""Per-user membership index of favorited papers.
+
+Search results carry an ``is_favorite`` flag for the signed-in user. The
+flag comes from an in-memory set of the user's favorited ``paper_id``s,
+kept per worker and brought up to date with the same keyset cursor as
+``/api/favorites/sync``: a refresh fetches only the favorites and
+tombstones written since the last one (two PostgREST requests, usually
+empty), so marking a 50-result page is one set lookup per paper instead
+of a query per item or a reload of the whole table.
+
+Unlike ``/sync``, a refresh also applies rows younger than the settle
+horizon, so a paper saved or removed a moment ago is flagged right away.
+The cursor stops before them, and they are read again until they settle.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from app.config import get_settings
+from app.models.paper import FlaggedSearchResult, PaperSearchResult, SearchPaper
+from app.services.supabase_client import SupabaseError, user_client
+
+logger = logging.getLogger(__name__)
+
+# Timestamps come from now() at transaction start, so a slow transaction can
+# commit a row stamped earlier than one already handed out. Rows younger than
+# this are held back until every writer that could precede them has committed.
+SETTLE = timedelta(seconds=5)
+
+_PAGE_SIZE = 1000
+_MAX_USERS = 1024  # membership sets kept in memory per worker
+
+
+def keyset_params(
+    user_id: str, column: str, position: list[str] | None, horizon: str | None, limit: int
+) -> dict[str, Any]:
+    """Next page after ``position`` in ``(user_id, column, id)`` index order,
+    up to ``horizon`` if given."""
+    params: dict[str, Any] = {
+        "user_id": f"eq.{user_id}",
+        "order": f"{column}.asc,id.asc",
+        "limit": limit + 1,  # one extra row tells us whether more remain
+    }
+    if horizon is not None:
+        params[column] = f'lt."{horizon}"'
+    if position:
+        ts, row_id = position
+        params["or"] = f'({column}.gt."{ts}",and({column}.eq."{ts}",id.gt.{row_id}))'
+    return params
+
+
+class FavoriteSet:
+    """One user's favorited paper IDs and the sync position they reflect."""
+
+    def __init__(self) -> None:
+        self.paper_ids: frozenset[str] = frozenset()
+        self._rows: dict[str, str] = {}  # favorites.id -> paper_id
+        self._position: dict[str, list[str] | None] = {"f": None, "t": None}
+        self._refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._refreshed_at is not None
+
+    def _fresh(self, max_age: float) -> bool:
+        return self.built and time.monotonic() - self._refreshed_at < max_age
+
+    async def ensure_fresh(self, user_id: str, access_token: str, max_age: float) -> None:
+        """Refresh unless the last refresh is under ``max_age`` seconds old;
+        concurrent callers share one refresh."""
+        if self._fresh(max_age):
+            return
+        async with self._lock:
+            if not self._fresh(max_age):
+                await self.refresh(user_id, access_token)
+
+    async def refresh(self, user_id: str, access_token: str) -> None:
+        """Apply the favorites and tombstones written since the last refresh."""
+        client = user_client(access_token)
+        horizon = datetime.now(timezone.utc) - SETTLE
+        page = dict(self._position)  # where the next page starts
+        position = dict(self._position)  # where the next refresh starts
+        added: dict[str, str] = {}
+        deleted: set[str] = set()
+        while True:
+            rows, tombstones = await asyncio.gather(
+                client.select(
+                    "favorites",
+                    {"select": "id,paper_id,updated_at",
+                     **keyset_params(user_id, "updated_at", page["f"], None, _PAGE_SIZE)},
+                ),
+                client.select(
+                    "favorite_tombstones",
+                    {"select": "id,deleted_at",
+                     **keyset_params(user_id, "deleted_at", page["t"], None, _PAGE_SIZE)},
+                ),
+            )
+            has_more = len(rows) > _PAGE_SIZE or len(tombstones) > _PAGE_SIZE
+            rows, tombstones = rows[:_PAGE_SIZE], tombstones[:_PAGE_SIZE]
+            added.update((r["id"], r["paper_id"]) for r in rows)
+            deleted.update(t["id"] for t in tombstones)
+            for stream, items, column in (("f", rows, "updated_at"), ("t", tombstones, "deleted_at")):
+                for item in items:
+                    page[stream] = [item[column], item["id"]]
+                    if _parse_ts(item[column]) < horizon:
+                        position[stream] = page[stream]
+            if not has_more:
+                break
+
+        # A deleted row never comes back (re-adding a paper makes a new row),
+        # so deletes win regardless of which stream reported them first
+        if added or deleted:
+            self._rows.update(added)
+            for row_id in deleted:
+                self._rows.pop(row_id, None)
+            self.paper_ids = frozenset(self._rows.values())
+        self._position = position
+        self._refreshed_at = time.monotonic()
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+_sets: OrderedDict[str, FavoriteSet] = OrderedDict()
+
+
+async def favorite_ids(user_id: str, access_token: str) -> frozenset[str] | None:
+    """The paper IDs ``user_id`` has favorited, or ``None`` if unknown.
+
+    The set is reused for ``FAVORITES_INDEX_REFRESH`` seconds; concurrent
+    searches by the same user share one refresh. If Supabase is down the
+    last known set is returned.
+    """
+    favorites = _sets.get(user_id)
+    if favorites is None:
+        favorites = _sets[user_id] = FavoriteSet()
+        while len(_sets) > _MAX_USERS:
+            _sets.popitem(last=False)
+    _sets.move_to_end(user_id)
+
+    try:
+        await favorites.ensure_fresh(
+            user_id, access_token, get_settings().favorites_index_refresh
+        )
+    except SupabaseError as exc:
+        logger.warning("Favorites index refresh failed for %s: %s", user_id, exc)
+    return favorites.paper_ids if favorites.built else None
+
+
+def mark_favorites(result: PaperSearchResult, saved: frozenset[str]) -> FlaggedSearchResult:
+    """``result`` with each paper's ``is_favorite`` set from ``saved``.
+
+    The flag lives on the search-only ``SearchPaper``, so cached pages and
+    every other ``Paper`` payload stay free of per-user state.
+    """
+    papers = [
+        SearchPaper.model_construct(**dict(p), is_favorite=p.paper_id in saved)
+        for p in result.papers
+    ]
+    return FlaggedSearchResult.model_construct(**{**dict(result), "papers": papers})
@@ -1,13 +1,32 @@
-"""Google Gemini summarization service."""
+"""Google Gemini summarization service.
+
+Every call goes through :func:`_generate`, which picks a model tier by
+input size — the light model for abstract-sized prompts, the strong one
+for long prompts and PDFs — and falls back along the chain when a model
+times out, is rate limited or has a server error. Fallback answers are
+not cached, so the next request tries the preferred model again.
+Per-model latency and failure counts are kept and exported at
+``/metrics``.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from typing import TYPE_CHECKING, Any
 
-import google.generativeai as genai
 import httpx
 
+from app import metrics
+from app.cache import cached
+from app.cache.codec import GENERATED_TEXT_CODEC
 from app.config import get_settings
+from app.models.paper import GeneratedText
+from app.services.source_routing import SourceStats
+
+if TYPE_CHECKING:
+    from types import ModuleType
 
 logger = logging.getLogger(__name__)
 
@@ -17,29 +36,148 @@ _LANGUAGE_NAMES = {
     "kk": "Kazakh",
 }
 
-_MODEL_NAME = "gemini-2.5-flash"
-_configured = False
+_genai_module: ModuleType | None = None
 _PDF_TIMEOUT = httpx.Timeout(30.0)
 _MAX_PDF_SIZE = 20 * 1024 * 1024  # 20 MB
 
 
-def _configure() -> None:
-    global _configured
-    if _configured:
-        return
+def _genai() -> ModuleType:
+    """Import and configure the Gemini SDK on first use.
+
+    ``google.generativeai`` pulls in protobuf and grpc and accounts for
+    about half of the backend's import time, so it is kept out of module
+    load for workers that never serve ``/api/ai``.
+    """
+    global _genai_module
+    if _genai_module is None:
+        import google.generativeai as genai
+
+        settings = get_settings()
+        options = {"api_endpoint": settings.gemini_api_endpoint} if settings.gemini_api_endpoint else None
+        genai.configure(api_key=settings.gemini_api_key, client_options=options)
+        _genai_module = genai
+    return _genai_module
+
+
+async def _load_genai() -> ModuleType:
+    # The first import takes hundreds of milliseconds — do it off the loop.
+    if _genai_module is not None:
+        return _genai_module
+    return await asyncio.to_thread(_genai)
+
+
+async def warm_up() -> None:
+    """Load the Gemini SDK ahead of the first AI request."""
+    try:
+        await _load_genai()
+    except Exception:
+        logger.exception("Gemini SDK warm-up failed")
+
+
+# ── Model routing ────────────────────────────────────────────
+
+_model_stats = SourceStats()
+_calls = metrics.Counter("ai_model_calls_total", "Gemini calls by model and outcome")
+
+
+def model_chain(size: int) -> list[str]:
+    """Models to try, in order, for an input of ``size`` characters (or PDF bytes)."""
     settings = get_settings()
-    genai.configure(api_key=settings.gemini_api_key)
-    _configured = True
+    light, strong = settings.ai_model_light, settings.ai_model_strong
+    tiers = [light, strong] if size <= settings.ai_light_max_chars else [strong, light]
+    extra = [m.strip() for m in settings.ai_model_fallbacks.split(",") if m.strip()]
+    return list(dict.fromkeys(tiers + extra))
+
+
+def _record(name: str, started: float, outcome: str) -> None:
+    _model_stats.record(name, time.monotonic() - started, error=outcome != "ok")
+    _calls.inc(model=name, outcome=outcome)
 
 
+async def _call_model(genai: ModuleType, name: str, contents: Any) -> str:
+    started = time.monotonic()
+    try:
+        response = await asyncio.wait_for(
+            genai.GenerativeModel(name).generate_content_async(contents),
+            get_settings().ai_model_timeout,
+        )
+        text = response.text or ""
+    except asyncio.TimeoutError:
+        _record(name, started, "timeout")
+        raise
+    except Exception:
+        _record(name, started, "error")
+        raise
+    _record(name, started, "ok")
+    return text
+
+
+def _retryable(exc: Exception) -> bool:
+    """Timeouts, 429s and 5xx errors. Anything else (a bad request, a
+    blocked prompt, a rejected key) would fail on the next model too."""
+    if isinstance(exc, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+    else:
+        status = getattr(exc, "code", None)  # google.api_core errors carry the HTTP status
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+async def _generate(contents: Any, size: int) -> GeneratedText:
+    """Run ``contents`` on the first model in the chain that answers."""
+    genai = await _load_genai()
+    chain = model_chain(size)
+    for name, fallback in zip(chain, chain[1:]):
+        try:
+            text = await _call_model(genai, name, contents)
+            return GeneratedText(text=text, model=name, fallback=name != chain[0])
+        except Exception as exc:
+            if not _retryable(exc):
+                raise
+            logger.warning("Gemini model %s failed (%r); falling back to %s", name, exc, fallback)
+    text = await _call_model(genai, chain[-1], contents)
+    return GeneratedText(text=text, model=chain[-1], fallback=len(chain) > 1)
+
+
+def _cacheable(result: GeneratedText) -> bool:
+    return bool(result.text) and not result.fallback
+
+
+def _model_metrics():
+    names = _model_stats.names()
+    if not names:
+        return
+    yield "# HELP ai_model_latency_seconds Gemini call latency over each model's recent calls"
+    yield "# TYPE ai_model_latency_seconds summary"
+    for name in names:
+        summary = _model_stats.summary(name)
+        yield metrics.sample("ai_model_latency_seconds", summary.p50, model=name, quantile="0.5")
+        yield metrics.sample("ai_model_latency_seconds", summary.p95, model=name, quantile="0.95")
+    yield "# HELP ai_model_error_ratio Share of each model's recent calls that failed"
+    yield "# TYPE ai_model_error_ratio gauge"
+    for name in names:
+        yield metrics.sample("ai_model_error_ratio", _model_stats.summary(name).error_rate, model=name)
+
+
+metrics.register_collector(_model_metrics)
+
+
+# ── Prompts ──────────────────────────────────────────────────
+
+
+@cached(
+    "summary",
+    GENERATED_TEXT_CODEC,
+    ttl=lambda: get_settings().ai_cache_ttl,
+    should_cache=_cacheable,
+)
 async def summarize_paper(
     title: str,
     abstract: str,
     language: str = "en",
-) -> str:
+) -> GeneratedText:
     """Return a concise summary of the paper in the requested language."""
-    _configure()
-
     lang_name = _LANGUAGE_NAMES.get(language, "English")
 
     prompt = (
@@ -55,18 +193,11 @@ async def summarize_paper(
         f"Write the summary ENTIRELY in {lang_name}."
     )
 
-    model = genai.GenerativeModel(_MODEL_NAME)
-    response = await model.generate_content_async(prompt)
-    return response.text or ""
+    return await _generate(prompt, size=len(prompt))
 
 
-async def analyze_pdf(pdf_url: str, language: str = "en") -> str:
-    """Download a PDF and analyze it with Gemini."""
-    _configure()
-
-    lang_name = _LANGUAGE_NAMES.get(language, "English")
-
-    # Download PDF
+async def download_pdf(pdf_url: str) -> bytes:
+    """Fetch a PDF, raising ``ValueError`` if it isn't one or is too large."""
     async with httpx.AsyncClient(timeout=_PDF_TIMEOUT, follow_redirects=True) as client:
         resp = await client.get(pdf_url)
         resp.raise_for_status()
@@ -78,6 +209,19 @@ async def analyze_pdf(pdf_url: str, language: str = "en") -> str:
     pdf_bytes = resp.content
     if len(pdf_bytes) > _MAX_PDF_SIZE:
         raise ValueError(f"PDF exceeds maximum size of {_MAX_PDF_SIZE // (1024*1024)} MB")
+    return pdf_bytes
+
+
+@cached(
+    "pdf-analysis",
+    GENERATED_TEXT_CODEC,
+    ttl=lambda: get_settings().ai_cache_ttl,
+    should_cache=_cacheable,
+)
+async def analyze_pdf(pdf_url: str, language: str = "en") -> GeneratedText:
+    """Download a PDF and analyze it with Gemini."""
+    lang_name = _LANGUAGE_NAMES.get(language, "English")
+    pdf_bytes = await download_pdf(pdf_url)
 
     prompt = (
         f"You are an expert scientific research assistant.\n"
@@ -92,9 +236,87 @@ async def analyze_pdf(pdf_url: str, language: str = "en") -> str:
         f"Write the analysis ENTIRELY in {lang_name}."
     )
 
-    model = genai.GenerativeModel(_MODEL_NAME)
-    response = await model.generate_content_async([
-        prompt,
-        {"mime_type": "application/pdf", "data": pdf_bytes},
-    ])
-    return response.text or ""
+    return await _generate(
+        [prompt, {"mime_type": "application/pdf", "data": pdf_bytes}], size=len(pdf_bytes)
+    )
+
+
+@cached(
+    "synthesis",
+    GENERATED_TEXT_CODEC,
+    ttl=lambda: get_settings().ai_cache_ttl,
+    should_cache=_cacheable,
+)
+async def synthesize_notes(
+    notes: list[str], language: str = "en", final: bool = False
+) -> GeneratedText:
+    """Merge per-paper notes (or earlier partial syntheses) into one text.
+
+    Notes cite papers as ``[n]``; the merged text keeps those markers so the
+    final literature review can still point at individual papers.
+    """
+    lang_name = _LANGUAGE_NAMES.get(language, "English")
+    if final:
+        task = (
+            f"Write a literature review (4-8 paragraphs) in {lang_name} synthesizing them:\n"
+            f"1. The main research themes and how the papers relate\n"
+            f"2. Points of agreement and disagreement between findings\n"
+            f"3. Common methods and their trade-offs\n"
+            f"4. Open questions and gaps in the collection\n"
+        )
+    else:
+        task = (
+            f"Condense them into one set of notes in {lang_name} (at most 3 paragraphs) "
+            f"grouping the papers by theme, method and finding. "
+            f"Later these notes will be merged with notes on other papers.\n"
+        )
+    prompt = (
+        f"You are an expert scientific research assistant.\n"
+        f"Below are notes on a collection of academic papers.\n"
+        f"{task}"
+        f"Cite papers with their bracketed numbers, e.g. [3], and keep every number you use.\n\n"
+        + "\n\n---\n\n".join(notes)
+        + f"\n\nWrite ENTIRELY in {lang_name}."
+    )
+
+    return await _generate(prompt, size=len(prompt))
+
+
+async def extract_pdf_text(pdf_bytes: bytes) -> GeneratedText:
+    """Transcribe a PDF to plain text (one call per document; callers cache it
+    unless ``fallback`` is set)."""
+    prompt = (
+        "Transcribe the full text of this PDF document as plain text.\n"
+        "Keep section headings and paragraph breaks, write tables as plain rows "
+        "and each figure caption on its own line. Leave out page headers, footers "
+        "and page numbers. Do not summarize, translate or comment."
+    )
+
+    return await _generate(
+        [prompt, {"mime_type": "application/pdf", "data": pdf_bytes}], size=len(pdf_bytes)
+    )
+
+
+@cached(
+    "pdf-answer",
+    GENERATED_TEXT_CODEC,
+    ttl=lambda: get_settings().ai_cache_ttl,
+    should_cache=_cacheable,
+)
+async def answer_from_passages(
+    question: str, passages: list[str], language: str = "en"
+) -> GeneratedText:
+    """Answer a question about a paper from retrieved passages only."""
+    lang_name = _LANGUAGE_NAMES.get(language, "English")
+
+    prompt = (
+        f"You are an expert scientific research assistant.\n"
+        f"Answer the question about an academic paper using ONLY the numbered "
+        f"passages from it below. Cite the passages you rely on, e.g. [2]. "
+        f"If the passages do not contain the answer, say so.\n\n"
+        + "\n\n".join(f"[{i}] {p}" for i, p in enumerate(passages, 1))
+        + f"\n\nQuestion: {question}\n\n"
+        f"Answer ENTIRELY in {lang_name}."
+    )
+
+    return await _generate(prompt, size=len(prompt))
@@ -3,20 +3,78 @@
 from __future__ import annotations
 
 import asyncio
+import json
 import logging
+import re
 import xml.etree.ElementTree as ET
+from collections import defaultdict
+from collections.abc import Awaitable
+from datetime import datetime, time, timezone
+from typing import NamedTuple
 
 import httpx
 
-from app.models.paper import Paper, PaperSearchResult, SourceStatus
+from app.cache import cached, get_cache, make_key
+from app.cache.codec import FACETS_CODEC, JSON_CODEC, SEARCH_RESULT_CODEC, CodecError
+from app.config import get_settings
+from app.models.paper import (
+    MultiSearchEntry,
+    MultiSearchResult,
+    Paper,
+    PaperFacets,
+    PaperSearchResult,
+    SearchSpec,
+    SourceStatus,
+    SourceTotal,
+    YearCount,
+)
+from app.offload import run_cpu
+from app.services import similarity
+from app.services.source_routing import SourceStats
 
 logger = logging.getLogger(__name__)
 
-_ARXIV_API = "https://export.arxiv.org/api/query"
-_OPENALEX_API = "https://api.openalex.org/works"
-_SEM_SCHOLAR_API = "https://api.semanticscholar.org/graph/v1/paper/search"
-
 _TIMEOUT = httpx.Timeout(20.0)
+_ARXIV_NS = {
+    "atom": "http://www.w3.org/2005/Atom",
+    "opensearch": "http://a9.com/-/spec/opensearch/1.1/",
+}
+_ARXIV_VERSION = re.compile(r"v\d+$")
+_OPENALEX_HEADERS = {"User-Agent": "ResearchHubV2/1.0 (mailto:dev@researchhub.local)"}
+_OPENALEX_SELECT = "id,title,authorships,publication_date,open_access,abstract_inverted_index"
+_S2_FIELDS = "paperId,title,authors,abstract,year,externalIds,url,openAccessPdf"
+
+# Max IDs per lookup request, per source
+_ID_BATCH_SIZE = {"arxiv": 100, "openalex": 50, "s2": 500}
+
+# Search responses are parsed by module-level functions that may run in a
+# worker process (see app.offload). They return one tuple per paper, in
+# Paper field order, and the models are built back on the event loop.
+_PaperRow = tuple[str, str, list[str], str, str | None, str, str, str]
+_PAPER_FIELDS = tuple(Paper.model_fields)
+
+
+def _to_paper(row: _PaperRow) -> Paper:
+    return Paper(**dict(zip(_PAPER_FIELDS, row)))
+
+
+# Upstream base URLs come from settings so load tests can point them at
+# local stand-ins (see benchmarks/loadtest).
+
+def _arxiv_api() -> str:
+    return get_settings().arxiv_api_url
+
+
+def _openalex_api() -> str:
+    return f"{get_settings().openalex_api_url.rstrip('/')}/works"
+
+
+def _s2_paper_api() -> str:
+    return f"{get_settings().semantic_scholar_api_url.rstrip('/')}/paper"
+
+
+def _s2_search_api() -> str:
+    return f"{_s2_paper_api()}/search"
 
 
 # ── arXiv ────────────────────────────────────────────────────
@@ -42,15 +100,24 @@ async def _search_arxiv(
         "sortOrder": "descending",
     }
     async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-        resp = await client.get(_ARXIV_API, params=params)
+        resp = await client.get(_arxiv_api(), params=params)
         resp.raise_for_status()
 
-    ns = {"atom": "http://www.w3.org/2005/Atom"}
-    root = ET.fromstring(resp.text)
-    papers: list[Paper] = []
+    rows = await run_cpu(
+        _parse_arxiv_feed, resp.content, max_results, year_from, year_to, size=len(resp.content)
+    )
+    return [_to_paper(row) for row in rows]
 
-    for entry in root.findall("atom:entry", ns):
-        published_raw = (entry.findtext("atom:published", "", ns) or "")[:10]
+
+def _parse_arxiv_feed(
+    content: bytes,
+    max_results: int,
+    year_from: int | None,
+    year_to: int | None,
+) -> list[_PaperRow]:
+    rows: list[_PaperRow] = []
+    for entry in ET.fromstring(content).findall("atom:entry", _ARXIV_NS):
+        published_raw = (entry.findtext("atom:published", "", _ARXIV_NS) or "")[:10]
         if year_from or year_to:
             try:
                 pub_year = int(published_raw[:4])
@@ -61,32 +128,43 @@ async def _search_arxiv(
             if year_to and pub_year > year_to:
                 continue
 
-        arxiv_id = (entry.findtext("atom:id", "", ns) or "").split("/abs/")[-1]
-        title = (entry.findtext("atom:title", "", ns) or "").strip().replace("\n", " ")
-        abstract = (entry.findtext("atom:summary", "", ns) or "").strip().replace("\n", " ")
-        authors = [
-            a.findtext("atom:name", "", ns)
-            for a in entry.findall("atom:author", ns)
-        ]
+        rows.append(_arxiv_entry_row(entry))
+        if len(rows) == max_results:
+            break
+    return rows
+
+
+def _arxiv_entry_to_paper(entry: ET.Element) -> Paper:
+    return _to_paper(_arxiv_entry_row(entry))
 
-        pdf_url = ""
-        for link in entry.findall("atom:link", ns):
-            if link.get("title") == "pdf":
-                pdf_url = link.get("href", "")
-                break
 
-        papers.append(Paper(
-            paper_id=f"arxiv:{arxiv_id}",
-            title=title,
-            authors=authors,
-            abstract=abstract,
-            published_date=published_raw or None,
-            source="arxiv",
-            url=f"https://arxiv.org/abs/{arxiv_id}",
-            pdf_url=pdf_url,
-        ))
+def _arxiv_entry_row(entry: ET.Element) -> _PaperRow:
+    ns = _ARXIV_NS
+    published_raw = (entry.findtext("atom:published", "", ns) or "")[:10]
+    arxiv_id = (entry.findtext("atom:id", "", ns) or "").split("/abs/")[-1]
+    title = (entry.findtext("atom:title", "", ns) or "").strip().replace("\n", " ")
+    abstract = (entry.findtext("atom:summary", "", ns) or "").strip().replace("\n", " ")
+    authors = [
+        a.findtext("atom:name", "", ns)
+        for a in entry.findall("atom:author", ns)
+    ]
 
-    return papers[:max_results]
+    pdf_url = ""
+    for link in entry.findall("atom:link", ns):
+        if link.get("title") == "pdf":
+            pdf_url = link.get("href", "")
+            break
+
+    return (
+        f"arxiv:{arxiv_id}",
+        title,
+        authors,
+        abstract,
+        published_raw or None,
+        "arxiv",
+        f"https://arxiv.org/abs/{arxiv_id}",
+        pdf_url,
+    )
 
 
 # ── OpenAlex ─────────────────────────────────────────────────
@@ -108,48 +186,51 @@ async def _search_openalex(
         "search": query,
         "per_page": max_results,
         "page": page,
-        "select": "id,title,authorships,publication_date,open_access,abstract_inverted_index",
+        "select": _OPENALEX_SELECT,
     }
     if filters:
         params["filter"] = ",".join(filters)
 
     async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-        resp = await client.get(
-            _OPENALEX_API,
-            params=params,
-            headers={"User-Agent": "ResearchHubV2/1.0 (mailto:dev@researchhub.local)"},
-        )
+        resp = await client.get(_openalex_api(), params=params, headers=_OPENALEX_HEADERS)
         resp.raise_for_status()
 
-    data = resp.json()
-    papers: list[Paper] = []
+    rows = await run_cpu(_parse_openalex_works, resp.content, size=len(resp.content))
+    return [_to_paper(row) for row in rows]
 
-    for work in data.get("results", []):
-        openalex_id = work.get("id", "").split("/")[-1]
-        title = work.get("title") or ""
-        authors = [
-            a.get("author", {}).get("display_name", "")
-            for a in work.get("authorships", [])
-        ]
 
-        # Reconstruct abstract from inverted index
-        abstract = _reconstruct_abstract(work.get("abstract_inverted_index"))
+def _parse_openalex_works(content: bytes) -> list[_PaperRow]:
+    return [_openalex_work_row(work) for work in json.loads(content).get("results", [])]
 
-        oa = work.get("open_access", {}) or {}
-        pdf_url = oa.get("oa_url") or ""
 
-        papers.append(Paper(
-            paper_id=f"openalex:{openalex_id}",
-            title=title,
-            authors=authors,
-            abstract=abstract,
-            published_date=work.get("publication_date"),
-            source="openalex",
-            url=work.get("id", ""),
-            pdf_url=pdf_url,
-        ))
+def _openalex_work_to_paper(work: dict) -> Paper:
+    return _to_paper(_openalex_work_row(work))
 
-    return papers
+
+def _openalex_work_row(work: dict) -> _PaperRow:
+    openalex_id = work.get("id", "").split("/")[-1]
+    title = work.get("title") or ""
+    authors = [
+        a.get("author", {}).get("display_name", "")
+        for a in work.get("authorships", [])
+    ]
+
+    # Reconstruct abstract from inverted index
+    abstract = _reconstruct_abstract(work.get("abstract_inverted_index"))
+
+    oa = work.get("open_access", {}) or {}
+    pdf_url = oa.get("oa_url") or ""
+
+    return (
+        f"openalex:{openalex_id}",
+        title,
+        authors,
+        abstract,
+        work.get("publication_date"),
+        "openalex",
+        work.get("id", ""),
+        pdf_url,
+    )
 
 
 def _reconstruct_abstract(inverted_index: dict | None) -> str:
@@ -176,7 +257,7 @@ async def _search_semantic_scholar(
         "query": query,
         "limit": max_results,
         "offset": offset,
-        "fields": "paperId,title,authors,abstract,year,externalIds,url,openAccessPdf",
+        "fields": _S2_FIELDS,
     }
     if year_from and year_to:
         params["year"] = f"{year_from}-{year_to}"
@@ -186,41 +267,160 @@ async def _search_semantic_scholar(
         params["year"] = f"-{year_to}"
 
     async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
-        resp = await client.get(_SEM_SCHOLAR_API, params=params)
+        resp = await client.get(_s2_search_api(), params=params)
         if resp.status_code == 429:
             return []  # rate-limited – graceful fallback
         resp.raise_for_status()
 
-    data = resp.json()
-    papers: list[Paper] = []
+    rows = await run_cpu(_parse_s2_items, resp.content, size=len(resp.content))
+    return [_to_paper(row) for row in rows]
 
-    for item in data.get("data", []):
-        paper_id = item.get("paperId", "")
-        title = item.get("title") or ""
-        authors = [a.get("name", "") for a in (item.get("authors") or [])]
-        abstract = item.get("abstract") or ""
-        year = item.get("year")
-        pub_date = f"{year}-01-01" if year else None
-
-        oa = item.get("openAccessPdf") or {}
-        pdf_url = oa.get("url", "")
-
-        papers.append(Paper(
-            paper_id=f"s2:{paper_id}",
-            title=title,
-            authors=authors,
-            abstract=abstract,
-            published_date=pub_date,
-            source="semantic_scholar",
-            url=item.get("url") or f"https://www.semanticscholar.org/paper/{paper_id}",
-            pdf_url=pdf_url,
-        ))
 
-    return papers
+def _parse_s2_items(content: bytes) -> list[_PaperRow]:
+    return [_s2_item_row(item) for item in json.loads(content).get("data", [])]
+
+
+def _s2_item_to_paper(item: dict) -> Paper:
+    return _to_paper(_s2_item_row(item))
+
+
+def _s2_item_row(item: dict) -> _PaperRow:
+    paper_id = item.get("paperId", "")
+    title = item.get("title") or ""
+    authors = [a.get("name", "") for a in (item.get("authors") or [])]
+    abstract = item.get("abstract") or ""
+    year = item.get("year")
+    pub_date = f"{year}-01-01" if year else None
+
+    oa = item.get("openAccessPdf") or {}
+    pdf_url = oa.get("url", "")
+
+    return (
+        f"s2:{paper_id}",
+        title,
+        authors,
+        abstract,
+        pub_date,
+        "semantic_scholar",
+        item.get("url") or f"https://www.semanticscholar.org/paper/{paper_id}",
+        pdf_url,
+    )
 
 
 # ── Public API ───────────────────────────────────────────────
 
+def _dedupe_by_title(papers: list[Paper]) -> list[Paper]:
+    """Deduplicate by title (case-insensitive), keeping the first occurrence."""
+    seen: set[str] = set()
+    unique: list[Paper] = []
+    for p in papers:
+        key = p.title.lower().strip()
+        if key not in seen:
+            seen.add(key)
+            unique.append(p)
+    return unique
+
+
+# ── Source routing ───────────────────────────────────────────
+
+_SOURCES = ("arxiv", "openalex", "semantic_scholar")
+_source_stats = SourceStats()
+
+_PLAN_TTL = 600.0  # seconds a query keeps its source plan while it is paged through
+
+
+async def _query_plan(key: str, per_page: int) -> tuple[list[str], list[str]]:
+    """``(primary, fallback)`` for a query, made on its first page and
+    reused for the rest so adjacent pages come from the same sources.
+
+    Plans live in the shared cache, like the pages themselves, so a page
+    served by another worker follows the same plan.
+    """
+    cache = get_cache()
+    try:
+        data = await cache.get(key) if cache is not None else None
+        if data is not None:
+            primary, fallback = JSON_CODEC.loads(data)
+            return primary, fallback
+    except CodecError:
+        pass
+    except Exception as exc:
+        logger.warning("Search plan cache read failed: %s", exc)
+    primary, fallback = _source_stats.plan(list(_SOURCES), per_page)
+    await _store_plan(key, primary, fallback)
+    return primary, fallback
+
+
+async def _store_plan(key: str, primary: list[str], fallback: list[str]) -> None:
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        await cache.set(key, JSON_CODEC.dumps([primary, fallback]), _PLAN_TTL)
+    except Exception as exc:
+        logger.warning("Search plan cache write failed: %s", exc)
+
+
+async def _promote_fallback(key: str, primary: list[str], fallback: list[str]) -> None:
+    """Once a page has needed the fallbacks, query them with the primaries
+    on the following pages too."""
+    await _store_plan(key, primary + fallback, [])
+
+
+def _search_source(
+    name: str,
+    query: str,
+    page: int,
+    per_page: int,
+    year_from: int | None,
+    year_to: int | None,
+) -> Awaitable[list[Paper]]:
+    offset = (page - 1) * per_page
+    if name == "arxiv":
+        return _search_arxiv(query, per_page, offset, year_from, year_to)
+    if name == "openalex":
+        return _search_openalex(query, per_page, page, year_from, year_to)
+    return _search_semantic_scholar(query, per_page, offset, year_from, year_to)
+
+
+async def _timed(call: Awaitable[list[Paper]]) -> tuple[list[Paper] | Exception, float]:
+    """Await a source search, returning ``(papers or exception, seconds)``."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    try:
+        result: list[Paper] | Exception = await call
+    except Exception as exc:
+        result = exc
+    return result, loop.time() - started
+
+
+def _record_source_stats(outcomes: dict[str, tuple[list[Paper] | Exception, float]]) -> None:
+    """Feed latency, yield and cross-source duplicate counts to the router."""
+    titles = {
+        name: {p.title.lower().strip() for p in r}
+        for name, (r, _) in outcomes.items()
+        if isinstance(r, list)
+    }
+    for name, (r, latency) in outcomes.items():
+        if not isinstance(r, list):
+            _source_stats.record(name, latency, error=True)
+            continue
+        others = set().union(*(t for n, t in titles.items() if n != name))
+        duplicates = sum(p.title.lower().strip() in others for p in r)
+        _source_stats.record(name, latency, count=len(r), duplicates=duplicates)
+
+
+@cached(
+    "search",
+    SEARCH_RESULT_CODEC,
+    ttl=lambda: get_settings().search_cache_ttl,
+    # Partial results are not cached so a flaky source recovers on the next call
+    should_cache=lambda result: all(s.ok for s in result.sources),
+    stale_while_revalidate=lambda: get_settings().search_stale_while_revalidate,
+    stale_if_error=lambda: get_settings().search_stale_if_error,
+    is_error=lambda result: not any(s.ok for s in result.sources),
+    mark_stale=lambda result: result.model_copy(update={"stale": True}),
+)
 async def search_papers(
     query: str,
     page: int = 1,
@@ -229,52 +429,87 @@ async def search_papers(
     year_from: int | None = None,
     year_to: int | None = None,
 ) -> PaperSearchResult:
-    """Search across multiple academic sources concurrently."""
-    offset = (page - 1) * per_page
-    tasks: list = []
+    """Search across multiple academic sources concurrently.
 
-    sources = [source] if source else ["arxiv", "openalex", "semantic_scholar"]
+    With ``SEARCH_ROUTING=adaptive`` and no ``source`` filter, only the
+    sources expected to fill the page are queried first; the others are
+    called only if the page is still short after deduplication. The plan
+    is made once per query and shared by all of its pages.
+    """
+    sources = [source] if source else list(_SOURCES)
+    adaptive = source is None and get_settings().search_routing == "adaptive"
+    plan_key = make_key("search-plan", {
+        "query": normalize_query(query),
+        "per_page": per_page,
+        "year_from": year_from,
+        "year_to": year_to,
+    })
+    if adaptive:
+        primary, fallback = await _query_plan(plan_key, per_page)
+    else:
+        primary, fallback = sources, []
 
-    source_names: list[str] = []
-    if "arxiv" in sources:
-        source_names.append("arxiv")
-        tasks.append(_search_arxiv(query, per_page, offset, year_from, year_to))
-    if "openalex" in sources:
-        source_names.append("openalex")
-        tasks.append(_search_openalex(query, per_page, page, year_from, year_to))
-    if "semantic_scholar" in sources:
-        source_names.append("semantic_scholar")
-        tasks.append(_search_semantic_scholar(query, per_page, offset, year_from, year_to))
+    outcomes: dict[str, tuple[list[Paper] | Exception, float]] = {}
+    routing: dict[str, str | None] = {}
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    async def run(names: list[str], label: str | None) -> None:
+        done = await asyncio.gather(
+            *(_timed(_search_source(n, query, page, per_page, year_from, year_to)) for n in names)
+        )
+        outcomes.update(zip(names, done))
+        routing.update((n, label) for n in names)
+
+    await run(primary, "primary" if adaptive else None)
+    if fallback:
+        found = [p for r, _ in outcomes.values() if isinstance(r, list) for p in r]
+        if len(_dedupe_by_title(found)) < per_page:
+            await run(fallback, "fallback")
+            await _promote_fallback(plan_key, primary, fallback)
+        else:
+            for name in fallback:
+                routing[name] = "skipped"
+                _source_stats.skip(name)
+
+    _record_source_stats(outcomes)
 
     all_papers: list[Paper] = []
     source_statuses: list[SourceStatus] = []
-    for name, r in zip(source_names, results):
+    for name in sources:
+        if name not in outcomes:
+            source_statuses.append(SourceStatus(name=name, ok=True, routing=routing[name]))
+            continue
+        r, latency = outcomes[name]
+        latency_ms = round(latency * 1000, 1)
         if isinstance(r, list):
             all_papers.extend(r)
-            source_statuses.append(SourceStatus(name=name, ok=True))
-        elif isinstance(r, Exception):
+            source_statuses.append(
+                SourceStatus(name=name, ok=True, latency_ms=latency_ms, routing=routing[name])
+            )
+        else:
             logger.warning("Source %s failed: %s", name, r)
             source_statuses.append(
-                SourceStatus(name=name, ok=False, error=str(type(r).__name__))
+                SourceStatus(
+                    name=name,
+                    ok=False,
+                    error=str(type(r).__name__),
+                    latency_ms=latency_ms,
+                    routing=routing[name],
+                )
             )
 
-    # Deduplicate by title (case-insensitive)
-    seen: set[str] = set()
-    unique: list[Paper] = []
-    for p in all_papers:
-        key = p.title.lower().strip()
-        if key not in seen:
-            seen.add(key)
-            unique.append(p)
+    unique = _dedupe_by_title(all_papers)
 
     page_papers = unique[:per_page]
+    similarity.observe(page_papers)
     # has_more is True only when we got enough results to fill a page
-    # from at least one source (indicating more data likely exists).
+    # from at least one source (indicating more data likely exists), or
+    # when a source was skipped because the page was already full.
     has_more = len(unique) > per_page or (
         len(page_papers) == per_page
-        and any(isinstance(r, list) and len(r) == per_page for r in results)
+        and (
+            any(isinstance(r, list) and len(r) == per_page for r, _ in outcomes.values())
+            or len(outcomes) < len(sources)
+        )
     )
 
     return PaperSearchResult(
@@ -285,3 +520,557 @@ async def search_papers(
         papers=page_papers,
         sources=source_statuses,
     )
+
+
+async def search_many(specs: list[SearchSpec]) -> MultiSearchResult:
+    """Run several searches at once, as one dashboard request.
+
+    Specs that differ only in the case or spacing of the query share one
+    search, run with the first such spec's query as written; at most
+    ``MULTI_SEARCH_CONCURRENCY`` distinct searches run at a time. Each
+    paper is returned once in ``papers`` — matched by ID, or by title as
+    within a single search — and every entry lists the IDs it found, in
+    rank order.
+    """
+    semaphore = asyncio.Semaphore(max(1, get_settings().multi_search_concurrency))
+
+    async def run(spec: SearchSpec) -> PaperSearchResult:
+        async with semaphore:
+            return await search_papers(
+                query=spec.query,
+                page=spec.page,
+                per_page=spec.per_page,
+                source=spec.source,
+                year_from=spec.year_from,
+                year_to=spec.year_to,
+            )
+
+    distinct: dict[tuple, asyncio.Task] = {}
+    keys: list[tuple] = []
+    for spec in specs:
+        # Normalized only to coalesce: upstream syntax (arXiv AND/OR, quoted
+        # phrases) and GET /search cache keys depend on the query as written
+        key = tuple({**spec.model_dump(), "query": normalize_query(spec.query)}.values())
+        if key not in distinct:
+            distinct[key] = asyncio.ensure_future(run(spec))
+        keys.append(key)
+    await asyncio.gather(*distinct.values(), return_exceptions=True)
+
+    papers: dict[str, Paper] = {}
+    by_title: dict[str, str] = {}
+    results: list[MultiSearchEntry] = []
+    for spec, key in zip(specs, keys):
+        task = distinct[key]
+        entry = MultiSearchEntry(page=spec.page, per_page=spec.per_page)
+        if task.exception() is not None:
+            logger.warning("Search %r failed: %s", spec.query, task.exception())
+            entry.error = type(task.exception()).__name__
+            results.append(entry)
+            continue
+        result: PaperSearchResult = task.result()
+        for paper in result.papers:
+            title = paper.title.lower().strip()
+            paper_id = paper.paper_id if paper.paper_id in papers else by_title.get(title)
+            if paper_id is None:
+                paper_id = paper.paper_id
+                papers[paper_id] = paper
+                by_title.setdefault(title, paper_id)
+            entry.paper_ids.append(paper_id)
+        entry.total = result.total
+        entry.has_more = result.has_more
+        entry.sources = result.sources
+        entry.stale = result.stale
+        results.append(entry)
+    return MultiSearchResult(results=results, papers=papers)
+
+
+# ── Facets ───────────────────────────────────────────────────
+
+async def _openalex_groups(query: str, group_by: str) -> tuple[int, dict[str, int]]:
+    """``(total, {group key: count})`` for a search, without fetching any works."""
+    params = {"search": query, "group_by": group_by}
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_openalex_api(), params=params, headers=_OPENALEX_HEADERS)
+        resp.raise_for_status()
+    data = resp.json()
+    groups = {str(g["key"]): int(g["count"]) for g in data.get("group_by", [])}
+    return int(data.get("meta", {}).get("count", 0)), groups
+
+
+async def _arxiv_total(query: str) -> int:
+    params = {"search_query": f"all:{query}", "max_results": 0}
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_arxiv_api(), params=params)
+        resp.raise_for_status()
+    total = ET.fromstring(resp.content).findtext("opensearch:totalResults", "0", _ARXIV_NS)
+    return int(total or 0)
+
+
+async def _s2_total(query: str) -> int:
+    # S2 reports the total with any page; ask for the smallest one
+    params = {"query": query, "limit": 1, "fields": "paperId"}
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_s2_search_api(), params=params)
+        resp.raise_for_status()
+    return int(resp.json().get("total", 0))
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+
+async def get_facets(query: str) -> PaperFacets:
+    """Year histogram, open-access split and per-source totals for a query.
+
+    Counts come from OpenAlex ``group_by`` and the totals the other sources
+    report, so no result pages are fetched. Cached per normalized query;
+    upstream sources get the query as written, since their own parsers
+    treat case and spacing as they see fit.
+    """
+    facets = await _facets(query)
+    return facets if facets.query == query else facets.model_copy(update={"query": query})
+
+
+@cached(
+    "facets",
+    FACETS_CODEC,
+    ttl=lambda: get_settings().facets_cache_ttl,
+    should_cache=lambda facets: all(s.ok for s in facets.sources),
+    key_arguments=lambda arguments: {"query": normalize_query(arguments["query"])},
+)
+async def _facets(query: str) -> PaperFacets:
+    years, oa, arxiv, s2 = await asyncio.gather(
+        _openalex_groups(query, "publication_year"),
+        _openalex_groups(query, "open_access.is_oa"),
+        _arxiv_total(query),
+        _s2_total(query),
+        return_exceptions=True,
+    )
+    facets = PaperFacets(query=query)
+
+    def total(name: str, outcome: int | Exception) -> SourceTotal:
+        if isinstance(outcome, Exception):
+            logger.warning("Facet counts from %s failed: %s", name, outcome)
+            return SourceTotal(name=name, ok=False, error=type(outcome).__name__)
+        return SourceTotal(name=name, ok=True, total=outcome)
+
+    if isinstance(years, Exception):
+        openalex = total("openalex", years)
+    else:
+        count, groups = years
+        openalex = total("openalex", count)
+        facets.years = sorted(
+            (YearCount(year=int(k), count=v) for k, v in groups.items() if k.isdigit()),
+            key=lambda y: y.year,
+        )
+    if isinstance(oa, Exception):
+        logger.warning("Open-access counts from openalex failed: %s", oa)
+        openalex = openalex.model_copy(update={"ok": False, "error": type(oa).__name__})
+    else:
+        facets.open_access = oa[1].get("true", 0)
+        facets.closed_access = oa[1].get("false", 0)
+    facets.sources.append(openalex)
+    facets.sources.append(total("arxiv", arxiv))
+    facets.sources.append(total("semantic_scholar", s2))
+    return facets
+
+
+# ── Lookup by ID ─────────────────────────────────────────────
+
+async def _fetch_arxiv_ids(ids: list[str]) -> list[Paper]:
+    params = {"id_list": ",".join(ids), "max_results": len(ids)}
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_arxiv_api(), params=params)
+        resp.raise_for_status()
+
+    # Requests without a version suffix get the latest version back
+    requested = {_ARXIV_VERSION.sub("", i): i for i in ids}
+    papers: list[Paper] = []
+    for entry in ET.fromstring(resp.text).findall("atom:entry", _ARXIV_NS):
+        paper = _arxiv_entry_to_paper(entry)
+        returned = paper.paper_id.removeprefix("arxiv:")
+        original = requested.get(_ARXIV_VERSION.sub("", returned))
+        if original is not None:
+            papers.append(paper.model_copy(update={"paper_id": f"arxiv:{original}"}))
+    return papers
+
+
+async def _fetch_openalex_ids(ids: list[str]) -> list[Paper]:
+    params = {
+        "filter": "ids.openalex:" + "|".join(ids),
+        "per_page": len(ids),
+        "select": _OPENALEX_SELECT,
+    }
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_openalex_api(), params=params, headers=_OPENALEX_HEADERS)
+        resp.raise_for_status()
+    return [_openalex_work_to_paper(w) for w in resp.json().get("results", [])]
+
+
+async def _fetch_s2_ids(ids: list[str]) -> list[Paper]:
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.post(
+            f"{_s2_paper_api()}/batch",
+            params={"fields": _S2_FIELDS},
+            json={"ids": ids},
+        )
+        if resp.status_code == 429:
+            return []
+        resp.raise_for_status()
+
+    papers: list[Paper] = []
+    for requested, item in zip(ids, resp.json()):
+        if item:
+            # Keep the caller's ID so lookups by e.g. "arXiv:..." map back
+            paper = _s2_item_to_paper(item)
+            papers.append(paper.model_copy(update={"paper_id": f"s2:{requested}"}))
+    return papers
+
+
+async def fetch_papers_by_ids(paper_ids: list[str]) -> dict[str, Paper]:
+    """Look up papers by ``paper_id``, batching IDs per source.
+
+    Unknown IDs and failed batches are simply missing from the result.
+    """
+    found, _ = await _lookup_ids(paper_ids)
+    return found
+
+
+async def _lookup_ids(paper_ids: list[str]) -> tuple[dict[str, Paper], bool]:
+    """``fetch_papers_by_ids``, plus whether every batch succeeded."""
+    fetchers = {"arxiv": _fetch_arxiv_ids, "openalex": _fetch_openalex_ids, "s2": _fetch_s2_ids}
+    groups: dict[str, list[str]] = defaultdict(list)
+    for paper_id in dict.fromkeys(paper_ids):
+        prefix, _, raw = paper_id.partition(":")
+        if raw and prefix in fetchers:
+            groups[prefix].append(raw)
+
+    tasks = []
+    for prefix, ids in groups.items():
+        size = _ID_BATCH_SIZE[prefix]
+        tasks.extend(fetchers[prefix](ids[i:i + size]) for i in range(0, len(ids), size))
+
+    found: dict[str, Paper] = {}
+    complete = True
+    for result in await asyncio.gather(*tasks, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning("ID lookup batch failed: %s", result)
+            complete = False
+            continue
+        for paper in result:
+            found[paper.paper_id] = paper
+    return found, complete
+
+
+# ── Citation edges ───────────────────────────────────────────
+#
+# Upstream failures (rate limits included) raise rather than return an
+# empty list, so callers that cache edges never store a failure as "no
+# neighbours".
+
+
+class Edges(NamedTuple):
+    papers: dict[str, list[Paper]]
+    complete: bool  # False if some neighbours could not be looked up
+
+
+async def fetch_openalex_references(
+    work_ids: list[str],
+    limit: int,
+) -> Edges:
+    """Return the works referenced by each of *work_ids* (OpenAlex IDs).
+
+    If a lookup of the referenced works fails, the lists are returned
+    short and ``complete`` is False.
+    """
+    params = {
+        "filter": "ids.openalex:" + "|".join(work_ids),
+        "per_page": len(work_ids),
+        "select": "id,referenced_works",
+    }
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(_openalex_api(), params=params, headers=_OPENALEX_HEADERS)
+        resp.raise_for_status()
+
+    referenced: dict[str, list[str]] = {}
+    for work in resp.json().get("results", []):
+        work_id = work.get("id", "").split("/")[-1]
+        referenced[work_id] = [
+            r.split("/")[-1] for r in (work.get("referenced_works") or [])[:limit]
+        ]
+
+    all_refs = [f"openalex:{r}" for refs in referenced.values() for r in refs]
+    papers, complete = await _lookup_ids(all_refs)
+    return Edges(
+        {
+            work_id: [papers[f"openalex:{r}"] for r in refs if f"openalex:{r}" in papers]
+            for work_id, refs in referenced.items()
+        },
+        complete,
+    )
+
+
+_OPENALEX_MAX_PAGE = 200
+
+
+async def _openalex_citing(
+    client: httpx.AsyncClient, work_ids: list[str], limit: int
+) -> tuple[dict[str, list[Paper]], bool]:
+    """Most-cited works citing any of *work_ids*, attributed to each; the
+    flag says whether the page came back full (more citations exist)."""
+    per_page = min(_OPENALEX_MAX_PAGE, len(work_ids) * limit)
+    resp = await client.get(_openalex_api(), headers=_OPENALEX_HEADERS, params={
+        "filter": "cites:" + "|".join(work_ids),
+        "per_page": per_page,
+        "sort": "cited_by_count:desc",
+        "select": _OPENALEX_SELECT + ",referenced_works",
+    })
+    resp.raise_for_status()
+    results = resp.json().get("results", [])
+
+    # Attribute each citing work back to the frontier works it references
+    wanted = set(work_ids)
+    citations: dict[str, list[Paper]] = {work_id: [] for work_id in work_ids}
+    for work in results:
+        paper = _openalex_work_to_paper(work)
+        for ref in work.get("referenced_works") or []:
+            cited = ref.split("/")[-1]
+            if cited in wanted and len(citations[cited]) < limit:
+                citations[cited].append(paper)
+    return citations, len(results) >= per_page
+
+
+async def fetch_openalex_citations(
+    work_ids: list[str],
+    limit: int,
+) -> dict[str, list[Paper]]:
+    """Return up to *limit* most-cited works citing each of *work_ids*.
+
+    One OR-filtered request serves the batch. If its page fills up, a few
+    heavily cited works may have crowded the others out, so every work left
+    with fewer than *limit* citations is re-fetched on its own instead of
+    being returned (and cached) short.
+    """
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        citations, full = await _openalex_citing(client, work_ids, limit)
+        short = [w for w, papers in citations.items() if len(papers) < limit]
+        if full and len(work_ids) > 1 and short:
+            refetched = await asyncio.gather(
+                *(_openalex_citing(client, [work_id], limit) for work_id in short)
+            )
+            for found, _ in refetched:
+                citations.update(found)
+    return citations
+
+
+async def fetch_s2_neighbours(paper_id: str, direction: str, limit: int) -> list[Paper]:
+    """Return references or citations of an S2 paper (``direction`` is
+    ``"references"`` or ``"citations"``). Accepts S2 IDs and ``arXiv:<id>``."""
+    key = "citedPaper" if direction == "references" else "citingPaper"
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        resp = await client.get(
+            f"{_s2_paper_api()}/{paper_id}/{direction}",
+            params={"fields": _S2_FIELDS, "limit": limit},
+        )
+        resp.raise_for_status()  # a 429 too: an empty list would be cached as "no edges"
+
+    return [
+        _s2_item_to_paper(item[key])
+        for item in resp.json().get("data") or []
+        if item.get(key) and item[key].get("paperId")
+    ]
+
+
+# ── Delta polling ────────────────────────────────────────────
+#
+# Each poller returns ``(paper, changed_at)`` pairs for items added or
+# updated since *since* and stops paging as soon as it passes the mark, so
+# the cost tracks the number of new papers rather than the result-set size.
+# Sources that only expose a date are stamped at the end of that day. The
+# second value says whether the poller stopped before it ran out of items
+# (the ``max_results`` cap or a rate limit).
+
+_POLL_PAGE_SIZE = 50
+
+_Delta = tuple[list[tuple[Paper, datetime]], bool]
+
+
+class NewPapers(NamedTuple):
+    papers: list[tuple[Paper, datetime]]
+    failed: list[str]  # sources whose poll raised
+    truncated: list[str]  # sources that had more than was returned
+
+
+def _end_of_day(date_str: str | None) -> datetime | None:
+    if not date_str:
+        return None
+    try:
+        day = datetime.strptime(date_str[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return None
+    return datetime.combine(day, time.max, tzinfo=timezone.utc)
+
+
+def _in_year_range(published: str | None, year_from: int | None, year_to: int | None) -> bool:
+    if not (year_from or year_to):
+        return True
+    try:
+        year = int((published or "")[:4])
+    except ValueError:
+        return False
+    return (not year_from or year >= year_from) and (not year_to or year <= year_to)
+
+
+async def _poll_arxiv(
+    query: str,
+    since: datetime,
+    max_results: int,
+    year_from: int | None,
+    year_to: int | None,
+) -> _Delta:
+    found: list[tuple[Paper, datetime]] = []
+    start = 0
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        while True:
+            resp = await client.get(_arxiv_api(), params={
+                "search_query": f"all:{query}",
+                "start": start,
+                "max_results": _POLL_PAGE_SIZE,
+                "sortBy": "lastUpdatedDate",
+                "sortOrder": "descending",
+            })
+            resp.raise_for_status()
+            entries = ET.fromstring(resp.text).findall("atom:entry", _ARXIV_NS)
+            for entry in entries:
+                updated = datetime.fromisoformat(
+                    (entry.findtext("atom:updated", "", _ARXIV_NS) or "").replace("Z", "+00:00")
+                )
+                if updated < since:
+                    return found[:max_results], len(found) > max_results
+                paper = _arxiv_entry_to_paper(entry)
+                if _in_year_range(paper.published_date, year_from, year_to):
+                    found.append((paper, updated))
+            if len(entries) < _POLL_PAGE_SIZE:
+                return found[:max_results], len(found) > max_results
+            if len(found) >= max_results:
+                return found[:max_results], True
+            start += _POLL_PAGE_SIZE
+
+
+async def _poll_openalex(
+    query: str,
+    since: datetime,
+    max_results: int,
+    year_from: int | None,
+    year_to: int | None,
+) -> _Delta:
+    filters = [f"from_created_date:{since.date().isoformat()}"]
+    if year_from:
+        filters.append(f"from_publication_date:{year_from}-01-01")
+    if year_to:
+        filters.append(f"to_publication_date:{year_to}-12-31")
+
+    found: list[tuple[Paper, datetime]] = []
+    cursor: str | None = "*"
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        while cursor and len(found) < max_results:
+            resp = await client.get(_openalex_api(), headers=_OPENALEX_HEADERS, params={
+                "search": query,
+                "filter": ",".join(filters),
+                "per_page": _POLL_PAGE_SIZE,
+                "cursor": cursor,
+                "select": _OPENALEX_SELECT + ",created_date",
+            })
+            resp.raise_for_status()
+            data = resp.json()
+            for work in data.get("results", []):
+                created = _end_of_day(work.get("created_date")) or since
+                found.append((_openalex_work_to_paper(work), created))
+            if not data.get("results"):
+                break
+            cursor = (data.get("meta") or {}).get("next_cursor")
+    truncated = len(found) > max_results or (bool(cursor) and len(found) >= max_results)
+    return found[:max_results], truncated
+
+
+async def _poll_semantic_scholar(
+    query: str,
+    since: datetime,
+    max_results: int,
+    year_from: int | None,
+    year_to: int | None,
+) -> _Delta:
+    found: list[tuple[Paper, datetime]] = []
+    offset = 0
+    truncated = False
+    async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+        while True:
+            resp = await client.get(_s2_search_api(), params={
+                "query": query,
+                "publicationDateOrYear": f"{since.date().isoformat()}:",
+                "limit": _POLL_PAGE_SIZE,
+                "offset": offset,
+                "fields": _S2_FIELDS + ",publicationDate",
+            })
+            if resp.status_code == 429:
+                truncated = True  # rate-limited – keep what we have
+                break
+            resp.raise_for_status()
+            items = resp.json().get("data") or []
+            for item in items:
+                paper = _s2_item_to_paper(item)
+                if _in_year_range(paper.published_date, year_from, year_to):
+                    found.append((paper, _end_of_day(item.get("publicationDate")) or since))
+            if len(items) < _POLL_PAGE_SIZE:
+                break
+            if len(found) >= max_results:
+                truncated = True
+                break
+            offset += _POLL_PAGE_SIZE
+    return found[:max_results], truncated or len(found) > max_results
+
+
+async def fetch_new_papers(
+    query: str,
+    since: datetime,
+    source: str | None = None,
+    year_from: int | None = None,
+    year_to: int | None = None,
+    max_results: int = 200,
+) -> NewPapers:
+    """Return papers matching *query* that appeared after *since*.
+
+    Results are deduplicated by title across sources; each comes with the
+    timestamp at which its source says it was added or last updated. The
+    sources that failed or had more than ``max_results`` are listed too, so
+    callers don't treat a partial poll as complete.
+    """
+    pollers = {
+        "arxiv": _poll_arxiv,
+        "openalex": _poll_openalex,
+        "semantic_scholar": _poll_semantic_scholar,
+    }
+    names = [source] if source else list(pollers)
+    results = await asyncio.gather(
+        *(pollers[n](query, since, max_results, year_from, year_to) for n in names),
+        return_exceptions=True,
+    )
+
+    stamped: dict[str, datetime] = {}
+    papers: list[Paper] = []
+    failed: list[str] = []
+    truncated: list[str] = []
+    for name, r in zip(names, results):
+        if isinstance(r, Exception):
+            logger.warning("Delta poll of %s failed: %s", name, r)
+            failed.append(name)
+            continue
+        found, cut = r
+        if cut:
+            truncated.append(name)
+        for paper, changed_at in found:
+            stamped.setdefault(paper.paper_id, changed_at)
+            papers.append(paper)
+    return NewPapers(
+        [(p, stamped[p.paper_id]) for p in _dedupe_by_title(papers)], failed, truncated
+    )
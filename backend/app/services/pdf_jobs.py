@@ -0,0 +1,181 @@
+"""Background PDF-analysis jobs.
+
+:func:`submit` returns at once with a job whose ID is derived from
+``(pdf_url, language)``, so resubmitting the same analysis — a client
+retrying after a dropped connection, or another user — returns the
+existing job instead of starting the work again. A bounded pool of worker
+tasks runs queued jobs. Job records live in the result cache, so every
+worker sharing it can report status; finished jobs are kept for
+``AI_JOB_TTL`` and failed ones are retried on the next submit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+from app.cache import MemoryCache, get_cache, make_key
+from app.cache.base import CacheBackend
+from app.config import get_settings
+from app.models.paper import AnalyzePdfJob, AnalyzePdfResponse
+from app.services.gemini_service import analyze_pdf
+
+logger = logging.getLogger(__name__)
+
+_PENDING_TTL = 15 * 60  # queued/running records outlive any single analysis
+_WATCH_POLL = 1.0  # seconds; picks up jobs finished by other workers
+_FINISHED = ("done", "failed")
+
+# Used when CACHE_BACKEND=none; jobs then only work within one worker
+_local_store = MemoryCache()
+
+
+class JobQueueFull(Exception):
+    """Too many jobs are already queued."""
+
+
+@dataclass
+class _Pool:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue[tuple[str, str, str]]
+    workers: set[asyncio.Task] = field(default_factory=set)
+    active: set[str] = field(default_factory=set)  # queued or running here
+    changed: dict[str, asyncio.Event] = field(default_factory=dict)
+
+
+_pool: _Pool | None = None
+
+
+def _store() -> CacheBackend:
+    return get_cache() or _local_store
+
+
+def _key(job_id: str) -> str:
+    return f"pdf-job:{job_id}"
+
+
+def job_id_for(pdf_url: str, language: str) -> str:
+    return make_key("pdf-job", {"pdf_url": pdf_url, "language": language}).partition(":")[2]
+
+
+def _ensure_pool() -> _Pool:
+    global _pool
+    loop = asyncio.get_running_loop()
+    if _pool is None or _pool.loop is not loop:
+        settings = get_settings()
+        _pool = _Pool(loop, asyncio.Queue(maxsize=settings.ai_job_queue_size))
+        for i in range(max(1, settings.ai_job_concurrency)):
+            _pool.workers.add(loop.create_task(_work(_pool), name=f"pdf-job-{i}"))
+    return _pool
+
+
+async def shutdown() -> None:
+    """Cancel the workers; queued jobs expire and are redone on resubmit."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        for task in pool.workers:
+            task.cancel()
+        await asyncio.gather(*pool.workers, return_exceptions=True)
+
+
+async def get_job(job_id: str) -> AnalyzePdfJob | None:
+    data = await _store().get(_key(job_id))
+    return AnalyzePdfJob.model_validate_json(data) if data is not None else None
+
+
+async def _save(job: AnalyzePdfJob) -> None:
+    ttl = get_settings().ai_job_ttl if job.status in _FINISHED else _PENDING_TTL
+    await _store().set(_key(job.job_id), job.model_dump_json().encode(), ttl)
+    if _pool is not None and (event := _pool.changed.pop(job.job_id, None)):
+        event.set()
+
+
+async def _update(job: AnalyzePdfJob, **changes: Any) -> AnalyzePdfJob:
+    job = job.model_copy(update={**changes, "updated_at": datetime.now(timezone.utc)})
+    await _save(job)
+    return job
+
+
+async def submit(pdf_url: str, language: str) -> AnalyzePdfJob:
+    """Queue an analysis, or return the job already covering it.
+
+    Raises :class:`JobQueueFull` when the queue is at ``AI_JOB_QUEUE_SIZE``.
+    """
+    pool = _ensure_pool()
+    job_id = job_id_for(pdf_url, language)
+    existing = await get_job(job_id)
+    if existing is not None and existing.status != "failed":
+        return existing
+
+    now = datetime.now(timezone.utc)
+    job = AnalyzePdfJob(job_id=job_id, status="queued", created_at=now, updated_at=now)
+    if job_id in pool.active:  # submitted concurrently to this worker
+        return await get_job(job_id) or job
+    if pool.queue.full():
+        raise JobQueueFull
+    pool.active.add(job_id)
+    await _save(job)
+    try:
+        pool.queue.put_nowait((job_id, pdf_url, language))
+    except asyncio.QueueFull:
+        pool.active.discard(job_id)
+        await _update(job, status="failed", error="Too many queued jobs")
+        raise JobQueueFull from None
+    return job
+
+
+async def _work(pool: _Pool) -> None:
+    while True:
+        job_id, pdf_url, language = await pool.queue.get()
+        try:
+            await _run(job_id, pdf_url, language)
+        except Exception:
+            logger.exception("PDF job %s could not be recorded", job_id)
+        finally:
+            pool.active.discard(job_id)
+            pool.queue.task_done()
+
+
+async def _run(job_id: str, pdf_url: str, language: str) -> None:
+    job = await get_job(job_id)
+    if job is None:  # expired or evicted while queued
+        now = datetime.now(timezone.utc)
+        job = AnalyzePdfJob(job_id=job_id, status="queued", created_at=now, updated_at=now)
+    job = await _update(job, status="running")
+    try:
+        generated = await analyze_pdf(pdf_url=pdf_url, language=language)
+    except ValueError as exc:
+        await _update(job, status="failed", error=str(exc))
+    except Exception:
+        logger.exception("PDF job %s failed", job_id)
+        await _update(job, status="failed", error="AI service is temporarily unavailable")
+    else:
+        result = AnalyzePdfResponse(
+            analysis=generated.text, language=language, model=generated.model
+        )
+        await _update(job, status="done", result=result)
+
+
+async def watch(job_id: str) -> AsyncIterator[dict[str, Any]]:
+    """Yield the job on every status change until it finishes."""
+    last_status = None
+    while True:
+        job = await get_job(job_id)
+        if job is None:
+            yield {"type": "error", "detail": "Job not found or expired"}
+            return
+        if job.status != last_status:
+            last_status = job.status
+            yield {"type": "job", **job.model_dump(mode="json")}
+        if job.status in _FINISHED:
+            return
+        event = _ensure_pool().changed.setdefault(job_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), _WATCH_POLL)
+        except asyncio.TimeoutError:
+            pass
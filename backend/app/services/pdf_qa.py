@@ -0,0 +1,197 @@
+"""Question answering over a PDF from a local chunk index.
+
+The first question about a document downloads it, has Gemini transcribe
+it once, splits the text into overlapping word windows and caches the
+chunks by the PDF's SHA-256 (and the URL's digest, so later questions
+skip the download too). Questions are matched against the chunks with
+BM25 in-process, and only the top ``PDF_TOP_K`` chunks are sent to the
+model — a few thousand tokens instead of the whole document.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Any
+
+from app.cache import get_cache, make_key
+from app.cache.codec import JSON_CODEC, TEXT_CODEC, Codec, CodecError
+from app.config import get_settings
+from app.models.paper import AskPdfResponse, PdfPassage
+from app.services.gemini_service import answer_from_passages, download_pdf, extract_pdf_text
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"\w{2,}")
+_STOPWORDS = frozenset(
+    "an and are as at be by did do does for from has have how in is it its of on or "
+    "that the this to was we were what when where which who why with".split()
+)
+_K1 = 1.5
+_B = 0.75
+_MAX_INDEXES = 32  # built indexes kept in memory per worker
+
+_indexes: OrderedDict[str, ChunkIndex] = OrderedDict()
+_building: dict[str, asyncio.Future] = {}
+_waiters: Counter[str] = Counter()
+
+
+def _tokens(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_text(text: str, words: int, overlap: int) -> list[str]:
+    """Split ``text`` into windows of ``words`` words, ``overlap`` shared."""
+    tokens = text.split()
+    step = max(1, words - overlap)
+    return [
+        " ".join(tokens[i:i + words])
+        for i in range(0, max(1, len(tokens) - overlap), step)
+        if tokens[i:i + words]
+    ]
+
+
+class ChunkIndex:
+    """Okapi BM25 over a document's chunks."""
+
+    def __init__(self, chunks: list[str]) -> None:
+        self.chunks = chunks
+        self._tf = [Counter(_tokens(chunk)) for chunk in chunks]
+        self._len = [sum(tf.values()) for tf in self._tf]
+        self._avg_len = sum(self._len) / len(chunks) or 1.0
+        df = Counter(term for tf in self._tf for term in tf)
+        n = len(chunks)
+        self._idf = {term: math.log(1 + (n - d + 0.5) / (d + 0.5)) for term, d in df.items()}
+
+    def search(self, query: str, k: int) -> list[tuple[int, float]]:
+        """``(chunk, score)`` for the ``k`` best-matching chunks, best first."""
+        terms = {t for t in _tokens(query) if t in self._idf}
+        scored = []
+        for i, tf in enumerate(self._tf):
+            norm = _K1 * (1 - _B + _B * self._len[i] / self._avg_len)
+            score = sum(
+                self._idf[t] * tf[t] * (_K1 + 1) / (tf[t] + norm) for t in terms if t in tf
+            )
+            if score > 0:
+                scored.append((score, i))
+        return [(i, score) for score, i in heapq.nlargest(k, scored)]
+
+
+# ── Index cache ──────────────────────────────────────────────
+
+
+async def _cache_get(key: str, codec: Codec[Any]) -> Any:
+    cache = get_cache()
+    if cache is None:
+        return None
+    try:
+        data = await cache.get(key)
+        return codec.loads(data) if data is not None else None
+    except CodecError:
+        return None
+    except Exception as exc:
+        logger.warning("PDF index cache read failed: %s", exc)
+        return None
+
+
+async def _cache_set(key: str, codec: Codec[Any], value: Any) -> None:
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        await cache.set(key, codec.dumps(value), get_settings().ai_cache_ttl)
+    except Exception as exc:
+        logger.warning("PDF index cache write failed: %s", exc)
+
+
+def _chunks_key(digest: str) -> str:
+    settings = get_settings()
+    return make_key(
+        "pdf-chunks",
+        {"sha256": digest, "words": settings.pdf_chunk_words, "overlap": settings.pdf_chunk_overlap},
+    )
+
+
+async def _build(pdf_url: str) -> tuple[str, ChunkIndex]:
+    """Download, transcribe and chunk ``pdf_url``, reusing cached chunks.
+
+    A transcription from a fallback model is used for this build only and
+    kept out of both caches, so the primary model gets the next try.
+    """
+    settings = get_settings()
+    url_key = make_key("pdf-digest", {"pdf_url": pdf_url})
+    digest = await _cache_get(url_key, TEXT_CODEC)
+    if digest in _indexes:
+        _indexes.move_to_end(digest)
+        return digest, _indexes[digest]
+    chunks = await _cache_get(_chunks_key(digest), JSON_CODEC) if digest else None
+    if chunks is None:
+        pdf_bytes = await download_pdf(pdf_url)
+        digest = hashlib.sha256(pdf_bytes).hexdigest()
+        # The same document may already be indexed under another URL
+        chunks = await _cache_get(_chunks_key(digest), JSON_CODEC)
+        if chunks is None:
+            generated = await extract_pdf_text(pdf_bytes)
+            chunks = chunk_text(generated.text, settings.pdf_chunk_words, settings.pdf_chunk_overlap)
+            if not chunks:
+                raise ValueError("No text could be extracted from the PDF")
+            if generated.fallback:
+                return digest, ChunkIndex(chunks)
+            await _cache_set(_chunks_key(digest), JSON_CODEC, chunks)
+        await _cache_set(url_key, TEXT_CODEC, digest)
+
+    index = _indexes.get(digest)
+    if index is None:
+        index = _indexes[digest] = ChunkIndex(chunks)
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    _indexes.move_to_end(digest)
+    return digest, index
+
+
+async def load_index(pdf_url: str) -> ChunkIndex:
+    """The chunk index for ``pdf_url``; concurrent first questions share one build.
+
+    The build is cancelled only when every question waiting for it is.
+    """
+    future = _building.get(pdf_url)
+    if future is None:
+        future = _building[pdf_url] = asyncio.ensure_future(_build(pdf_url))
+        future.add_done_callback(lambda _: _building.pop(pdf_url, None))
+    _waiters[pdf_url] += 1
+    try:
+        _, index = await asyncio.shield(future)
+    except asyncio.CancelledError:
+        if _waiters[pdf_url] == 1:
+            future.cancel()
+        raise
+    finally:
+        _waiters[pdf_url] -= 1
+        if not _waiters[pdf_url]:
+            del _waiters[pdf_url]
+    return index
+
+
+async def ask(pdf_url: str, question: str, language: str = "en") -> AskPdfResponse:
+    """Answer ``question`` from the chunks of the PDF that match it best.
+
+    Questions that match no chunk (e.g. "what is this about?") get the
+    opening chunks, where the abstract and introduction are.
+    """
+    index = await load_index(pdf_url)
+    k = max(1, get_settings().pdf_top_k)
+    hits = index.search(question, k) or [(i, 0.0) for i in range(min(k, len(index.chunks)))]
+    hits.sort()  # document order reads better than score order
+    answer = await answer_from_passages(question, [index.chunks[i] for i, _ in hits], language)
+    return AskPdfResponse(
+        answer=answer.text,
+        language=language,
+        passages=[
+            PdfPassage(chunk=i, score=round(score, 3), text=index.chunks[i]) for i, score in hits
+        ],
+    )
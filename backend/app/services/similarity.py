@@ -0,0 +1,344 @@
+"""Similar papers ("more like this") from a memory-mapped vector index.
+
+Every paper the backend sees (search results, favorites) is embedded as a
+signed, hashed TF-IDF vector of its title and abstract and appended to an
+on-disk index in ``SIMILARITY_INDEX_DIR``:
+
+* ``vectors.f32`` — ``capacity x dim`` float32 rows, L2-normalised and
+  memory-mapped, so cosine similarity is a plain dot product and only the
+  pages a query touches are read
+* ``papers.jsonl`` — one ``paper_id<TAB>Paper JSON`` line per row
+* ``df.npy`` — per-bucket document frequencies for the IDF weights
+
+The index is append-only and grows by doubling the vector file. IDF weights
+are taken at insert time, so early rows are weighted against a smaller
+corpus. A process holds an exclusive lock on ``.lock`` in the directory
+while the index is open; other workers pointed at the same directory run
+without the index instead of corrupting it.
+
+A query scans every row: about 36 ms for 300k papers at 256 dimensions,
+bound by memory bandwidth (``benchmarks/bench_similarity.py``). numpy is
+imported by the code that builds or queries the index, so workers with the
+index disabled never load it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import math
+import re
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, one worker only
+    fcntl = None
+
+from app.config import get_settings
+from app.models.paper import Paper
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+_STOPWORDS = frozenset(
+    "an and are as at be by for from has have in is it its of on or that the this "
+    "to was we were which with our these using based paper study results".split()
+)
+_TITLE_WEIGHT = 2  # title tokens count this many times
+_INITIAL_CAPACITY = 4096
+_CHUNK_ROWS = 65536  # rows scored per matrix product
+
+
+# ── Vectorizer ─────────────────────────────────────────────────
+
+
+def _term_counts(paper: Paper) -> Counter[str]:
+    counts: Counter[str] = Counter()
+    for token in _TOKEN.findall(paper.title.lower()):
+        if token not in _STOPWORDS:
+            counts[token] += _TITLE_WEIGHT
+    for token in _TOKEN.findall(paper.abstract.lower()):
+        if token not in _STOPWORDS:
+            counts[token] += 1
+    return counts
+
+
+def _hash_terms(counts: Counter[str], dim: int) -> tuple[np.ndarray, np.ndarray]:
+    """Bucket indices and signed sublinear term frequencies."""
+    import numpy as np
+
+    buckets = np.empty(len(counts), dtype=np.int64)
+    values = np.empty(len(counts), dtype=np.float32)
+    for i, (term, count) in enumerate(counts.items()):
+        h = zlib.crc32(term.encode())
+        buckets[i] = h % dim
+        values[i] = (1.0 + math.log(count)) * (1.0 if h & 0x80000000 else -1.0)
+    return buckets, values
+
+
+# ── Index ──────────────────────────────────────────────────────
+
+
+class IndexLockedError(RuntimeError):
+    """Another process has the index directory open."""
+
+
+class IndexUnavailableError(RuntimeError):
+    """The index is disabled, or held by another worker."""
+
+
+def _lock_directory(directory: Path) -> IO[str]:
+    """Take the directory's writer lock; held until the handle is closed."""
+    handle = (directory / ".lock").open("a")
+    if fcntl is not None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            handle.close()
+            raise IndexLockedError(f"Similarity index at {directory} is in use by another process")
+    return handle
+
+
+class SimilarityIndex:
+    def __init__(self, directory: str | Path, dim: int = 256) -> None:
+        import numpy as np
+
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock_handle = _lock_directory(self.directory)
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._vectors_path = self.directory / "vectors.f32"
+        self._papers_path = self.directory / "papers.jsonl"
+        self._df_path = self.directory / "df.npy"
+
+        meta_path = self.directory / "meta.json"
+        if meta_path.exists():
+            stored = json.loads(meta_path.read_text())["dim"]
+            if stored != dim:
+                raise ValueError(
+                    f"Similarity index at {self.directory} has dim={stored}, expected {dim}"
+                )
+        else:
+            meta_path.write_text(json.dumps({"dim": dim}))
+
+        self._rows: dict[str, int] = {}
+        self._offsets: list[int] = []
+        if self._papers_path.exists():
+            with self._papers_path.open("rb") as f:
+                offset = 0
+                for line in f:
+                    self._rows.setdefault(line.split(b"\t", 1)[0].decode(), len(self._offsets))
+                    self._offsets.append(offset)
+                    offset += len(line)
+
+        self._df = np.load(self._df_path) if self._df_path.exists() else np.zeros(dim)
+        self._docs = float(len(self._offsets))
+
+        capacity = max(_INITIAL_CAPACITY, self._stored_rows())
+        self._matrix = self._open_matrix(capacity)
+        # A crash between writing vectors and metadata leaves extra vectors;
+        # metadata lines are the source of truth for the row count.
+        self._count = min(len(self._offsets), len(self._matrix))
+
+    def close(self) -> None:
+        """Flush the vectors and release the directory lock."""
+        with self._lock:
+            self._matrix.flush()
+            self._lock_handle.close()
+
+    def _stored_rows(self) -> int:
+        if not self._vectors_path.exists():
+            return 0
+        return self._vectors_path.stat().st_size // (self.dim * 4)
+
+    def _open_matrix(self, capacity: int) -> np.memmap:
+        import numpy as np
+
+        with self._vectors_path.open("ab") as f:
+            if f.tell() < capacity * self.dim * 4:
+                f.truncate(capacity * self.dim * 4)
+        return np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, paper_id: object) -> bool:
+        return paper_id in self._rows
+
+    def embed(self, paper: Paper) -> np.ndarray:
+        """Unit-length query vector for ``paper`` using the current IDF."""
+        buckets, values = _hash_terms(_term_counts(paper), self.dim)
+        return self._weight(buckets, values)
+
+    def _weight(self, buckets: np.ndarray, values: np.ndarray) -> np.ndarray:
+        import numpy as np
+
+        idf = np.log((1.0 + self._docs) / (1.0 + self._df[buckets])) + 1.0
+        vector = np.zeros(self.dim, dtype=np.float32)
+        np.add.at(vector, buckets, values * idf.astype(np.float32))
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def add(self, papers: Iterable[Paper]) -> int:
+        """Append papers not yet indexed; returns how many were added."""
+        import numpy as np
+
+        with self._lock:
+            fresh: dict[str, Paper] = {}
+            for paper in papers:
+                if paper.paper_id not in self._rows and paper.paper_id not in fresh:
+                    fresh[paper.paper_id] = paper
+            if not fresh:
+                return 0
+
+            hashed = [_hash_terms(_term_counts(p), self.dim) for p in fresh.values()]
+            for buckets, _ in hashed:
+                self._df[np.unique(buckets)] += 1
+            self._docs += len(hashed)
+            block = np.stack([self._weight(b, v) for b, v in hashed])
+
+            start = self._count
+            if start + len(block) > len(self._matrix):
+                self._matrix.flush()
+                self._matrix = self._open_matrix(max(2 * len(self._matrix), start + len(block)))
+            self._matrix[start:start + len(block)] = block
+            self._matrix.flush()
+
+            with self._papers_path.open("ab") as f:
+                offset = f.tell()
+                for paper in fresh.values():
+                    line = f"{paper.paper_id}\t{paper.model_dump_json()}\n".encode()
+                    f.write(line)
+                    self._rows[paper.paper_id] = len(self._offsets)
+                    self._offsets.append(offset)
+                    offset += len(line)
+            np.save(self._df_path, self._df)
+            self._count = start + len(block)
+            return len(block)
+
+    def paper(self, row: int) -> Paper:
+        with self._papers_path.open("rb") as f:
+            f.seek(self._offsets[row])
+            line = f.readline()
+        return Paper.model_validate_json(line.split(b"\t", 1)[1])
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Top-``k`` rows by cosine similarity for each query vector.
+
+        Scores ``_CHUNK_ROWS`` rows at a time with one matrix product for
+        all queries, keeping only each chunk's top-k candidates. Returns
+        ``(rows, scores)``, both ``(len(queries), <=k)``, best first.
+        """
+        import numpy as np
+
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        matrix, count = self._matrix, self._count
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        for start in range(0, count, _CHUNK_ROWS):
+            scores = queries @ matrix[start:min(count, start + _CHUNK_ROWS)].T
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_rows = np.concatenate([best_rows, top + start], axis=1)
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, top, 1)], axis=1)
+            if best_scores.shape[1] > k:
+                top = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_rows = np.take_along_axis(best_rows, top, 1)
+                best_scores = np.take_along_axis(best_scores, top, 1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        return np.take_along_axis(best_rows, order, 1), np.take_along_axis(best_scores, order, 1)
+
+    def similar(self, paper_id: str, k: int) -> list[tuple[Paper, float]] | None:
+        """Papers most similar to an indexed paper, or None if it isn't indexed."""
+        row = self._rows.get(paper_id)
+        if row is None or row >= self._count:
+            return None
+        rows, scores = self.search(self._matrix[row], k + 1)
+        return [
+            (self.paper(int(r)), float(s))
+            for r, s in zip(rows[0], scores[0])
+            if r != row and s > 0
+        ][:k]
+
+
+# ── Process-wide index ─────────────────────────────────────────
+
+_index: SimilarityIndex | None = None
+_index_initialized = False
+_index_lock = threading.Lock()
+_pending: set[asyncio.Task] = set()
+
+
+def get_index() -> SimilarityIndex | None:
+    """The index in ``SIMILARITY_INDEX_DIR``, or None when disabled.
+
+    Opening it scans ``papers.jsonl``, so call this off the event loop.
+    """
+    global _index, _index_initialized
+    with _index_lock:
+        if not _index_initialized:
+            settings = get_settings()
+            if settings.similarity_index_dir:
+                try:
+                    _index = SimilarityIndex(settings.similarity_index_dir, settings.similarity_dim)
+                except IndexLockedError as exc:
+                    logger.warning("%s; similar papers are disabled in this worker", exc)
+            _index_initialized = True
+        return _index
+
+
+def set_index(index: SimilarityIndex | None) -> None:
+    """Replace the process-wide index (used by tests and tooling)."""
+    global _index, _index_initialized
+    with _index_lock:
+        _index = index
+        _index_initialized = True
+
+
+def _add(papers: list[Paper]) -> int:
+    index = get_index()
+    return index.add(papers) if index is not None else 0
+
+
+async def add_papers(papers: list[Paper]) -> int:
+    return await asyncio.to_thread(_add, papers)
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Indexing papers for similarity failed: %s", task.exception())
+
+
+def observe(papers: list[Paper]) -> None:
+    """Index ``papers`` in the background without delaying the caller."""
+    if not papers or (_index_initialized and _index is None):
+        return
+    task = asyncio.get_running_loop().create_task(add_papers(papers))
+    _pending.add(task)
+    task.add_done_callback(_log_failure)
+
+
+def _similar(paper_id: str, limit: int) -> list[tuple[Paper, float]] | None:
+    index = get_index()
+    if index is None:
+        raise IndexUnavailableError("Similar papers are not available on this server")
+    return index.similar(paper_id, limit)
+
+
+async def similar_papers(paper_id: str, limit: int = 10) -> list[tuple[Paper, float]] | None:
+    """Most similar indexed papers; None if ``paper_id`` isn't indexed yet.
+
+    Raises ``IndexUnavailableError`` when the index is disabled.
+    """
+    return await asyncio.to_thread(_similar, paper_id, limit)
@@ -0,0 +1,124 @@
+"""Rolling per-source statistics and the adaptive fan-out plan built on them.
+
+Every upstream search call records its latency, result count, how many of
+its results duplicated another source's, and whether it failed. In
+adaptive mode ``SourceStats.plan`` orders sources by expected unique
+results per second and sends only as many as should fill the page in the
+first wave; the rest are called only if the page is still short after
+deduplication. The aggregator makes one plan per query and reuses it for
+every page, so paging never switches sources mid-query.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+_WINDOW = 50  # samples kept per source
+_MIN_SAMPLES = 5  # below this a source is always in the first wave
+_EXPLORE_EVERY = 20  # a source skipped this many times in a row is re-sampled
+_MIN_LATENCY = 0.05  # seconds; keeps a fast-but-empty source from dominating
+
+
+@dataclass(frozen=True)
+class _Sample:
+    latency: float
+    count: int
+    duplicates: int
+    error: bool
+
+
+@dataclass(frozen=True)
+class SourceSummary:
+    samples: int
+    p50: float
+    p95: float
+    mean_count: float  # per successful call
+    duplicate_ratio: float
+    error_rate: float
+
+    @property
+    def expected_unique(self) -> float:
+        """Results this source is expected to add after deduplication."""
+        return self.mean_count * (1.0 - self.duplicate_ratio) * (1.0 - self.error_rate)
+
+    @property
+    def score(self) -> float:
+        return self.expected_unique / max(self.p50, _MIN_LATENCY)
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SourceStats:
+    def __init__(self, window: int = _WINDOW) -> None:
+        self._samples: dict[str, deque[_Sample]] = defaultdict(lambda: deque(maxlen=window))
+        self._skipped: dict[str, int] = defaultdict(int)
+
+    def record(
+        self,
+        name: str,
+        latency: float,
+        count: int = 0,
+        duplicates: int = 0,
+        error: bool = False,
+    ) -> None:
+        self._samples[name].append(_Sample(latency, count, duplicates, error))
+        self._skipped[name] = 0
+
+    def names(self) -> list[str]:
+        return list(self._samples)
+
+    def skip(self, name: str) -> None:
+        self._skipped[name] += 1
+
+    def summary(self, name: str) -> SourceSummary | None:
+        samples = self._samples.get(name)
+        if not samples:
+            return None
+        latencies = [s.latency for s in samples]
+        returned = sum(s.count for s in samples)
+        errors = sum(s.error for s in samples)
+        # Failed calls return nothing; they are counted once, in error_rate
+        succeeded = len(samples) - errors
+        return SourceSummary(
+            samples=len(samples),
+            p50=_percentile(latencies, 0.5),
+            p95=_percentile(latencies, 0.95),
+            mean_count=returned / succeeded if succeeded else 0.0,
+            duplicate_ratio=sum(s.duplicates for s in samples) / returned if returned else 0.0,
+            error_rate=errors / len(samples),
+        )
+
+    def plan(self, names: list[str], per_page: int) -> tuple[list[str], list[str]]:
+        """Split ``names`` into a first wave and ranked fallbacks.
+
+        Sources with too few samples, or skipped for too long, always go in
+        the first wave so their statistics stay current. Warm sources are
+        then added best-first until they are expected to fill the page.
+        """
+        first: list[str] = []
+        warm: list[tuple[str, SourceSummary]] = []
+        for name in names:
+            summary = self.summary(name)
+            if (
+                summary is None
+                or summary.samples < _MIN_SAMPLES
+                or self._skipped[name] >= _EXPLORE_EVERY
+            ):
+                first.append(name)
+            else:
+                warm.append((name, summary))
+        warm.sort(key=lambda item: item[1].score, reverse=True)
+
+        expected = 0.0
+        fallback: list[str] = []
+        for name, summary in warm:
+            if expected < per_page:
+                first.append(name)
+                expected += summary.expected_unique
+            else:
+                fallback.append(name)
+        return first, fallback
@@ -0,0 +1,116 @@
+"""Thin async client for Supabase's PostgREST API.
+
+Requests made on behalf of a user carry that user's JWT, so the row-level
+security policies in ``supabase/schema.sql`` apply exactly as they do for
+the Flutter client. Background jobs use the service-role key instead.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import httpx
+
+from app.config import get_settings
+
+_TIMEOUT = httpx.Timeout(10.0)
+
+
+class SupabaseError(Exception):
+    """PostgREST returned an error, could not be reached, or Supabase is not configured."""
+
+    def __init__(self, message: str, status_code: int | None = None) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SupabaseClient:
+    def __init__(self, base_url: str, api_key: str, access_token: str) -> None:
+        if not base_url or not api_key:
+            raise SupabaseError("Supabase is not configured on the server")
+        self.rest_url = f"{base_url.rstrip('/')}/rest/v1"
+        self.headers = {
+            "apikey": api_key,
+            "Authorization": f"Bearer {access_token}",
+        }
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: dict[str, Any] | None = None,
+        json: Any = None,
+        prefer: str | None = None,
+    ) -> Any:
+        headers = dict(self.headers)
+        if prefer:
+            headers["Prefer"] = prefer
+        try:
+            async with httpx.AsyncClient(timeout=_TIMEOUT) as client:
+                resp = await client.request(
+                    method, f"{self.rest_url}/{path}", params=params, json=json, headers=headers
+                )
+        except httpx.HTTPError as exc:
+            raise SupabaseError(f"Supabase request failed: {exc!r}") from exc
+        if resp.status_code >= 400:
+            try:
+                message = resp.json().get("message", resp.text)
+            except ValueError:
+                message = resp.text
+            raise SupabaseError(message, resp.status_code)
+        if not resp.content:
+            return None
+        return resp.json()
+
+    async def select(self, table: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+        return await self._request("GET", table, params=params) or []
+
+    async def insert(
+        self,
+        table: str,
+        rows: list[dict[str, Any]] | dict[str, Any],
+        *,
+        on_conflict: str | None = None,
+        ignore_duplicates: bool = False,
+        returning: bool = True,
+    ) -> list[dict[str, Any]]:
+        prefer = ["return=representation" if returning else "return=minimal"]
+        params: dict[str, Any] = {}
+        if on_conflict:
+            params["on_conflict"] = on_conflict
+            prefer.append("resolution=ignore-duplicates" if ignore_duplicates else "resolution=merge-duplicates")
+        return await self._request(
+            "POST", table, params=params, json=rows, prefer=",".join(prefer)
+        ) or []
+
+    async def update(
+        self,
+        table: str,
+        filters: dict[str, Any],
+        values: dict[str, Any],
+    ) -> list[dict[str, Any]]:
+        return await self._request(
+            "PATCH", table, params=filters, json=values, prefer="return=representation"
+        ) or []
+
+    async def delete(self, table: str, filters: dict[str, Any]) -> list[dict[str, Any]]:
+        return await self._request(
+            "DELETE", table, params=filters, prefer="return=representation"
+        ) or []
+
+    async def rpc(self, function: str, args: dict[str, Any]) -> Any:
+        return await self._request("POST", f"rpc/{function}", json=args)
+
+
+def user_client(access_token: str) -> SupabaseClient:
+    """Client acting as the user — RLS restricts it to their own rows."""
+    settings = get_settings()
+    return SupabaseClient(settings.supabase_url, settings.supabase_anon_key, access_token)
+
+
+def service_client() -> SupabaseClient:
+    """Client with the service-role key for background jobs (bypasses RLS)."""
+    settings = get_settings()
+    key = settings.supabase_service_role_key
+    return SupabaseClient(settings.supabase_url, key, key)
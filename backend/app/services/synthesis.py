@@ -0,0 +1,142 @@
+"""Hierarchical synthesis of a collection of papers.
+
+Map: each paper is condensed to its (cached) ``summarize_paper`` summary,
+several at a time. Reduce: the notes are merged in groups that fit one
+prompt, then the merged notes are merged again, until a single group is
+left and gets the final literature-review prompt. With fan-out ``k`` a
+collection of ``n`` papers takes about ``log_k(n)`` reduce levels and
+``n / (k - 1)`` reduce calls, and no prompt grows with the collection.
+Every call is cached by its inputs, so re-running a collection (or one
+that shares papers with it) only pays for what changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from app.config import get_settings
+from app.models.paper import SynthesisItem
+from app.services.gemini_service import summarize_paper, synthesize_notes
+from app.services.paper_aggregator import fetch_papers_by_ids
+
+logger = logging.getLogger(__name__)
+
+MAX_PAPERS = 200
+
+
+def group_notes(notes: list[str], fanout: int, max_chars: int) -> list[list[str]]:
+    """Split ``notes`` into consecutive groups of at most ``fanout`` notes
+    and ``max_chars`` characters (a longer single note gets its own group)."""
+    groups: list[list[str]] = []
+    current: list[str] = []
+    size = 0
+    for note in notes:
+        if current and (len(current) >= fanout or size + len(note) > max_chars):
+            groups.append(current)
+            current, size = [], 0
+        current.append(note)
+        size += len(note)
+    if current:
+        groups.append(current)
+    return groups
+
+
+async def _resolve(
+    paper_ids: list[str], items: list[SynthesisItem]
+) -> tuple[list[SynthesisItem], list[str]]:
+    """Look up ``paper_ids``; return the items to synthesize and the IDs not found."""
+    found = await fetch_papers_by_ids(paper_ids) if paper_ids else {}
+    resolved = [
+        SynthesisItem(title=p.title, abstract=p.abstract, paper_id=p.paper_id)
+        for paper_id in dict.fromkeys(paper_ids)
+        if (p := found.get(paper_id)) is not None
+    ]
+    missing = [paper_id for paper_id in dict.fromkeys(paper_ids) if paper_id not in found]
+    return resolved + items, missing
+
+
+async def synthesize(
+    paper_ids: list[str],
+    items: list[SynthesisItem],
+    language: str = "en",
+) -> AsyncIterator[dict]:
+    """Yield ``note`` events as papers are condensed, a ``level`` event and
+    ``partial`` events per reduce level, then the final ``synthesis``.
+
+    Papers that can't be found or summarized are reported as ``skipped``
+    and left out; if a merge fails the stream ends with an ``error``.
+    """
+    settings = get_settings()
+    semaphore = asyncio.Semaphore(max(1, settings.ai_synthesis_concurrency))
+    fanout = max(2, settings.ai_synthesis_fanout)
+
+    items, missing = await _resolve(paper_ids, items)
+    for paper_id in missing:
+        yield {"type": "skipped", "paper_id": paper_id, "detail": "Paper not found"}
+
+    async def condense(index: int, item: SynthesisItem) -> tuple[int, str | None]:
+        async with semaphore:
+            try:
+                summary = await summarize_paper(item.title, item.abstract, language)
+                return index, summary.text
+            except Exception as exc:
+                logger.warning("Synthesis: summary of %r failed: %s", item.title, exc)
+                return index, None
+
+    async def merge(index: int, group: list[str], final: bool) -> tuple[int, str]:
+        async with semaphore:
+            return index, (await synthesize_notes(group, language, final)).text
+
+    tasks = [asyncio.create_task(condense(i, item)) for i, item in enumerate(items)]
+    notes: dict[int, str] = {}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            index, summary = await next_done
+            item = items[index]
+            if not summary:
+                yield {"type": "skipped", "paper_id": item.paper_id, "title": item.title,
+                       "detail": "Summary unavailable"}
+                continue
+            notes[index] = f"[{index + 1}] {item.title}\n{summary}"
+            yield {"type": "note", "ref": index + 1, "paper_id": item.paper_id,
+                   "title": item.title, "summary": summary}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    if not notes:
+        yield {"type": "error", "detail": "No paper could be summarized"}
+        return
+
+    level = [notes[i] for i in sorted(notes)]
+    depth = 0
+    while True:
+        depth += 1
+        groups = group_notes(level, fanout, settings.ai_synthesis_max_chars)
+        if len(level) > 1 and len(groups) == len(level):
+            # Every note fills a prompt on its own; merge pairs past the
+            # budget rather than loop without getting any shorter
+            groups = [level[i:i + 2] for i in range(0, len(level), 2)]
+        final = len(groups) == 1
+        yield {"type": "level", "depth": depth, "groups": len(groups), "final": final}
+        tasks = [asyncio.create_task(merge(i, g, final)) for i, g in enumerate(groups)]
+        merged: dict[int, str] = {}
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                index, text = await next_done
+                merged[index] = text
+                if not final:
+                    yield {"type": "partial", "depth": depth, "group": index, "text": text}
+        except Exception:
+            logger.exception("Synthesis merge failed at depth %d", depth)
+            yield {"type": "error", "detail": "AI service is temporarily unavailable"}
+            return
+        finally:
+            for task in tasks:
+                task.cancel()
+        if final:
+            yield {"type": "synthesis", "text": merged[0], "papers": len(notes), "depth": depth}
+            return
+        level = [merged[i] for i in range(len(groups))]
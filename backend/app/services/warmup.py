@@ -0,0 +1,191 @@
+"""Keep the result cache warm for popular searches and paper summaries.
+
+Opt-in with ``WARMUP_TOP_N``. The routers call :func:`record_search` /
+:func:`record_summary` for every request; with warm-up off they record
+nothing, and the pending counts are capped at ``_MAX_PENDING`` keys
+between cycles. :func:`run_warmup` periodically
+merges those counts into a small JSON state file (exponentially decayed, so
+it follows what is trending; entries that decay below ``_MIN_SCORE`` are
+forgotten) and re-executes the top entries at a limited rate:
+
+* at startup, entries that are not cached are computed, so a fresh deploy
+  starts warm;
+* afterwards, only entries requested since the previous cycle are warmed:
+  searches are recomputed every ``0.8 x SEARCH_CACHE_TTL``, before they
+  expire, while summaries — cached for days and costly to regenerate — are
+  only recomputed once they have dropped out. An idle service makes no
+  upstream calls.
+
+The state file holds users' queries and the abstracts they summarized, so
+it is written owner-only under ``WARMUP_STATE_PATH`` (``data/`` by default).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+from app.config import get_settings
+from app.services.gemini_service import summarize_paper
+from app.services.paper_aggregator import search_papers
+
+logger = logging.getLogger(__name__)
+
+_DECAY = 0.7  # weight kept by older counts at each merge
+_KEEP_FACTOR = 4  # entries kept in the state file per warmed slot
+_REFRESH_FRACTION = 0.8  # of SEARCH_CACHE_TTL
+_MIN_SCORE = 0.5  # decayed scores below this are dropped from the state file
+_MAX_PENDING = 10_000  # distinct keys counted between merges; pruned to the most common half
+
+_counts: Counter[str] = Counter()
+
+
+def _entry(kind: str, arguments: dict[str, Any]) -> str:
+    return json.dumps([kind, arguments], sort_keys=True, separators=(",", ":"))
+
+
+def _record(kind: str, arguments: dict[str, Any]) -> None:
+    if get_settings().warmup_top_n <= 0:
+        return
+    _counts[_entry(kind, arguments)] += 1
+    if len(_counts) > _MAX_PENDING:
+        kept = _counts.most_common(_MAX_PENDING // 2)
+        _counts.clear()
+        _counts.update(dict(kept))
+
+
+def record_search(
+    query: str,
+    page: int,
+    per_page: int,
+    source: str | None,
+    year_from: int | None,
+    year_to: int | None,
+) -> None:
+    _record("search", {
+        "query": query, "page": page, "per_page": per_page,
+        "source": source, "year_from": year_from, "year_to": year_to,
+    })
+
+
+def record_summary(title: str, abstract: str, language: str) -> None:
+    _record("summary", {"title": title, "abstract": abstract, "language": language})
+
+
+# ── State file ─────────────────────────────────────────────────
+
+
+def merge_counts(
+    path: Path, counts: Counter[str], keep: int, now: float | None = None
+) -> dict[str, list[float]]:
+    """Fold ``counts`` into the decayed scores stored at ``path``.
+
+    Returns ``{entry: [score, last_hit]}``, where ``last_hit`` is the time
+    of the last merge that brought requests for the entry. Several workers
+    may merge into the same file; the write is atomic, and an occasional
+    lost update only skews an approximate ranking.
+    """
+    now = time.time() if now is None else now
+    try:
+        stored: dict[str, Any] = json.loads(path.read_text())
+    except FileNotFoundError:
+        stored = {}
+    except (OSError, ValueError) as exc:
+        logger.warning("Ignoring unreadable warm-up state %s: %s", path, exc)
+        stored = {}
+
+    merged: dict[str, list[float]] = {}
+    for key, value in stored.items():
+        score, last_hit = value if isinstance(value, list) else (value, 0.0)
+        if score * _DECAY >= _MIN_SCORE:
+            merged[key] = [score * _DECAY, last_hit]
+    for key, count in counts.items():
+        merged[key] = [merged.get(key, [0.0])[0] + count, now]
+    top = dict(sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:keep])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(top, f)
+    os.replace(tmp, path)
+    return top
+
+
+def top_entries(
+    scores: dict[str, list[float]], limit: int, hit_after: float | None = None
+) -> dict[str, list[dict[str, Any]]]:
+    """Best ``limit`` argument sets per kind, most popular first.
+
+    With ``hit_after``, entries in the top ``limit`` that have not been
+    requested since then are left out (not replaced by the next ones).
+    """
+    top: dict[str, list[dict[str, Any]]] = {"search": [], "summary": []}
+    ranked: Counter[str] = Counter()
+    for key in sorted(scores, key=lambda k: scores[k][0], reverse=True):
+        kind, arguments = json.loads(key)
+        if kind not in top or ranked[kind] >= limit:
+            continue
+        ranked[kind] += 1
+        if hit_after is None or scores[key][1] > hit_after:
+            top[kind].append(arguments)
+    return top
+
+
+# ── Warming ────────────────────────────────────────────────────
+
+
+async def warm(entries: dict[str, list[dict[str, Any]]], *, refresh_searches: bool) -> int:
+    """Re-execute ``entries`` one at a time at ``WARMUP_RATE`` calls per second.
+
+    Returns the number of calls that failed.
+    """
+    settings = get_settings()
+    pause = 1.0 / settings.warmup_rate if settings.warmup_rate > 0 else 0.0
+    search = search_papers.refresh if refresh_searches else search_papers
+    calls = [(search, args) for args in entries.get("search", [])]
+    if settings.gemini_api_key:
+        calls += [(summarize_paper, args) for args in entries.get("summary", [])]
+
+    failures = 0
+    for fn, arguments in calls:
+        try:
+            await fn(**arguments)
+        except Exception as exc:
+            failures += 1
+            logger.info("Cache warm-up call failed (%s): %s", type(exc).__name__, exc)
+        await asyncio.sleep(pause)
+    return failures
+
+
+async def run_warmup() -> None:
+    """Merge popularity counts and warm the cache until cancelled."""
+    settings = get_settings()
+    path = Path(settings.warmup_state_path)
+    interval = max(30.0, settings.search_cache_ttl * _REFRESH_FRACTION)
+    last_cycle: float | None = None  # startup warms everything not cached
+    while True:
+        started = time.time()
+        try:
+            counts = _counts.copy()
+            _counts.clear()
+            scores = await asyncio.to_thread(
+                merge_counts, path, counts, settings.warmup_top_n * _KEEP_FACTOR, started
+            )
+            if settings.warmup_execute:
+                entries = top_entries(scores, settings.warmup_top_n, hit_after=last_cycle)
+                failures = await warm(entries, refresh_searches=last_cycle is not None)
+                logger.info(
+                    "Cache warm-up: %d searches, %d summaries, %d failed",
+                    len(entries["search"]), len(entries["summary"]), failures,
+                )
+        except Exception:
+            logger.exception("Cache warm-up cycle failed")
+        last_cycle = started
+        await asyncio.sleep(interval)
@@ -0,0 +1,33 @@
+"""Server-Sent Events helpers for progressively streamed endpoints."""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterable, AsyncIterator
+from typing import Any
+
+from fastapi.responses import StreamingResponse
+
+
+def format_sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def _encode(events: AsyncIterable[dict[str, Any]]) -> AsyncIterator[str]:
+    async for event in events:
+        body = dict(event)
+        yield format_sse(body.pop("type"), body)
+
+
+def sse_response(events: AsyncIterable[dict[str, Any]]) -> StreamingResponse:
+    """Stream ``{"type": ..., **data}`` dicts as SSE frames.
+
+    ``text/event-stream`` is excluded from gzip, so every frame is flushed
+    to the client as soon as it is produced.
+    """
+    return StreamingResponse(
+        _encode(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
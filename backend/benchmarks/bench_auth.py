@@ -0,0 +1,77 @@
+"""Benchmark the per-request cost of ``require_auth`` with and without the
+verified-token cache.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_auth --iterations 5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app import dependencies
+from app.config import Settings
+
+_SECRET = "benchmark-jwt-secret-benchmark-jwt-secret"
+
+
+def _claims() -> dict:
+    now = int(time.time())
+    return {"sub": "bench-user", "aud": "authenticated", "iat": now, "exp": now + 3600}
+
+
+class _StaticJWKClient:
+    """Stand-in for the JWKS client that never touches the network."""
+
+    def __init__(self, public_key) -> None:
+        self._key = SimpleNamespace(key=public_key)
+
+    def get_signing_key_from_jwt(self, token: str):
+        return self._key
+
+
+async def _run(token: str, settings: Settings, iterations: int) -> float:
+    request = MagicMock()
+    request.headers.get.return_value = f"Bearer {token}"
+    await dependencies.require_auth(request=request, settings=settings)  # warm-up
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await dependencies.require_auth(request=request, settings=settings)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    dependencies._jwks_client = _StaticJWKClient(private_key.public_key())
+    tokens = {
+        "HS256": jwt.encode(_claims(), _SECRET, algorithm="HS256"),
+        "ES256": jwt.encode(_claims(), private_key, algorithm="ES256", headers={"kid": "bench"}),
+    }
+
+    print(f"{'alg':<7}{'cache':>8}{'µs/request':>14}{'speed-up':>10}")
+    for alg, token in tokens.items():
+        timings = {}
+        for size in (0, 1024):
+            dependencies._token_cache = None
+            settings = Settings(supabase_jwt_secret=_SECRET, auth_token_cache_size=size)
+            timings[size] = asyncio.run(_run(token, settings, args.iterations))
+        for size, seconds in timings.items():
+            speedup = timings[0] / seconds
+            label = "off" if size == 0 else "on"
+            print(f"{alg:<7}{label:>8}{seconds * 1e6:>14.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""Measure event-loop lag and search throughput for each offload executor.
+
+Runs ``search_papers`` (uncached) at a fixed concurrency against in-process
+upstream stand-ins that answer with realistic arXiv / OpenAlex / Semantic
+Scholar payloads after a fixed delay, while a probe measures how late the
+event loop wakes up — the delay every unrelated request, ``/health``
+included, would see. Also prints the inline parse cost per payload, which
+is what ``OFFLOAD_MIN_BYTES`` trades against the executor hop.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_offload --per-page 50 --concurrency 16 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from unittest.mock import patch
+
+import httpx
+
+from app import offload
+from app.config import Settings
+from app.services import paper_aggregator as pa
+from app.services import similarity
+from benchmarks.loadtest.stubs import StubConfig, _arxiv_feed, _openalex_work, _page, _s2_item
+
+_PROBE_INTERVAL = 0.005  # seconds
+
+
+def _payloads(per_page: int) -> dict[str, bytes]:
+    config = StubConfig()
+    for profile in config.profiles.values():
+        profile.results = per_page
+    query = "graph neural networks"
+    return {
+        "arxiv": _arxiv_feed(_page(query, "arxiv", 0, per_page, config)).encode(),
+        "openalex": json.dumps({
+            "results": [_openalex_work(p) for p in _page(query, "openalex", 0, per_page, config)]
+        }).encode(),
+        "s2": json.dumps({
+            "data": [_s2_item(p) for p in _page(query, "semantic_scholar", 0, per_page, config)]
+        }).encode(),
+    }
+
+
+def _best_of(fn, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _parse_costs(payloads: dict[str, bytes], per_page: int) -> None:
+    parsers = {
+        "arxiv": lambda: pa._parse_arxiv_feed(payloads["arxiv"], per_page, None, None),
+        "openalex": lambda: pa._parse_openalex_works(payloads["openalex"]),
+        "s2": lambda: pa._parse_s2_items(payloads["s2"]),
+    }
+    for name, parse in parsers.items():
+        rows = parse()
+        build = _best_of(lambda: [pa._to_paper(r) for r in rows])
+        print(f"  {name:<9}{len(payloads[name]) / 1024:>8.0f} KiB  parse "
+              f"{_best_of(parse) * 1000:>6.2f} ms  models {build * 1000:>5.2f} ms")
+    papers = [pa._to_paper(r) for parse in parsers.values() for r in parse()]
+    dedupe = _best_of(lambda: pa._dedupe_by_title(papers))
+    print(f"  dedupe of {len(papers)} papers: {dedupe * 1e6:.0f} µs")
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def _run(
+    mode: str,
+    payloads: dict[str, bytes],
+    per_page: int,
+    concurrency: int,
+    duration: float,
+    latency: float,
+    workers: int,
+) -> dict[str, float]:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        path = request.url.path
+        name = "arxiv" if "query" in path else "openalex" if "works" in path else "s2"
+        return httpx.Response(200, content=payloads[name])
+
+    real_client = httpx.AsyncClient
+    settings = Settings(offload_executor=mode, offload_workers=workers)
+    lag: list[float] = []
+    completed = 0
+    with (
+        patch("app.offload.get_settings", return_value=settings),
+        patch.object(
+            pa.httpx, "AsyncClient",
+            lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+        ),
+    ):
+        # Start the pool's workers before measuring
+        await asyncio.gather(*(
+            offload.run_cpu(len, b"", size=1 << 30) for _ in range(workers or os.cpu_count() or 1)
+        ))
+        deadline = time.perf_counter() + duration
+
+        async def probe() -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                await asyncio.sleep(_PROBE_INTERVAL)
+                lag.append(max(0.0, time.perf_counter() - started - _PROBE_INTERVAL))
+
+        async def user(seed: int) -> None:
+            nonlocal completed
+            i = 0
+            while time.perf_counter() < deadline:
+                await pa.search_papers.__wrapped__(query=f"q{seed}-{i}", per_page=per_page)
+                completed += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        offload.shutdown()
+    return {
+        "searches_per_s": completed / elapsed,
+        "lag_p50_ms": _percentile(lag, 0.50) * 1000,
+        "lag_p99_ms": _percentile(lag, 0.99) * 1000,
+        "lag_max_ms": max(lag, default=0.0) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per executor")
+    parser.add_argument("--latency", type=float, default=0.05, help="upstream delay, seconds")
+    parser.add_argument("--workers", type=int, default=0, help="pool size; 0 = one per CPU")
+    parser.add_argument("--modes", default="none,thread,process")
+    args = parser.parse_args()
+
+    similarity.set_index(None)
+    payloads = _payloads(args.per_page)
+    print(f"{os.cpu_count()} CPU(s); inline cost per page of {args.per_page}:")
+    _parse_costs(payloads, args.per_page)
+
+    print(f"\n{'executor':<10}{'searches/s':>12}{'lag p50':>10}{'lag p99':>10}{'lag max':>10}")
+    for mode in args.modes.split(","):
+        result = asyncio.run(_run(
+            mode, payloads, args.per_page, args.concurrency,
+            args.duration, args.latency, args.workers,
+        ))
+        print(f"{mode:<10}{result['searches_per_s']:>12.1f}{result['lag_p50_ms']:>10.1f}"
+              f"{result['lag_p99_ms']:>10.1f}{result['lag_max_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare search-response size and encoding cost across projections.
+
+Encodes one synthetic page of search results the way ``/api/papers/search``
+does — full JSON, a list-view projection, and the same projection as
+MessagePack — and reports raw and gzipped size, encoding time and the
+time the gzip middleware (level 6) spends compressing the body.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_search_encoding --per-page 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import time
+
+from app.encoding import JSON, MSGPACK, encode
+from app.models.paper import Paper, PaperSearchResult, SourceStatus
+from app.routers.papers import _project
+from benchmarks.loadtest.stubs import StubConfig, _page
+
+_LIST_VIEW = ["paper_id", "title", "authors", "published_date"]
+
+
+def _result(per_page: int) -> PaperSearchResult:
+    config = StubConfig()
+    config.profiles["openalex"].results = per_page
+    config.profiles["openalex"].abstract_words = 200
+    papers = [
+        Paper(
+            paper_id=f"openalex:W{p['id']}",
+            title=p["title"],
+            authors=p["authors"],
+            abstract=p["abstract"],
+            published_date=f"{p['year']}-01-01",
+            source="openalex",
+            url=f"https://openalex.org/W{p['id']}",
+            pdf_url=f"https://example.org/{p['id']}.pdf",
+        )
+        for p in _page("graph neural networks", "openalex", 0, per_page, config)
+    ]
+    sources = [SourceStatus(name=n, ok=True, latency_ms=120.5) for n in ("arxiv", "openalex")]
+    return PaperSearchResult(
+        total=per_page, page=1, per_page=per_page, papers=papers, sources=sources
+    )
+
+
+def _best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    result = _result(args.per_page)
+    variants = {
+        "full JSON": lambda: result.model_dump_json().encode(),
+        "list view JSON": lambda: encode(_project(result, _LIST_VIEW, None, 3), JSON),
+        "list view msgpack": lambda: encode(_project(result, _LIST_VIEW, None, 3), MSGPACK),
+        "snippet JSON": lambda: encode(
+            _project(result, _LIST_VIEW + ["abstract"], 160, 3), JSON
+        ),
+    }
+    print(f"{'variant':<20}{'bytes':>9}{'gzipped':>9}{'encode µs':>11}{'gzip µs':>9}")
+    for name, fn in variants.items():
+        body = fn()
+        compress = _best_of(lambda: gzip.compress(body, 6), args.repeat)
+        print(f"{name:<20}{len(body):>9,}{len(gzip.compress(body, 6)):>9,}"
+              f"{_best_of(fn, args.repeat) * 1e6:>11.0f}{compress * 1e6:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
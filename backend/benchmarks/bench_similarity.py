@@ -0,0 +1,68 @@
+"""Benchmark similar-paper queries against a synthetic vector index.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_similarity --papers 300000 --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from app.models.paper import Paper
+from app.services.similarity import SimilarityIndex
+
+_BATCH = 5000
+
+
+def _papers(rng: np.random.Generator, start: int, count: int, vocabulary: np.ndarray):
+    for i in range(start, start + count):
+        yield Paper(
+            paper_id=f"bench:{i}",
+            title=" ".join(rng.choice(vocabulary, 8)),
+            abstract=" ".join(rng.choice(vocabulary, 120)),
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=300_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=256)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vocabulary = np.array([f"term{i}" for i in range(20_000)])
+    with tempfile.TemporaryDirectory() as directory:
+        index = SimilarityIndex(directory, args.dim)
+        start = time.perf_counter()
+        for offset in range(0, args.papers, _BATCH):
+            index.add(_papers(rng, offset, min(_BATCH, args.papers - offset), vocabulary))
+        build = time.perf_counter() - start
+        print(f"indexed {len(index):,} papers in {build:.1f}s "
+              f"({len(index) / build:,.0f} papers/s)")
+
+        ids = [f"bench:{i}" for i in rng.integers(0, args.papers, args.queries)]
+        index.similar(ids[0], args.k)  # warm the page cache
+        start = time.perf_counter()
+        for paper_id in ids:
+            index.similar(paper_id, args.k)
+        single = (time.perf_counter() - start) / args.queries
+
+        queries = np.asarray(index._matrix[: args.queries])
+        start = time.perf_counter()
+        index.search(queries, args.k)
+        batched = (time.perf_counter() - start) / args.queries
+
+        print(f"{'mode':<10}{'ms/query':>10}")
+        print(f"{'single':<10}{single * 1e3:>10.2f}")
+        print(f"{'batched':<10}{batched * 1e3:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Drive the full backend at rising concurrency against local stub upstreams.
+
+Starts the stub servers (``benchmarks.loadtest.stubs``) and one backend
+worker (``benchmarks.loadtest.worker``) pointed at them through settings,
+then runs a closed-loop load of search and summarize requests at each
+concurrency level. For every level it reports throughput, p50/p95/p99
+latency, error rate, event-loop lag and worker RSS.
+
+Run from ``backend/``::
+
+    python -m benchmarks.loadtest --concurrency 1,8,32,128 --duration 15
+    python -m benchmarks.loadtest --set gemini.latency_ms=3000 --set arxiv.error_rate=0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+
+import httpx
+import jwt
+
+from benchmarks.loadtest.stubs import UPSTREAMS, StubConfig, write_self_signed_cert
+
+_BACKEND_DIR = Path(__file__).resolve().parents[2]
+_JWT_SECRET = "loadtest-jwt-secret-loadtest-jwt-secret"
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    lag_p99_ms: float
+    lag_max_ms: float
+    rss_mb: float
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _apply_overrides(config: StubConfig, overrides: list[str]) -> None:
+    """Apply ``upstream.field=value`` overrides to the stub profiles."""
+    names = {f.name for f in fields(next(iter(config.profiles.values())))}
+    for item in overrides:
+        key, _, value = item.partition("=")
+        upstream, _, name = key.partition(".")
+        if upstream not in UPSTREAMS or name not in names or not value:
+            raise SystemExit(f"Bad --set {item!r}: expected <{'|'.join(UPSTREAMS)}>.<field>=<value>")
+        profile = config.profiles[upstream]
+        setattr(profile, name, type(getattr(profile, name))(value))
+
+
+def _worker_env(http_port: int, grpc_port: int, cert: Path, tmp: Path) -> dict[str, str]:
+    stub = f"http://127.0.0.1:{http_port}"
+    return {
+        **os.environ,
+        "ARXIV_API_URL": f"{stub}/arxiv/api/query",
+        "OPENALEX_API_URL": f"{stub}/openalex",
+        "SEMANTIC_SCHOLAR_API_URL": f"{stub}/s2/graph/v1",
+        "GEMINI_API_ENDPOINT": f"localhost:{grpc_port}",
+        "GEMINI_API_KEY": "loadtest",
+        "GRPC_DEFAULT_SSL_ROOTS_FILE_PATH": str(cert),
+        "SUPABASE_JWT_SECRET": _JWT_SECRET,
+        "CACHE_BACKEND": "memory",
+        "SIMILARITY_INDEX_DIR": "",
+        "ALERTS_POLL_INTERVAL": "0",
+        "WARMUP_STATE_PATH": str(tmp / "warmup_state.json"),
+    }
+
+
+async def _wait_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while True:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise SystemExit(f"{url} did not become ready")
+            await asyncio.sleep(0.2)
+
+
+async def _run_level(
+    base_url: str,
+    concurrency: int,
+    duration: float,
+    ai_ratio: float,
+    distinct_queries: int,
+) -> LevelResult:
+    token = jwt.encode(
+        {"sub": "loadtest", "aud": "authenticated", "exp": int(time.time()) + 3600},
+        _JWT_SECRET,
+        algorithm="HS256",
+    )
+    auth = {"Authorization": f"Bearer {token}"}
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await client.post("/__loadtest/reset")
+        deadline = time.perf_counter() + duration
+
+        async def user(seed: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                topic = f"topic {rng.randrange(distinct_queries)}"
+                started = time.perf_counter()
+                try:
+                    if rng.random() < ai_ratio:
+                        resp = await client.post(
+                            "/api/ai/summarize",
+                            json={"title": topic, "abstract": f"About {topic}.", "language": "en"},
+                            headers=auth,
+                        )
+                    else:
+                        resp = await client.get(
+                            "/api/papers/search", params={"query": topic, "per_page": 10}
+                        )
+                    ok = resp.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies.append(time.perf_counter() - started)
+                errors += not ok
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        stats = (await client.get("/__loadtest/stats")).json()
+
+    return LevelResult(
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        rps=len(latencies) / elapsed,
+        p50_ms=_percentile(latencies, 0.50) * 1000,
+        p95_ms=_percentile(latencies, 0.95) * 1000,
+        p99_ms=_percentile(latencies, 0.99) * 1000,
+        lag_p99_ms=stats["lag_p99_ms"],
+        lag_max_ms=stats["lag_max_ms"],
+        rss_mb=stats["rss_mb"],
+    )
+
+
+def _print_table(results: list[LevelResult]) -> None:
+    header = (
+        f"{'conc':>5}{'reqs':>8}{'err%':>7}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'lag p99':>9}{'lag max':>9}{'RSS MB':>8}"
+    )
+    print(header)
+    for r in results:
+        error_pct = 100 * r.errors / r.requests if r.requests else 0.0
+        print(
+            f"{r.concurrency:>5}{r.requests:>8}{error_pct:>7.1f}{r.rps:>9.1f}"
+            f"{r.p50_ms:>9.1f}{r.p95_ms:>9.1f}{r.p99_ms:>9.1f}"
+            f"{r.lag_p99_ms:>9.1f}{r.lag_max_ms:>9.1f}{r.rss_mb:>8.1f}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> list[LevelResult]:
+    config = StubConfig(shared_title_ratio=args.shared_titles)
+    _apply_overrides(config, args.set)
+    http_port, grpc_port, api_port = _free_port(), _free_port(), _free_port()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key, cert = write_self_signed_cert(Path(tmp))
+        stubs = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.loadtest.stubs",
+             "--http-port", str(http_port), "--grpc-port", str(grpc_port),
+             "--cert", str(cert), "--key", str(key), "--config", config.to_json()],
+            cwd=_BACKEND_DIR,
+        )
+        worker = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.loadtest.worker", "--port", str(api_port)],
+            cwd=_BACKEND_DIR,
+            env=_worker_env(http_port, grpc_port, cert, Path(tmp)),
+        )
+        try:
+            await _wait_ready(f"http://127.0.0.1:{http_port}/health")
+            base_url = f"http://127.0.0.1:{api_port}"
+            await _wait_ready(f"{base_url}/health")
+            results = []
+            for concurrency in args.concurrency:
+                result = await _run_level(
+                    base_url, concurrency, args.duration, args.ai_ratio, args.distinct_queries
+                )
+                results.append(result)
+                print(
+                    f"  concurrency {concurrency}: {result.rps:.1f} req/s, "
+                    f"p99 {result.p99_ms:.0f} ms", file=sys.stderr,
+                )
+            return results
+        finally:
+            for process in (worker, stubs):
+                process.terminate()
+                process.wait(timeout=10)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=lambda raw: [int(c) for c in raw.split(",")],
+        default=[1, 8, 32, 128],
+        help="comma-separated concurrent clients per level",
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--ai-ratio", type=float, default=0.05, help="share of summarize calls")
+    parser.add_argument(
+        "--distinct-queries", type=int, default=10_000,
+        help="query space; smaller values mean more result-cache hits",
+    )
+    parser.add_argument("--shared-titles", type=float, default=0.2,
+                        help="share of titles every source returns")
+    parser.add_argument("--set", action="append", default=[], metavar="UPSTREAM.FIELD=VALUE",
+                        help="override a stub profile, e.g. arxiv.latency_ms=800")
+    parser.add_argument("--json", type=Path, help="also write the results here")
+    args = parser.parse_args()
+
+    results = asyncio.run(_main(args))
+    _print_table(results)
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in results], indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Local stand-ins for arXiv, OpenAlex, Semantic Scholar and Gemini.
+
+One process serves the three HTTP APIs (under ``/arxiv``, ``/openalex`` and
+``/s2``) and a TLS gRPC endpoint speaking Gemini's ``GenerateContent``.
+Each upstream has its own :class:`UpstreamProfile`: a log-normal latency
+distribution, 500 and 429 rates and payload sizes. Responses are
+deterministic per query and offset, and a configurable share of titles is
+common to all sources so deduplication has real work to do.
+
+Started by ``python -m benchmarks.loadtest``; can also be run on its own::
+
+    python -m benchmarks.loadtest.stubs --http-port 9100 --grpc-port 9101 \\
+        --cert cert.pem --key key.pem
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import hashlib
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+UPSTREAMS = ("arxiv", "openalex", "semantic_scholar", "gemini")
+
+
+@dataclass
+class UpstreamProfile:
+    latency_ms: float = 150.0  # median
+    latency_sigma: float = 0.5  # log-normal shape; 0 = constant latency
+    error_rate: float = 0.0  # share of 500 responses
+    throttle_rate: float = 0.0  # share of 429 responses
+    results: int = 10  # max results per page
+    abstract_words: int = 150  # payload size; for gemini, words per answer
+
+    def delay(self, rng: random.Random) -> float:
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        return rng.lognormvariate(0.0, self.latency_sigma) * self.latency_ms / 1000
+
+    def outcome(self, rng: random.Random) -> int:
+        roll = rng.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.throttle_rate:
+            return 429
+        return 200
+
+
+@dataclass
+class StubConfig:
+    profiles: dict[str, UpstreamProfile] = field(
+        default_factory=lambda: {
+            "arxiv": UpstreamProfile(latency_ms=400.0),
+            "openalex": UpstreamProfile(latency_ms=200.0),
+            "semantic_scholar": UpstreamProfile(latency_ms=250.0, throttle_rate=0.05),
+            "gemini": UpstreamProfile(latency_ms=1500.0, abstract_words=300),
+        }
+    )
+    shared_title_ratio: float = 0.2  # titles returned by every source
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "profiles": {k: asdict(v) for k, v in self.profiles.items()},
+            "shared_title_ratio": self.shared_title_ratio,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> StubConfig:
+        data = json.loads(raw)
+        return cls(
+            profiles={k: UpstreamProfile(**v) for k, v in data["profiles"].items()},
+            shared_title_ratio=data["shared_title_ratio"],
+        )
+
+
+# ── Synthetic papers ───────────────────────────────────────────
+
+_WORDS = (
+    "learning graph neural network model data quantum protein sequence energy "
+    "optimization transformer attention climate carbon catalyst materials "
+    "inference bayesian sparse robust adaptive signal imaging clinical trial "
+    "genome language vision reinforcement policy control dynamics"
+).split()
+
+
+def _synthetic(query: str, source: str, index: int, config: StubConfig, words: int) -> dict:
+    seed = hashlib.sha1(f"{query}|{index}".encode()).digest()
+    rng = random.Random(seed)
+    if rng.random() >= config.shared_title_ratio:
+        rng = random.Random(seed + source.encode())
+    title = f"{query.title()}: {' '.join(rng.choice(_WORDS) for _ in range(6))}"
+    return {
+        "id": hashlib.sha1(seed + source.encode()).hexdigest()[:12],
+        "title": title,
+        "authors": [f"Author {rng.randrange(1000)}" for _ in range(rng.randint(1, 5))],
+        "abstract": " ".join(rng.choice(_WORDS) for _ in range(words)),
+        "year": rng.randint(1995, 2026),
+    }
+
+
+def _page(query: str, source: str, offset: int, limit: int, config: StubConfig) -> list[dict]:
+    profile = config.profiles[source]
+    count = min(limit, profile.results)
+    return [
+        _synthetic(query, source, offset + i, config, profile.abstract_words)
+        for i in range(count)
+    ]
+
+
+def _arxiv_feed(papers: list[dict]) -> str:
+    entries = "".join(
+        "<entry>"
+        f"<id>http://arxiv.org/abs/{p['id']}v1</id>"
+        f"<published>{p['year']}-01-01T00:00:00Z</published>"
+        f"<updated>{p['year']}-01-01T00:00:00Z</updated>"
+        f"<title>{escape(p['title'])}</title>"
+        f"<summary>{escape(p['abstract'])}</summary>"
+        + "".join(f"<author><name>{escape(a)}</name></author>" for a in p["authors"])
+        + f'<link title="pdf" href="http://arxiv.org/pdf/{p["id"]}v1"/>'
+        "</entry>"
+        for p in papers
+    )
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+
+def _openalex_work(p: dict) -> dict:
+    return {
+        "id": f"https://openalex.org/W{int(p['id'], 16) % 10**10}",
+        "title": p["title"],
+        "authorships": [{"author": {"display_name": a}} for a in p["authors"]],
+        "publication_date": f"{p['year']}-01-01",
+        "open_access": {"oa_url": None},
+        "abstract_inverted_index": _inverted(p["abstract"]),
+    }
+
+
+def _inverted(text: str) -> dict[str, list[int]]:
+    index: dict[str, list[int]] = {}
+    for position, word in enumerate(text.split()):
+        index.setdefault(word, []).append(position)
+    return index
+
+
+def _s2_item(p: dict) -> dict:
+    return {
+        "paperId": p["id"],
+        "title": p["title"],
+        "authors": [{"name": a} for a in p["authors"]],
+        "abstract": p["abstract"],
+        "year": p["year"],
+        "externalIds": {},
+        "url": None,
+        "openAccessPdf": None,
+    }
+
+
+# ── HTTP stubs ─────────────────────────────────────────────────
+
+
+def create_http_app(config: StubConfig, seed: int = 0) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(seed)
+
+    async def simulate(source: str) -> Response | None:
+        profile = config.profiles[source]
+        await asyncio.sleep(profile.delay(rng))
+        status = profile.outcome(rng)
+        if status != 200:
+            return JSONResponse({"error": "stub"}, status_code=status)
+        return None
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/arxiv/api/query")
+    async def arxiv(request: Request):
+        if (failure := await simulate("arxiv")) is not None:
+            return failure
+        q = request.query_params
+        query = q.get("search_query", "").removeprefix("all:")
+        papers = _page(query, "arxiv", int(q.get("start", 0)), int(q.get("max_results", 10)), config)
+        return Response(_arxiv_feed(papers), media_type="application/atom+xml")
+
+    @app.get("/openalex/works")
+    async def openalex(request: Request):
+        if (failure := await simulate("openalex")) is not None:
+            return failure
+        q = request.query_params
+        per_page = int(q.get("per_page", 25))
+        offset = (int(q.get("page", 1)) - 1) * per_page
+        papers = _page(q.get("search", ""), "openalex", offset, per_page, config)
+        return {"meta": {"count": 10_000}, "results": [_openalex_work(p) for p in papers]}
+
+    @app.get("/s2/graph/v1/paper/search")
+    async def semantic_scholar(request: Request):
+        if (failure := await simulate("semantic_scholar")) is not None:
+            return failure
+        q = request.query_params
+        papers = _page(
+            q.get("query", ""), "semantic_scholar",
+            int(q.get("offset", 0)), int(q.get("limit", 10)), config,
+        )
+        return {"total": 10_000, "data": [_s2_item(p) for p in papers]}
+
+    return app
+
+
+# ── Gemini gRPC stub ───────────────────────────────────────────
+
+
+def write_self_signed_cert(directory: Path) -> tuple[Path, Path]:
+    """Write a ``localhost`` key and certificate; returns ``(key, cert)``.
+
+    The backend's gRPC client is pointed at the certificate through
+    ``GRPC_DEFAULT_SSL_ROOTS_FILE_PATH``, so it talks TLS exactly as it
+    does to Google.
+    """
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    key_path, cert_path = directory / "stub-key.pem", directory / "stub-cert.pem"
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    return key_path, cert_path
+
+
+async def serve_gemini(config: StubConfig, port: int, key: bytes, cert: bytes, seed: int = 0):
+    import grpc
+    from google.ai import generativelanguage_v1beta as glm
+
+    profile = config.profiles["gemini"]
+    rng = random.Random(seed)
+
+    async def generate_content(request, context):
+        await asyncio.sleep(profile.delay(rng))
+        status = profile.outcome(rng)
+        if status == 429:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "stub quota exceeded")
+        if status != 200:
+            await context.abort(grpc.StatusCode.INTERNAL, "stub failure")
+        text = " ".join(rng.choice(_WORDS) for _ in range(profile.abstract_words))
+        return glm.GenerateContentResponse(candidates=[glm.Candidate(
+            content=glm.Content(parts=[glm.Part(text=text)], role="model"),
+            finish_reason=glm.Candidate.FinishReason.STOP,
+        )])
+
+    server = grpc.aio.server()
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(
+        "google.ai.generativelanguage.v1beta.GenerativeService",
+        {"GenerateContent": grpc.unary_unary_rpc_method_handler(
+            generate_content,
+            request_deserializer=glm.GenerateContentRequest.deserialize,
+            response_serializer=glm.GenerateContentResponse.serialize,
+        )},
+    ),))
+    server.add_secure_port(f"localhost:{port}", grpc.ssl_server_credentials([(key, cert)]))
+    await server.start()
+    return server
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    import uvicorn
+
+    config = StubConfig.from_json(args.config) if args.config else StubConfig()
+    grpc_server = await serve_gemini(
+        config, args.grpc_port, Path(args.key).read_bytes(), Path(args.cert).read_bytes()
+    )
+    http = uvicorn.Server(uvicorn.Config(
+        create_http_app(config), host="127.0.0.1", port=args.http_port,
+        log_level="warning", access_log=False,
+    ))
+    try:
+        await http.serve()
+    finally:
+        await grpc_server.stop(None)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--http-port", type=int, required=True)
+    parser.add_argument("--grpc-port", type=int, required=True)
+    parser.add_argument("--cert", required=True)
+    parser.add_argument("--key", required=True)
+    parser.add_argument("--config", help="StubConfig as JSON")
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Serve the backend under uvicorn with an event-loop lag probe.
+
+The probe sleeps for a fixed interval on the app's own event loop and
+records how late it wakes up. ``GET /__loadtest/stats`` reports lag
+percentiles and RSS since the last ``POST /__loadtest/reset``. Only the
+load-test harness starts this; the production app is untouched.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import time
+from pathlib import Path
+
+_PROBE_INTERVAL = 0.02  # seconds
+
+_lag: list[float] = []
+
+
+async def _probe() -> None:
+    while True:
+        started = time.perf_counter()
+        await asyncio.sleep(_PROBE_INTERVAL)
+        _lag.append(max(0.0, time.perf_counter() - started - _PROBE_INTERVAL))
+
+
+def _rss_mb() -> float:
+    status = Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # peak, not current
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _install_routes(app) -> None:
+    @app.get("/__loadtest/stats", include_in_schema=False)
+    async def stats():
+        samples = list(_lag)
+        return {
+            "lag_p50_ms": _percentile(samples, 0.50) * 1000,
+            "lag_p99_ms": _percentile(samples, 0.99) * 1000,
+            "lag_max_ms": max(samples, default=0.0) * 1000,
+            "rss_mb": _rss_mb(),
+        }
+
+    @app.post("/__loadtest/reset", include_in_schema=False)
+    async def reset():
+        _lag.clear()
+        return {"status": "ok"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, required=True)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    from main import app
+
+    _install_routes(app)
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False
+    )
+    config.setup_event_loop()  # uvloop when installed, as under the uvicorn CLI
+
+    async def serve() -> None:
+        probe = asyncio.create_task(_probe())
+        try:
+            await uvicorn.Server(config).serve()
+        finally:
+            probe.cancel()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main()
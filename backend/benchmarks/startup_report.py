@@ -0,0 +1,77 @@
+"""Import-time breakdown for the backend's entry point.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter and
+reports the slowest top-level packages. With ``--budget-ms`` or
+``--forbid`` it exits non-zero, so CI can fail a change that slows down
+worker start-up or pulls a lazily-loaded SDK back into module load.
+
+Run from ``backend/``::
+
+    python -m benchmarks.startup_report --top 15
+    python -m benchmarks.startup_report --budget-ms 800 --forbid google.generativeai
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def measure(module: str = "main") -> list[tuple[str, int, int, int]]:
+    """Return ``(name, self_us, cumulative_us, depth)`` for every import."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-W", "ignore", "-c", f"import {module}"],
+        cwd=_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--forbid", action="append", default=[], metavar="MODULE")
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    by_package: dict[str, int] = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        by_package[name.split(".")[0]] += self_us
+    total_us = next((cum for name, _, cum, _ in rows if name == args.module), 0)
+
+    print(f"import {args.module}: {total_us / 1000:.1f} ms, {len(rows)} modules")
+    print(f"{'package':<32}{'ms':>10}{'share':>8}")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{package:<32}{us / 1000:>10.1f}{us / max(total_us, 1):>8.0%}")
+
+    failed = False
+    loaded = {name for name, *_ in rows}
+    for module in args.forbid:
+        if module in loaded:
+            print(f"FAIL: {module} is imported at start-up")
+            failed = True
+    if args.budget_ms is not None and total_us / 1000 > args.budget_ms:
+        print(f"FAIL: start-up import time exceeds {args.budget_ms:.0f} ms budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,49 @@
 """ResearchHubV2 – FastAPI Backend."""
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 
+from app import loop_watchdog, metrics, offload
 from app.config import get_settings
-from app.routers import papers, ai
+from app.request_id import RequestIdMiddleware
+from app.routers import alerts, favorites, papers, ai
+from app.services.alerts import run_scheduler
+from app.services import pdf_jobs
+from app.services.gemini_service import warm_up
+from app.services.warmup import run_warmup
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background: set[asyncio.Task] = set()
+    if settings.loop_watchdog:
+        loop_watchdog.start(settings.loop_block_threshold_ms)
+    if settings.ai_warmup_on_startup:
+        background.add(asyncio.create_task(warm_up()))
+    if settings.warmup_top_n > 0:
+        background.add(asyncio.create_task(run_warmup()))
+    if settings.alerts_poll_interval > 0 and settings.supabase_service_role_key:
+        background.add(asyncio.create_task(run_scheduler(settings.alerts_poll_interval)))
+    yield
+    for task in background:
+        task.cancel()
+    await pdf_jobs.shutdown()
+    offload.shutdown()
+    loop_watchdog.stop()
+
+
 app = FastAPI(
     title="ResearchHubV2 API",
     version="1.0.0",
     docs_url="/docs",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,12 +52,29 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
+)
+
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.gzip_minimum_size,
+    compresslevel=6,
 )
 
+# Outermost, so the ID is set before anything else runs
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(papers.router, prefix="/api")
 app.include_router(ai.router, prefix="/api")
+app.include_router(alerts.router, prefix="/api")
+app.include_router(favorites.router, prefix="/api")
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
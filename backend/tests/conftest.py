@@ -8,6 +8,8 @@ import jwt as pyjwt
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app import cache, dependencies
+from app.services import similarity
 from app.config import Settings, get_settings
 from main import app
 
@@ -35,6 +37,24 @@ def _override_settings():
     app.dependency_overrides[get_settings] = _test_settings
     yield
     app.dependency_overrides.clear()
+    if dependencies._token_cache is not None:
+        dependencies._token_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    """Give every test an empty in-memory result cache."""
+    cache.set_cache(cache.MemoryCache())
+    yield
+    cache.set_cache(None)
+
+
+@pytest.fixture(autouse=True)
+def _no_similarity_index():
+    """Keep tests from writing the on-disk similarity index."""
+    similarity.set_index(None)
+    yield
+    similarity.set_index(None)
 
 
 @pytest.fixture()
@@ -1,8 +1,22 @@
 """Tests for POST /api/ai/summarize and POST /api/ai/analyze-pdf."""
 
+import asyncio
+import json
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, patch
 
 import pytest
+from google.api_core.exceptions import (
+    InternalServerError,
+    InvalidArgument,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+
+from app import metrics
+from app.config import Settings
+from app.models.paper import GeneratedText, Paper
+from app.services import gemini_service, pdf_jobs
 
 
 # ── Auth tests ───────────────────────────────────────────────
@@ -44,7 +58,7 @@ async def test_summarize_rejects_invalid_token(client):
 @patch(
     "app.routers.ai.summarize_paper",
     new_callable=AsyncMock,
-    return_value="This is a test summary.",
+    return_value=GeneratedText(text="This is a test summary.", model="gemini-2.5-flash-lite"),
 )
 async def test_summarize_success(mock_summarize, client, auth_header):
     resp = await client.post(
@@ -56,12 +70,13 @@ async def test_summarize_success(mock_summarize, client, auth_header):
     data = resp.json()
     assert data["summary"] == "This is a test summary."
     assert data["language"] == "en"
+    assert data["model"] == "gemini-2.5-flash-lite"
 
 
 @patch(
     "app.routers.ai.summarize_paper",
     new_callable=AsyncMock,
-    return_value="Резюме на русском.",
+    return_value=GeneratedText(text="Резюме на русском.", model="gemini-2.5-flash-lite"),
 )
 async def test_summarize_russian(mock_summarize, client, auth_header):
     resp = await client.post(
@@ -102,7 +117,7 @@ async def test_summarize_handles_gemini_failure(mock_summarize, client, auth_hea
 @patch(
     "app.routers.ai.analyze_pdf",
     new_callable=AsyncMock,
-    return_value="Detailed PDF analysis.",
+    return_value=GeneratedText(text="Detailed PDF analysis.", model="gemini-2.5-flash"),
 )
 async def test_analyze_pdf_success(mock_analyze, client, auth_header):
     resp = await client.post(
@@ -151,3 +166,259 @@ async def test_analyze_pdf_handles_gemini_failure(mock_analyze, client, auth_hea
         headers=auth_header,
     )
     assert resp.status_code == 502
+
+
+# ── Model routing ────────────────────────────────────────────
+
+
+class _FakeModel:
+    def __init__(self, name: str, behaviour: dict[str, object]) -> None:
+        self.name = name
+        self._behaviour = behaviour
+
+    async def generate_content_async(self, contents):
+        outcome = self._behaviour[self.name]
+        if outcome == "hang":
+            await asyncio.sleep(10)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return SimpleNamespace(text=outcome)
+
+
+def _fake_genai(**behaviour: object) -> SimpleNamespace:
+    return SimpleNamespace(GenerativeModel=lambda name: _FakeModel(name, behaviour))
+
+
+_ROUTING = Settings(
+    ai_model_light="light", ai_model_strong="strong", ai_model_fallbacks="strong, backup",
+    ai_light_max_chars=100, ai_model_timeout=0.05,
+)
+
+
+@patch("app.services.gemini_service.get_settings", return_value=_ROUTING)
+def test_model_chain_picks_tier_by_input_size(_settings):
+    assert gemini_service.model_chain(100) == ["light", "strong", "backup"]
+    assert gemini_service.model_chain(101) == ["strong", "light", "backup"]
+
+
+@patch("app.services.gemini_service.get_settings", return_value=_ROUTING)
+async def test_generate_falls_back_on_error_and_timeout(_settings):
+    calls = gemini_service._calls
+    before = [calls.value(model="light", outcome="error"),
+              calls.value(model="strong", outcome="timeout")]
+    genai = _fake_genai(light=TooManyRequests("quota"), strong="hang", backup="From backup.")
+    with patch("app.services.gemini_service._load_genai", new_callable=AsyncMock,
+               return_value=genai):
+        generated = await gemini_service._generate("short prompt", size=12)
+
+    assert generated == GeneratedText(text="From backup.", model="backup", fallback=True)
+    assert [calls.value(model="light", outcome="error"),
+            calls.value(model="strong", outcome="timeout")] == [b + 1 for b in before]
+    assert 'ai_model_latency_seconds{model="backup",quantile="0.95"}' in metrics.render()
+
+
+@patch("app.services.gemini_service.get_settings", return_value=_ROUTING)
+async def test_generate_raises_when_every_model_fails(_settings):
+    genai = _fake_genai(light=ServiceUnavailable("down"), strong=InternalServerError("down"),
+                        backup=ServiceUnavailable("still down"))
+    with (
+        patch("app.services.gemini_service._load_genai", new_callable=AsyncMock,
+              return_value=genai),
+        pytest.raises(ServiceUnavailable, match="still down"),
+    ):
+        await gemini_service._generate("x" * 500, size=500)
+
+
+@patch("app.services.gemini_service.get_settings", return_value=_ROUTING)
+async def test_generate_does_not_fall_back_on_a_bad_request(_settings):
+    genai = _fake_genai(light=InvalidArgument("bad prompt"), strong="Never asked.")
+    with (
+        patch("app.services.gemini_service._load_genai", new_callable=AsyncMock,
+              return_value=genai),
+        pytest.raises(InvalidArgument),
+    ):
+        await gemini_service._generate("short prompt", size=12)
+
+
+async def test_fallback_answers_are_not_cached():
+    settings = Settings(ai_model_light="light", ai_model_strong="strong", ai_model_fallbacks="")
+    behaviour = {"light": TooManyRequests("quota"), "strong": "From strong."}
+    genai = SimpleNamespace(GenerativeModel=lambda name: _FakeModel(name, behaviour))
+    with (
+        patch("app.services.gemini_service.get_settings", return_value=settings),
+        patch("app.services.gemini_service._load_genai", new_callable=AsyncMock,
+              return_value=genai),
+    ):
+        assert (await gemini_service.summarize_paper("T", "A")).model == "strong"
+        behaviour["light"] = "From light."
+        assert (await gemini_service.summarize_paper("T", "A")).model == "light"
+        behaviour["light"] = ServiceUnavailable("down")
+        assert (await gemini_service.summarize_paper("T", "A")).model == "light"  # cached
+
+
+# ── Synthesis ────────────────────────────────────────────────
+
+_SUMMARY = GeneratedText(text="Summary.", model="gemini-2.5-flash-lite")
+
+
+def _events(text: str) -> list[tuple[str, dict]]:
+    events = []
+    for frame in filter(None, text.split("\n\n")):
+        event, data = frame.split("\n")
+        events.append((event.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+    return events
+
+
+async def _merge(notes: list[str], language: str, final: bool) -> GeneratedText:
+    refs = " ".join(n.split("]")[0].split("[")[-1] for n in notes)
+    return GeneratedText(text=f"{'review' if final else 'merged'} {refs}", model="gemini-test")
+
+
+async def test_synthesize_reduces_notes_hierarchically(client, auth_header):
+    papers = [{"title": f"Paper {i}", "abstract": "..."} for i in range(20)]
+    with (
+        patch("app.services.synthesis.get_settings",
+              return_value=Settings(ai_synthesis_fanout=4)),
+        patch("app.services.synthesis.summarize_paper",
+              new_callable=AsyncMock, return_value=_SUMMARY),
+        patch("app.services.synthesis.synthesize_notes", side_effect=_merge) as merge,
+    ):
+        resp = await client.post(
+            "/api/ai/synthesize", json={"papers": papers}, headers=auth_header
+        )
+    assert resp.status_code == 200
+    events = _events(resp.text)
+    assert sum(1 for name, _ in events if name == "note") == 20
+    levels = [data["groups"] for name, data in events if name == "level"]
+    assert levels == [5, 2, 1]  # 20 notes -> 5 -> 2 -> 1
+    assert merge.call_count == 8
+    name, final = events[-1]
+    assert name == "synthesis"
+    assert final["papers"] == 20 and final["depth"] == 3
+    assert final["text"].startswith("review")
+
+
+async def test_synthesize_skips_unusable_papers(client, auth_header):
+    found = {"arxiv:1": Paper(paper_id="arxiv:1", title="Found", abstract="A")}
+    with (
+        patch("app.services.synthesis.fetch_papers_by_ids",
+              new_callable=AsyncMock, return_value=found),
+        patch("app.services.synthesis.summarize_paper",
+              new_callable=AsyncMock, side_effect=[_SUMMARY, Exception("quota")]),
+        patch("app.services.synthesis.synthesize_notes", side_effect=_merge),
+    ):
+        resp = await client.post(
+            "/api/ai/synthesize",
+            json={"paper_ids": ["arxiv:1", "arxiv:404"], "papers": [{"title": "Inline"}]},
+            headers=auth_header,
+        )
+    events = _events(resp.text)
+    skipped = [data for name, data in events if name == "skipped"]
+    assert [s.get("paper_id") for s in skipped] == ["arxiv:404", None]
+    assert events[-1] == ("synthesis", {"text": "review 1", "papers": 1, "depth": 1})
+
+
+async def test_synthesize_rejects_empty_and_oversized_collections(client, auth_header):
+    empty = await client.post("/api/ai/synthesize", json={}, headers=auth_header)
+    assert empty.status_code == 400
+    too_many = await client.post(
+        "/api/ai/synthesize",
+        json={"paper_ids": [f"arxiv:{i}" for i in range(150)],
+              "papers": [{"title": str(i)} for i in range(60)]},
+        headers=auth_header,
+    )
+    assert too_many.status_code == 400
+
+
+# ── PDF analysis jobs ────────────────────────────────────────
+
+_PDF = {"pdf_url": "https://arxiv.org/pdf/2301.00001", "language": "en"}
+_ANALYSIS = GeneratedText(text="Analysis.", model="gemini-2.5-flash")
+
+
+@pytest.fixture(autouse=True)
+async def _stop_job_workers():
+    yield
+    await pdf_jobs.shutdown()
+
+
+async def _finished(client, auth_header, job_id: str) -> dict:
+    for _ in range(100):
+        job = (await client.get(f"/api/ai/jobs/{job_id}", headers=auth_header)).json()
+        if job["status"] in ("done", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+async def test_pdf_job_requires_auth(client):
+    resp = await client.post("/api/ai/analyze-pdf/jobs", json=_PDF)
+    assert resp.status_code == 401
+
+
+@patch("app.services.pdf_jobs.analyze_pdf", new_callable=AsyncMock, return_value=_ANALYSIS)
+async def test_pdf_job_runs_in_background(mock_analyze, client, auth_header):
+    resp = await client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header)
+    assert resp.status_code == 202
+    job_id = resp.json()["job_id"]
+    assert resp.headers["Location"] == f"/api/ai/jobs/{job_id}"
+
+    job = await _finished(client, auth_header, job_id)
+    assert job["status"] == "done"
+    assert job["result"] == {"analysis": "Analysis.", "language": "en", "model": "gemini-2.5-flash"}
+
+    again = await client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header)
+    assert again.status_code == 200
+    assert again.json()["job_id"] == job_id
+    mock_analyze.assert_awaited_once()
+
+
+async def test_identical_pdf_jobs_are_deduplicated(client, auth_header):
+    release = asyncio.Event()
+
+    async def slow_analysis(pdf_url: str, language: str) -> GeneratedText:
+        await release.wait()
+        return _ANALYSIS
+
+    with patch("app.services.pdf_jobs.analyze_pdf", side_effect=slow_analysis) as mock_analyze:
+        first, second = await asyncio.gather(
+            client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header),
+            client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header),
+        )
+        assert first.json()["job_id"] == second.json()["job_id"]
+        release.set()
+        job = await _finished(client, auth_header, first.json()["job_id"])
+    assert job["status"] == "done"
+    assert mock_analyze.call_count == 1
+
+
+@patch(
+    "app.services.pdf_jobs.analyze_pdf",
+    new_callable=AsyncMock,
+    side_effect=[ValueError("URL does not point to a PDF file"), _ANALYSIS],
+)
+async def test_failed_pdf_job_is_retried_on_resubmit(mock_analyze, client, auth_header):
+    resp = await client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header)
+    job = await _finished(client, auth_header, resp.json()["job_id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "URL does not point to a PDF file"
+
+    resp = await client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header)
+    assert resp.status_code == 202
+    assert (await _finished(client, auth_header, resp.json()["job_id"]))["status"] == "done"
+
+
+@patch("app.services.pdf_jobs.analyze_pdf", new_callable=AsyncMock, return_value=_ANALYSIS)
+async def test_pdf_job_events_stream_until_done(mock_analyze, client, auth_header):
+    job_id = (
+        await client.post("/api/ai/analyze-pdf/jobs", json=_PDF, headers=auth_header)
+    ).json()["job_id"]
+    resp = await client.get(f"/api/ai/jobs/{job_id}/events", headers=auth_header)
+    frames = [f for f in resp.text.split("\n\n") if f]
+    assert all(f.startswith("event: job") for f in frames)
+    assert '"status":"done"' in frames[-1]
+
+
+async def test_unknown_pdf_job_returns_404(client, auth_header):
+    resp = await client.get("/api/ai/jobs/nope", headers=auth_header)
+    assert resp.status_code == 404
@@ -0,0 +1,252 @@
+"""Tests for saved-search alerts (polling service and /api/alerts)."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.models.paper import Paper
+from app.services.alerts import poll_saved_searches, spec_key
+from app.services.paper_aggregator import NewPapers, _poll_arxiv
+
+_NOW = datetime(2026, 10, 19, 12, 0, tzinfo=timezone.utc)
+
+
+class FakeSupabase:
+    """Records PostgREST calls and serves canned rows."""
+
+    def __init__(self, rows: dict[str, list[dict]] | None = None) -> None:
+        self.rows = rows or {}
+        self.inserts: list[tuple[str, list[dict] | dict, dict]] = []
+        self.updates: list[tuple[str, dict, dict]] = []
+        self.deletes: list[tuple[str, dict]] = []
+
+    async def select(self, table, params):
+        return self.rows.get(table, [])
+
+    async def insert(self, table, rows, **kwargs):
+        self.inserts.append((table, rows, kwargs))
+        row = rows if isinstance(rows, dict) else rows[0]
+        return [{"id": "new-id", **row}]
+
+    async def update(self, table, filters, values):
+        self.updates.append((table, filters, values))
+        return []
+
+    async def delete(self, table, filters):
+        self.deletes.append((table, filters))
+        return self.rows.get(table, [])
+
+
+def _search(id_: str, user: str, query: str, mark: datetime) -> dict:
+    return {
+        "id": id_,
+        "user_id": user,
+        "query": query,
+        "source": None,
+        "year_from": None,
+        "year_to": None,
+        "high_water_mark": mark.isoformat(),
+    }
+
+
+class TestPollSavedSearches:
+    async def test_shared_queries_are_polled_once(self):
+        old, recent = _NOW - timedelta(days=2), _NOW - timedelta(hours=1)
+        client = FakeSupabase({"saved_searches": [
+            _search("s1", "u1", "Graph Neural Networks", old),
+            _search("s2", "u2", "  graph neural   networks ", recent),
+        ]})
+        found = [
+            (Paper(paper_id="arxiv:new", title="New"), _NOW - timedelta(minutes=5)),
+            (Paper(paper_id="arxiv:mid", title="Mid"), _NOW - timedelta(days=1)),
+        ]
+        with patch(
+            "app.services.alerts.fetch_new_papers",
+            new_callable=AsyncMock,
+            return_value=NewPapers(found, [], []),
+        ) as fetch:
+            stored = await poll_saved_searches(client)
+
+        fetch.assert_awaited_once()
+        assert fetch.await_args.args[1] == old  # oldest mark in the group
+        table, hits, kwargs = client.inserts[0]
+        assert table == "saved_search_hits"
+        assert kwargs["ignore_duplicates"] is True
+        assert {(h["saved_search_id"], h["paper_id"]) for h in hits} == {
+            ("s1", "arxiv:new"),
+            ("s1", "arxiv:mid"),
+            ("s2", "arxiv:new"),
+        }
+        assert stored == 3
+        (_, filters, values), = client.updates
+        assert filters == {"id": "in.(s1,s2)"}
+        assert values["high_water_mark"] == values["last_polled_at"]
+
+    async def test_failed_group_does_not_stop_others(self):
+        client = FakeSupabase({"saved_searches": [
+            _search("s1", "u1", "broken", _NOW),
+            _search("s2", "u2", "working", _NOW - timedelta(days=1)),
+        ]})
+
+        async def fetch(query, since, **kwargs):
+            if query == "broken":
+                raise RuntimeError("upstream down")
+            return NewPapers([(Paper(paper_id="s2:x", title="X"), _NOW)], [], [])
+
+        with patch("app.services.alerts.fetch_new_papers", side_effect=fetch):
+            stored = await poll_saved_searches(client)
+        assert stored == 1
+
+    async def test_failed_source_keeps_the_mark(self):
+        mark = _NOW - timedelta(days=1)
+        client = FakeSupabase({"saved_searches": [_search("s1", "u1", "q", mark)]})
+        poll = NewPapers([(Paper(paper_id="arxiv:1", title="A"), _NOW)], ["openalex"], [])
+        with patch("app.services.alerts.fetch_new_papers", new_callable=AsyncMock,
+                   return_value=poll):
+            assert await poll_saved_searches(client) == 1
+
+        (_, _, values), = client.updates
+        assert "high_water_mark" not in values  # openalex's new papers are retried
+        assert "last_polled_at" in values
+
+    async def test_capped_poll_advances_only_to_newest_delivered(self):
+        mark = _NOW - timedelta(days=3)
+        newest = _NOW - timedelta(days=1)
+        client = FakeSupabase({"saved_searches": [_search("s1", "u1", "q", mark)]})
+        poll = NewPapers(
+            [(Paper(paper_id="arxiv:1", title="A"), newest),
+             (Paper(paper_id="arxiv:2", title="B"), _NOW - timedelta(days=2))],
+            [], ["arxiv"],
+        )
+        with patch("app.services.alerts.fetch_new_papers", new_callable=AsyncMock,
+                   return_value=poll):
+            await poll_saved_searches(client)
+
+        (_, _, polled), (_, filters, advanced) = client.updates
+        assert "high_water_mark" not in polled
+        assert advanced == {"high_water_mark": newest.isoformat()}
+        assert filters["or"] == f"(high_water_mark.is.null,high_water_mark.lt.{newest.isoformat()})"
+
+    def test_spec_key_normalises_query(self):
+        a = {"query": "Deep  Learning", "source": "arxiv"}
+        b = {"query": "deep learning ", "source": "arxiv"}
+        assert spec_key(a) == spec_key(b)
+
+
+def _arxiv_feed(updated: list[str]) -> str:
+    entries = "".join(
+        f"""<entry><id>http://arxiv.org/abs/{i}</id><updated>{u}</updated>
+        <published>{u}</published><title>T{i}</title><summary>S</summary></entry>"""
+        for i, u in enumerate(updated)
+    )
+    return f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+
+async def test_arxiv_poll_stops_at_high_water_mark():
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, text=_arxiv_feed([
+            "2026-10-19T10:00:00Z",
+            "2026-10-19T08:00:00Z",
+            "2026-10-17T00:00:00Z",
+        ]))
+
+    real_client = httpx.AsyncClient
+    with patch(
+        "app.services.paper_aggregator.httpx.AsyncClient",
+        lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+    ):
+        found, truncated = await _poll_arxiv("q", _NOW - timedelta(days=1), 100, None, None)
+
+    assert [p.paper_id for p, _ in found] == ["arxiv:0", "arxiv:1"]
+    assert not truncated
+    assert len(requests) == 1
+    assert requests[0].url.params["sortBy"] == "lastUpdatedDate"
+
+
+# ── Router ───────────────────────────────────────────────────
+
+
+@pytest.fixture()
+def fake_db():
+    db = FakeSupabase()
+    with patch("app.routers.alerts.user_client", return_value=db) as factory:
+        db.factory = factory
+        yield db
+
+
+async def test_alerts_require_auth(client):
+    resp = await client.get("/api/alerts")
+    assert resp.status_code == 401
+
+
+async def test_create_saved_search(client, auth_header, fake_db):
+    resp = await client.post(
+        "/api/alerts",
+        json={"query": "quantum error correction", "source": "arxiv"},
+        headers=auth_header,
+    )
+    assert resp.status_code == 201
+    table, row, _ = fake_db.inserts[0]
+    assert table == "saved_searches"
+    assert row["user_id"] == "test-user-id-123"
+    # The user's own JWT is forwarded so RLS applies
+    assert fake_db.factory.call_args.args[0] == auth_header["Authorization"][7:]
+
+
+async def test_delete_missing_saved_search_returns_404(client, auth_header, fake_db):
+    resp = await client.delete(
+        "/api/alerts/5f0e3b1c-2d4a-4c8e-9b7f-1a2b3c4d5e6f", headers=auth_header
+    )
+    assert resp.status_code == 404
+
+
+async def test_malformed_saved_search_id_returns_422(client, auth_header, fake_db):
+    resp = await client.delete("/api/alerts/unknown", headers=auth_header)
+    assert resp.status_code == 422
+    resp = await client.post("/api/alerts/unknown/ack", headers=auth_header)
+    assert resp.status_code == 422
+    resp = await client.get(
+        "/api/alerts/hits", params={"saved_search_id": "unknown"}, headers=auth_header
+    )
+    assert resp.status_code == 422
+    assert not fake_db.deletes and not fake_db.updates
+
+
+async def test_list_undelivered_hits(client, auth_header, fake_db):
+    fake_db.rows["saved_search_hits"] = [{
+        "saved_search_id": "s1",
+        "paper": {"paper_id": "arxiv:1", "title": "New paper"},
+        "found_at": "2026-10-19T12:00:00+00:00",
+    }]
+    resp = await client.get("/api/alerts/hits", headers=auth_header)
+    assert resp.status_code == 200
+    assert resp.json()[0]["paper"]["title"] == "New paper"
+
+
+async def test_database_errors_become_502(client, auth_header, settings):
+    from app.services.supabase_client import SupabaseError
+
+    with patch("app.routers.alerts.user_client", side_effect=SupabaseError("not configured")):
+        resp = await client.get("/api/alerts", headers=auth_header)
+    assert resp.status_code == 502
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("connection refused", request=request)
+
+    real_client = httpx.AsyncClient
+    with (
+        patch("app.services.supabase_client.get_settings", return_value=settings),
+        patch(
+            "app.services.supabase_client.httpx.AsyncClient",
+            lambda **kw: real_client(transport=httpx.MockTransport(unreachable), **kw),
+        ),
+    ):
+        resp = await client.get("/api/alerts", headers=auth_header)
+    assert resp.status_code == 502
@@ -0,0 +1,397 @@
+"""Tests for the pluggable result cache (app.cache)."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app import cache
+from app.cache import MemoryCache, cached
+from app.cache.codec import (
+    PAPER_LIST_CODEC,
+    SEARCH_RESULT_CODEC,
+    TEXT_CODEC,
+    CodecError,
+    ModelListCodec,
+)
+from app.cache.redis import RedisCache, RedisError
+from app.cache.sqlite import SQLiteCache
+from app.models.paper import Paper, PaperSearchResult, SourceStatus
+from app.services.paper_aggregator import search_papers
+
+
+class _StandInRedis:
+    """Minimal RESP2 server supporting the commands RedisCache uses."""
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[bytes, float | None]] = {}
+        self.server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"redis://127.0.0.1:{port}/0"
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        try:
+            while True:
+                header = await reader.readuntil(b"\r\n")
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                writer.write(self._dispatch(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    def _live(self, key: bytes) -> bytes | None:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def _dispatch(self, args: list[bytes]) -> bytes:
+        cmd = args[0].upper()
+        if cmd == b"GET":
+            value = self._live(args[1])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if cmd == b"SET":
+            expires_at = None
+            if len(args) >= 5 and args[3].upper() == b"PX":
+                expires_at = time.time() + int(args[4]) / 1000
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if cmd == b"DEL":
+            removed = sum(1 for k in args[1:] if self.data.pop(k, None) is not None)
+            return b":%d\r\n" % removed
+        if cmd == b"SCAN":
+            prefix = args[3].rstrip(b"*")
+            keys = [k for k in self.data if k.startswith(prefix)]
+            body = b"".join(b"$%d\r\n%s\r\n" % (len(k), k) for k in keys)
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n%s" % (len(keys), body)
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture()
+async def redis_url():
+    server = _StandInRedis()
+    url = await server.start()
+    yield url
+    await server.stop()
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+async def backend(request, tmp_path, redis_url):
+    if request.param == "memory":
+        b = MemoryCache(max_bytes=1024 * 1024)
+    elif request.param == "sqlite":
+        b = SQLiteCache(str(tmp_path / "cache.sqlite3"))
+    else:
+        b = RedisCache(redis_url)
+    yield b
+    await b.close()
+
+
+class TestBackends:
+    async def test_set_get_delete(self, backend):
+        await backend.set("k", b"value", ttl=60)
+        assert await backend.get("k") == b"value"
+        await backend.delete("k")
+        assert await backend.get("k") is None
+
+    async def test_missing_key(self, backend):
+        assert await backend.get("nope") is None
+
+    async def test_ttl_expiry(self, backend):
+        await backend.set("k", b"value", ttl=0.05)
+        await asyncio.sleep(0.1)
+        assert await backend.get("k") is None
+
+    async def test_oversized_item_is_skipped(self, backend):
+        backend.max_item_bytes = 4
+        await backend.set("k", b"too large", ttl=60)
+        assert await backend.get("k") is None
+
+    async def test_clear(self, backend):
+        await backend.set("a", b"1", ttl=60)
+        await backend.set("b", b"2", ttl=60)
+        await backend.clear()
+        assert await backend.get("a") is None
+        assert await backend.get("b") is None
+
+
+class TestMemoryCache:
+    async def test_evicts_least_recently_used_by_size(self):
+        c = MemoryCache(max_bytes=10)
+        await c.set("a", b"aaaa", ttl=60)
+        await c.set("b", b"bbbb", ttl=60)
+        await c.get("a")
+        await c.set("c", b"cccc", ttl=60)
+        assert await c.get("b") is None
+        assert await c.get("a") == b"aaaa"
+        assert c.size == 8
+
+
+class TestRedisCache:
+    async def test_auth_is_bounded_by_the_connect_timeout(self):
+        async def silent(reader, writer):
+            await reader.read()  # accepts the connection, never replies
+
+        server = await asyncio.start_server(silent, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        c = RedisCache(f"redis://:secret@127.0.0.1:{port}/1", timeout=0.05)
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(c.get("k"), 2)
+        assert time.monotonic() - started < 1
+        await c.close()
+        server.close()
+
+    async def test_failed_select_is_not_reused(self):
+        commands: list[bytes] = []
+
+        async def refuse_select(reader, writer):
+            try:
+                while True:
+                    count = int((await reader.readuntil(b"\r\n"))[1:-2])
+                    args = []
+                    for _ in range(count):
+                        length = int((await reader.readuntil(b"\r\n"))[1:-2])
+                        args.append((await reader.readexactly(length + 2))[:-2])
+                    commands.append(args[0])
+                    writer.write(b"-ERR DB index is out of range\r\n" if args[0] == b"SELECT"
+                                 else b"$-1\r\n")
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        server = await asyncio.start_server(refuse_select, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        c = RedisCache(f"redis://127.0.0.1:{port}/3")
+        for _ in range(2):
+            with pytest.raises(RedisError):
+                await c.get("k")
+        assert commands == [b"SELECT", b"SELECT"]  # no GET ever ran against DB 0
+        await c.close()
+        server.close()
+
+
+class TestSQLiteCache:
+    async def test_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "shared.sqlite3")
+        writer, reader = SQLiteCache(path), SQLiteCache(path)
+        await writer.set("k", b"from another worker", ttl=60)
+        assert await reader.get("k") == b"from another worker"
+        await writer.close()
+        await reader.close()
+
+    async def test_evicts_to_byte_limit(self, tmp_path):
+        c = SQLiteCache(str(tmp_path / "small.sqlite3"), max_bytes=10)
+        await c.set("a", b"aaaa", ttl=60)
+        await c.set("b", b"bbbb", ttl=60)
+        await c.get("a")  # buffered access time, written with the next set
+        await c.set("c", b"cccc", ttl=60)
+        assert await c.get("b") is None
+        assert await c.get("a") == b"aaaa"
+        assert await c.get("c") == b"cccc"
+        await c.close()
+
+    async def test_reads_do_not_write_and_size_is_kept_running(self, tmp_path):
+        c = SQLiteCache(str(tmp_path / "size.sqlite3"))
+        await c.set("a", b"aaaa", ttl=60)
+        await c.set("b", b"bb", ttl=60)
+        await c.set("a", b"a", ttl=60)
+        await c.delete("b")
+        changes = c._conn.total_changes
+        assert await c.get("a") == b"a"
+        assert c._conn.total_changes == changes
+        assert c._conn.execute("SELECT bytes FROM cache_size").fetchone() == (1,)
+        await c.close()
+
+
+class TestCodecs:
+    def test_paper_list_roundtrip(self):
+        papers = [
+            Paper(paper_id=f"arxiv:{i}", title=f"T{i}", authors=["A", "B"], abstract="x" * 300)
+            for i in range(5)
+        ]
+        data = PAPER_LIST_CODEC.dumps(papers)
+        assert PAPER_LIST_CODEC.loads(data) == papers
+        assert len(data) < len("".join(p.model_dump_json() for p in papers))
+
+    def test_search_result_roundtrip(self):
+        result = PaperSearchResult(
+            total=1,
+            page=1,
+            per_page=10,
+            has_more=False,
+            papers=[Paper(paper_id="s2:1", title="T")],
+            sources=[SourceStatus(name="arxiv", ok=True)],
+        )
+        assert SEARCH_RESULT_CODEC.loads(SEARCH_RESULT_CODEC.dumps(result)) == result
+
+    def test_text_roundtrip(self):
+        text = "Резюме " * 200
+        assert TEXT_CODEC.loads(TEXT_CODEC.dumps(text)) == text
+
+    def test_schema_change_is_rejected(self):
+        from pydantic import BaseModel
+
+        class Other(BaseModel):
+            paper_id: str
+
+        data = ModelListCodec(Other).dumps([Other(paper_id="x")])
+        with pytest.raises(CodecError):
+            PAPER_LIST_CODEC.loads(data)
+
+
+class TestCachedDecorator:
+    async def test_second_call_is_served_from_cache(self):
+        calls = AsyncMock(return_value="result")
+
+        @cached("t", TEXT_CODEC, ttl=lambda: 60)
+        async def fn(x: str, y: int = 1) -> str:
+            return await calls(x, y)
+
+        assert await fn("a") == "result"
+        assert await fn("a", y=1) == "result"
+        assert calls.await_count == 1
+        await fn("b")
+        assert calls.await_count == 2
+
+    async def test_should_cache_predicate(self):
+        calls = AsyncMock(return_value="")
+
+        @cached("t", TEXT_CODEC, ttl=lambda: 60, should_cache=bool)
+        async def fn() -> str:
+            return await calls()
+
+        await fn()
+        await fn()
+        assert calls.await_count == 2
+
+    async def test_refresh_recomputes_cached_entry(self):
+        calls = AsyncMock(side_effect=["old", "new"])
+
+        @cached("t", TEXT_CODEC, ttl=lambda: 60)
+        async def fn() -> str:
+            return await calls()
+
+        assert await fn() == "old"
+        assert await fn.refresh() == "new"
+        assert await fn() == "new"
+        assert calls.await_count == 2
+
+    async def test_stale_while_revalidate_refreshes_in_background(self):
+        calls = AsyncMock(side_effect=["old", "new"])
+
+        @cached("t", TEXT_CODEC, ttl=lambda: 60, stale_while_revalidate=lambda: 60)
+        async def fn() -> str:
+            return await calls()
+
+        now = time.time()
+        with patch("app.cache.time.time", return_value=now):
+            assert await fn() == "old"
+        with patch("app.cache.time.time", return_value=now + 90):
+            # Both stale reads are answered at once; only one refresh runs
+            assert await asyncio.gather(fn(), fn()) == ["old", "old"]
+            await asyncio.gather(*cache._background)
+            assert await fn() == "new"
+        assert calls.await_count == 2
+
+    async def test_stale_if_error_serves_marked_entry(self):
+        calls = AsyncMock(side_effect=["old", ConnectionError("down"), "error", "new"])
+
+        @cached(
+            "t", TEXT_CODEC, ttl=lambda: 60,
+            stale_while_revalidate=lambda: 0,
+            stale_if_error=lambda: 3600,
+            is_error=lambda value: value == "error",
+            mark_stale=lambda value: f"stale {value}",
+        )
+        async def fn() -> str:
+            return await calls()
+
+        now = time.time()
+        with patch("app.cache.time.time", return_value=now):
+            await fn()
+        with patch("app.cache.time.time", return_value=now + 120):
+            assert await fn() == "stale old"  # raised
+            assert await fn() == "stale old"  # error result, not stored
+            assert await fn() == "new"
+        with patch("app.cache.time.time", return_value=now + 120 + 3700):
+            calls.side_effect = ConnectionError("down")
+            with pytest.raises(ConnectionError):
+                await fn()
+
+    async def test_backend_failure_falls_through(self):
+        broken = MemoryCache()
+        broken.get = AsyncMock(side_effect=ConnectionError("down"))
+        broken.set = AsyncMock(side_effect=ConnectionError("down"))
+        cache.set_cache(broken)
+
+        @cached("t", TEXT_CODEC, ttl=lambda: 60)
+        async def fn() -> str:
+            return "fresh"
+
+        assert await fn() == "fresh"
+
+    async def test_search_papers_is_cached(self):
+        arxiv = AsyncMock(return_value=[Paper(paper_id="arxiv:1", title="A")])
+        with (
+            patch("app.services.paper_aggregator._search_arxiv", arxiv),
+            patch("app.services.paper_aggregator._search_openalex", AsyncMock(return_value=[])),
+            patch("app.services.paper_aggregator._search_semantic_scholar", AsyncMock(return_value=[])),
+        ):
+            first = await search_papers(query="cached")
+            second = await search_papers(query="cached")
+        assert first == second
+        assert arxiv.await_count == 1
+
+    async def test_partial_search_results_are_not_cached(self):
+        arxiv = AsyncMock(return_value=[Paper(paper_id="arxiv:1", title="A")])
+        with (
+            patch("app.services.paper_aggregator._search_arxiv", arxiv),
+            patch(
+                "app.services.paper_aggregator._search_openalex",
+                AsyncMock(side_effect=Exception("down")),
+            ),
+            patch("app.services.paper_aggregator._search_semantic_scholar", AsyncMock(return_value=[])),
+        ):
+            await search_papers(query="partial")
+            await search_papers(query="partial")
+        assert arxiv.await_count == 2
+
+    async def test_failed_search_serves_last_good_result_marked_stale(self):
+        down = AsyncMock(side_effect=Exception("down"))
+        ok = AsyncMock(return_value=[Paper(paper_id="arxiv:1", title="A")])
+        now = time.time()
+        with (
+            patch("app.services.paper_aggregator._search_arxiv", ok),
+            patch("app.services.paper_aggregator._search_openalex", AsyncMock(return_value=[])),
+            patch("app.services.paper_aggregator._search_semantic_scholar", AsyncMock(return_value=[])),
+            patch("app.cache.time.time", return_value=now),
+        ):
+            first = await search_papers(query="outage")
+        with (
+            patch("app.services.paper_aggregator._search_arxiv", down),
+            patch("app.services.paper_aggregator._search_openalex", down),
+            patch("app.services.paper_aggregator._search_semantic_scholar", down),
+            patch("app.cache.time.time", return_value=now + 3600),
+        ):
+            result = await search_papers(query="outage")
+        assert not first.stale
+        assert result.stale
+        assert result.papers == first.papers
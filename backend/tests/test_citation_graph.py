@@ -0,0 +1,200 @@
+"""Tests for citation graph expansion and GET /api/papers/{id}/graph."""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from app.models.paper import Paper
+from app.services.citation_graph import expand_graph
+from app.services.paper_aggregator import Edges, fetch_openalex_citations, fetch_s2_neighbours
+
+# s2:root cites a, b; a cites c; c is cited by root's neighbour b as well
+_REFERENCES = {
+    "root": ["a", "b"],
+    "a": ["c"],
+    "b": ["c"],
+    "c": [],
+}
+
+
+def _p(raw: str) -> Paper:
+    return Paper(paper_id=f"s2:{raw}", title=f"Paper {raw}", source="semantic_scholar")
+
+
+async def _fake_s2(paper_id: str, direction: str, limit: int) -> list[Paper]:
+    if direction == "references":
+        return [_p(r) for r in _REFERENCES.get(paper_id, [])[:limit]]
+    return [_p(src) for src, refs in _REFERENCES.items() if paper_id in refs][:limit]
+
+
+async def _collect(**kwargs) -> list[dict]:
+    return [event async for event in expand_graph(_p("root"), **kwargs)]
+
+
+@pytest.fixture()
+def s2_mock():
+    with patch(
+        "app.services.citation_graph.fetch_s2_neighbours",
+        new_callable=AsyncMock,
+        side_effect=_fake_s2,
+    ) as mock:
+        yield mock
+
+
+class TestExpandGraph:
+    async def test_two_hop_references(self, s2_mock):
+        events = await _collect(depth=2, direction="references")
+        nodes = {e["paper"]["paper_id"]: e["depth"] for e in events if e["type"] == "node"}
+        edges = {(e["source"], e["target"]) for e in events if e["type"] == "edge"}
+        assert nodes == {"s2:root": 0, "s2:a": 1, "s2:b": 1, "s2:c": 2}
+        assert edges == {
+            ("s2:root", "s2:a"),
+            ("s2:root", "s2:b"),
+            ("s2:a", "s2:c"),
+            ("s2:b", "s2:c"),
+        }
+        assert events[-1] == {"type": "done", "nodes": 4, "edges": 4, "truncated": False}
+
+    async def test_citation_edges_point_to_cited_paper(self, s2_mock):
+        events = [
+            event async for event in expand_graph(_p("c"), depth=1, direction="citations")
+        ]
+        edges = {(e["source"], e["target"]) for e in events if e["type"] == "edge"}
+        assert edges == {("s2:a", "s2:c"), ("s2:b", "s2:c")}
+
+    async def test_max_nodes_truncates(self, s2_mock):
+        events = await _collect(depth=2, direction="references", max_nodes=2)
+        nodes = [e for e in events if e["type"] == "node"]
+        assert len(nodes) == 2
+        assert events[-1]["truncated"] is True
+        # No edge may point at a node that was never emitted
+        emitted = {n["paper"]["paper_id"] for n in nodes}
+        for e in events:
+            if e["type"] == "edge":
+                assert {e["source"], e["target"]} <= emitted
+
+    async def test_edges_are_cached_per_node(self, s2_mock):
+        await _collect(depth=2, direction="references")
+        calls = s2_mock.await_count
+        await _collect(depth=2, direction="references")
+        assert s2_mock.await_count == calls
+
+    async def test_upstream_failure_is_skipped(self):
+        with patch(
+            "app.services.citation_graph.fetch_s2_neighbours",
+            new_callable=AsyncMock,
+            side_effect=Exception("S2 down"),
+        ):
+            events = await _collect(depth=2)
+        assert [e["type"] for e in events] == ["node", "done"]
+
+    async def test_rate_limited_and_partial_fetches_are_not_cached(self, s2_mock):
+        def rate_limited(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(429, json={})
+
+        real_client = httpx.AsyncClient
+        with (
+            patch(
+                "app.services.paper_aggregator.httpx.AsyncClient",
+                lambda **kw: real_client(transport=httpx.MockTransport(rate_limited), **kw),
+            ),
+            pytest.raises(httpx.HTTPStatusError),
+        ):
+            await fetch_s2_neighbours("root", "references", 20)
+
+        s2_mock.side_effect = [httpx.ConnectError("down"), [_p("a")]]
+        await _collect(depth=1, direction="references")
+        events = await _collect(depth=1, direction="references")
+        assert s2_mock.await_count == 2  # the failure was not cached
+        assert {e["target"] for e in events if e["type"] == "edge"} == {"s2:a"}
+
+        refs = AsyncMock(return_value=Edges({"W1": []}, complete=False))
+        root = Paper(paper_id="openalex:W1", title="1", source="openalex")
+        with patch("app.services.citation_graph.fetch_openalex_references", refs):
+            for _ in range(2):
+                [e async for e in expand_graph(root, depth=1, direction="references")]
+        assert refs.await_count == 2
+
+    async def test_arxiv_root_is_expanded_through_s2(self, s2_mock):
+        root = Paper(paper_id="arxiv:2301.00001", title="A", source="arxiv")
+        [event async for event in expand_graph(root, depth=1, direction="references")]
+        s2_mock.assert_awaited_with("arXiv:2301.00001", "references", 20)
+
+    async def test_openalex_frontier_is_batched(self):
+        refs = AsyncMock(
+            return_value=Edges(
+                {"W1": [Paper(paper_id="openalex:W2", title="2")], "W9": []}, complete=True
+            )
+        )
+        root = Paper(paper_id="openalex:W1", title="1", source="openalex")
+        with patch("app.services.citation_graph.fetch_openalex_references", refs):
+            events = [e async for e in expand_graph(root, depth=1, direction="references")]
+        refs.assert_awaited_once_with(["W1"], 20)
+        assert ("openalex:W1", "openalex:W2") in {
+            (e["source"], e["target"]) for e in events if e["type"] == "edge"
+        }
+
+    async def test_crowded_out_citations_are_refetched(self):
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            cites = request.url.params["filter"].removeprefix("cites:")
+            per_page = int(request.url.params["per_page"])
+            # W1 is heavily cited: its citers fill any page that includes it
+            citers = [f"C{i}" for i in range(per_page)] if "W1" in cites else ["D1"]
+            return httpx.Response(200, json={"results": [
+                {"id": f"https://openalex.org/{c}", "title": c,
+                 "referenced_works": [f"https://openalex.org/{w}" for w in cites.split("|")
+                                      if w == "W1" or c == "D1"]}
+                for c in citers
+            ]})
+
+        real_client = httpx.AsyncClient
+        with patch(
+            "app.services.paper_aggregator.httpx.AsyncClient",
+            lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+        ):
+            citations = await fetch_openalex_citations(["W1", "W2"], limit=2)
+
+        assert [p.paper_id for p in citations["W1"]] == ["openalex:C0", "openalex:C1"]
+        assert [p.paper_id for p in citations["W2"]] == ["openalex:D1"]
+        assert requests[0].url.params["per_page"] == "4"
+        assert requests[1].url.params["filter"] == "cites:W2"
+
+
+class TestGraphEndpoint:
+    async def test_unknown_paper_returns_404(self, client):
+        with patch(
+            "app.routers.papers.fetch_papers_by_ids",
+            new_callable=AsyncMock,
+            return_value={},
+        ):
+            resp = await client.get("/api/papers/s2:missing/graph")
+        assert resp.status_code == 404
+
+    async def test_streams_sse_events(self, client, s2_mock):
+        with patch(
+            "app.routers.papers.fetch_papers_by_ids",
+            new_callable=AsyncMock,
+            return_value={"s2:root": _p("root")},
+        ):
+            resp = await client.get(
+                "/api/papers/s2:root/graph",
+                params={"depth": 1, "direction": "references"},
+            )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        frames = [f for f in resp.text.split("\n\n") if f]
+        kinds = [f.split("\n")[0].removeprefix("event: ") for f in frames]
+        assert kinds[0] == "node" and kinds[-1] == "done"
+        done = json.loads(frames[-1].split("data: ", 1)[1])
+        assert done["nodes"] == 3
+
+    async def test_rejects_bad_direction(self, client):
+        resp = await client.get("/api/papers/s2:root/graph", params={"direction": "sideways"})
+        assert resp.status_code == 422
@@ -1,14 +1,15 @@
 """Tests for the require_auth dependency (JWT validation)."""
 
 import time
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import jwt as pyjwt
 import pytest
 from fastapi import HTTPException
 
+from app import dependencies
 from app.config import Settings
-from app.dependencies import require_auth
+from app.dependencies import _RotationAwareJWKClient, _VerifiedTokenCache, require_auth
 from tests.conftest import _TEST_JWT_SECRET, make_token
 
 
@@ -81,3 +82,89 @@ async def test_wrong_secret_raises_401():
     with pytest.raises(HTTPException) as exc_info:
         await _call_require_auth(token)
     assert exc_info.value.status_code == 401
+
+
+# ── Verified-token cache ─────────────────────────────────────
+
+
+async def test_repeated_token_is_verified_once():
+    token = make_token(user_id="cached-user")
+    with patch("app.dependencies.jwt.decode", wraps=pyjwt.decode) as decode:
+        assert await _call_require_auth(token) == "cached-user"
+        assert await _call_require_auth(token) == "cached-user"
+    assert decode.call_count == 1
+
+
+async def test_changed_secret_bypasses_cache():
+    token = make_token()
+    await _call_require_auth(token)
+    rotated = _make_settings()
+    rotated.supabase_jwt_secret = "a-rotated-secret"
+    with pytest.raises(HTTPException) as exc_info:
+        await _call_require_auth(token, settings=rotated)
+    assert exc_info.value.status_code == 401
+
+
+async def test_cache_disabled_verifies_every_time():
+    settings = _make_settings()
+    settings.auth_token_cache_size = 0
+    dependencies._token_cache = None
+    token = make_token()
+    try:
+        with patch("app.dependencies.jwt.decode", wraps=pyjwt.decode) as decode:
+            await _call_require_auth(token, settings=settings)
+            await _call_require_auth(token, settings=settings)
+        assert decode.call_count == 2
+    finally:
+        dependencies._token_cache = None
+
+
+class TestVerifiedTokenCache:
+    def test_entry_expires_at_exp(self):
+        cache = _VerifiedTokenCache(maxsize=4)
+        now = time.time()
+        cache.put("d", {"sub": "u", "exp": now + 10}, "hs:k")
+        assert cache.get("d", "hs:k") == {"sub": "u", "exp": now + 10}
+        with patch("app.dependencies.time.time", return_value=now + 11):
+            assert cache.get("d", "hs:k") is None
+        assert len(cache) == 0
+
+    def test_token_without_exp_is_not_cached(self):
+        cache = _VerifiedTokenCache(maxsize=4)
+        cache.put("d", {"sub": "u"}, "hs:k")
+        assert cache.get("d", "hs:k") is None
+
+    def test_lru_eviction(self):
+        cache = _VerifiedTokenCache(maxsize=2)
+        exp = time.time() + 60
+        cache.put("a", {"exp": exp}, "k")
+        cache.put("b", {"exp": exp}, "k")
+        cache.get("a", "k")
+        cache.put("c", {"exp": exp}, "k")
+        assert cache.get("b", "k") is None
+        assert cache.get("a", "k") is not None
+        assert cache.get("c", "k") is not None
+
+    def test_key_mismatch_misses(self):
+        cache = _VerifiedTokenCache(maxsize=4)
+        cache.put("d", {"exp": time.time() + 60}, "hs:old")
+        assert cache.get("d", "hs:new") is None
+
+    def test_jwks_rotation_discards_removed_kids(self):
+        cache = dependencies._get_token_cache(16)
+        exp = time.time() + 60
+        cache.put("a", {"exp": exp}, "jwks:key-1")
+        cache.put("b", {"exp": exp}, "jwks:key-2")
+
+        client = _RotationAwareJWKClient("https://test.supabase.co/jwks.json")
+        key_sets = [
+            {"keys": [{"kid": "key-1", "x": "1"}, {"kid": "key-2", "x": "2"}]},
+            {"keys": [{"kid": "key-2", "x": "2"}, {"kid": "key-3", "x": "3"}]},
+        ]
+        with patch("jwt.PyJWKClient.fetch_data", side_effect=key_sets):
+            client.fetch_data()
+            assert cache.get("a", "jwks:key-1") is not None
+            client.fetch_data()
+
+        assert cache.get("a", "jwks:key-1") is None
+        assert cache.get("b", "jwks:key-2") is not None
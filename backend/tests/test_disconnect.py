@@ -0,0 +1,67 @@
+"""Tests for cancelling request work on client disconnect (app.disconnect)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from app.disconnect import _cancelled
+from main import app
+
+
+async def _call_and_leave(path: str, query: bytes, leave_after: float = 0.05) -> list[dict]:
+    """Send a GET straight to the ASGI app, then disconnect after a delay."""
+    sent: list[dict] = []
+    request_sent = False
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await asyncio.sleep(leave_after)
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": query,
+        "headers": [(b"host", b"test")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return sent
+
+
+async def test_disconnect_cancels_search_fan_out():
+    cancelled: list[str] = []
+
+    async def slow_source(*args, **kwargs):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append("source")
+            raise
+        return []
+
+    before = _cancelled.value(route="/api/papers/search")
+    with (
+        patch("app.services.paper_aggregator._search_arxiv", side_effect=slow_source),
+        patch("app.services.paper_aggregator._search_openalex", side_effect=slow_source),
+        patch("app.services.paper_aggregator._search_semantic_scholar", side_effect=slow_source),
+    ):
+        sent = await asyncio.wait_for(_call_and_leave("/api/papers/search", b"query=typeahead"), 2)
+
+    assert sent[0]["status"] == 499
+    assert cancelled == ["source"] * 3
+    assert _cancelled.value(route="/api/papers/search") == before + 1
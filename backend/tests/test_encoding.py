@@ -0,0 +1,21 @@
+"""Tests for response-encoding negotiation."""
+
+import json
+
+import msgpack
+
+from app.encoding import JSON, MSGPACK, encode, negotiate
+
+
+def test_encode_writes_the_same_value_in_both_formats():
+    value = {"total": 300, "papers": [{"title": "a" * 40, "year": None, "score": 1.5}], "stale": False}
+    assert msgpack.unpackb(encode(value, MSGPACK)) == value
+    assert json.loads(encode(value, JSON)) == value
+
+
+def test_negotiate_prefers_json_unless_msgpack_is_accepted():
+    assert negotiate("") == JSON
+    assert negotiate("*/*") == JSON
+    assert negotiate("application/msgpack") == MSGPACK
+    assert negotiate("application/json;q=0.9, application/x-msgpack") == MSGPACK
+    assert negotiate("application/msgpack;q=0, application/json") == JSON
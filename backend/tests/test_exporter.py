@@ -0,0 +1,131 @@
+"""Tests for streaming citation export."""
+
+from __future__ import annotations
+
+import csv
+import io
+from unittest.mock import AsyncMock, patch
+
+from app.models.paper import Paper, PaperSearchResult
+from app.services.exporter import (
+    bibtex_key,
+    format_bibtex,
+    format_ris,
+    iter_search_results,
+)
+
+_PAPER = Paper(
+    paper_id="arxiv:2301.00001",
+    title="Attention {Is} All You Need",
+    authors=["Ashish Vaswani", "Noam Shazeer"],
+    abstract="We propose the Transformer.",
+    published_date="2017-06-12",
+    source="arxiv",
+    url="https://arxiv.org/abs/2301.00001",
+    pdf_url="https://arxiv.org/pdf/2301.00001",
+)
+
+
+def _page(page: int, count: int, has_more: bool) -> PaperSearchResult:
+    return PaperSearchResult(
+        total=count,
+        page=page,
+        per_page=50,
+        has_more=has_more,
+        papers=[Paper(paper_id=f"arxiv:{page}-{i}", title=f"P{page}-{i}") for i in range(count)],
+    )
+
+
+class TestFormatters:
+    def test_bibtex(self):
+        entry = format_bibtex(_PAPER)
+        assert entry.startswith(f"@article{{{bibtex_key(_PAPER)},")
+        assert "author    = {Ashish Vaswani and Noam Shazeer}" in entry
+        assert "year      = {2017}" in entry
+        assert r"title     = {Attention \{Is\} All You Need}" in entry
+
+    def test_bibtex_key_is_stable_and_unique(self):
+        other = _PAPER.model_copy(update={"paper_id": "arxiv:other"})
+        assert bibtex_key(_PAPER).startswith("vaswani2017")
+        assert bibtex_key(_PAPER) == bibtex_key(_PAPER)
+        assert bibtex_key(_PAPER) != bibtex_key(other)
+
+    def test_ris(self):
+        entry = format_ris(_PAPER)
+        assert entry.splitlines()[:4] == [
+            "TY  - JOUR",
+            "TI  - Attention {Is} All You Need",
+            "AU  - Ashish Vaswani",
+            "AU  - Noam Shazeer",
+        ]
+        assert "DA  - 2017/06/12" in entry
+        assert entry.rstrip().endswith("ER  -")
+
+    def test_ris_keeps_each_value_on_its_line(self):
+        paper = _PAPER.model_copy(
+            update={"title": "Attention\nIs All", "abstract": "We propose\r\n  the Transformer.\n"}
+        )
+        lines = format_ris(paper).splitlines()
+        assert "TI  - Attention Is All" in lines
+        assert "AB  - We propose the Transformer." in lines
+        assert all(line[2:6] == "  - " for line in lines if line)
+
+
+class TestIterSearchResults:
+    async def test_yields_each_page_before_fetching_the_next(self):
+        pages = [_page(1, 50, True), _page(2, 50, True), _page(3, 10, False)]
+        with patch(
+            "app.services.exporter.search_papers",
+            new_callable=AsyncMock,
+            side_effect=pages,
+        ) as search:
+            stream = iter_search_results("q", max_results=1000)
+            first = await anext(stream)
+            assert len(first) == 50
+            assert search.await_count == 1
+            rest = [batch async for batch in stream]
+        assert [len(b) for b in rest] == [50, 10]
+
+    async def test_respects_max_results(self):
+        with patch(
+            "app.services.exporter.search_papers",
+            new_callable=AsyncMock,
+            side_effect=[_page(1, 50, True), _page(2, 50, True)],
+        ):
+            batches = [b async for b in iter_search_results("q", max_results=60)]
+        assert sum(len(b) for b in batches) == 60
+
+
+class TestExportEndpoints:
+    async def test_get_export_streams_csv(self, client):
+        with patch(
+            "app.services.exporter.search_papers",
+            new_callable=AsyncMock,
+            side_effect=[_page(1, 3, False)],
+        ):
+            resp = await client.get(
+                "/api/papers/export", params={"query": "q", "format": "csv"}
+            )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/csv")
+        assert 'filename="researchhub-export.csv"' in resp.headers["content-disposition"]
+        rows = list(csv.reader(io.StringIO(resp.text)))
+        assert rows[0][:2] == ["paper_id", "title"]
+        assert len(rows) == 4
+
+    async def test_post_export_by_ids(self, client):
+        with patch(
+            "app.services.exporter.fetch_papers_by_ids",
+            new_callable=AsyncMock,
+            return_value={_PAPER.paper_id: _PAPER},
+        ):
+            resp = await client.post(
+                "/api/papers/export",
+                json={"paper_ids": [_PAPER.paper_id, "s2:missing"], "format": "bibtex"},
+            )
+        assert resp.status_code == 200
+        assert resp.text.count("@article{") == 1
+
+    async def test_rejects_unknown_format(self, client):
+        resp = await client.get("/api/papers/export", params={"query": "q", "format": "docx"})
+        assert resp.status_code == 422
@@ -0,0 +1,243 @@
+"""Tests for /api/favorites (sync and full-text search) and is_favorite flags."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.config import Settings
+from app.models.paper import Paper, PaperSearchResult
+from app.routers.favorites import _decode_cursor, _encode_cursor
+from app.services import favorites
+
+
+class FakeSupabase:
+    """Serves canned rows per table and records the query parameters."""
+
+    def __init__(self) -> None:
+        self.rows: dict[str, list[dict]] = {}
+        self.selects: list[tuple[str, dict]] = []
+        self.rpcs: list[tuple[str, dict]] = []
+
+    async def select(self, table, params):
+        self.selects.append((table, params))
+        return self.rows.get(table, [])
+
+    async def rpc(self, function, args):
+        self.rpcs.append((function, args))
+        return self.rows.get(function, [])
+
+    def params(self, table: str) -> dict:
+        return next(p for t, p in self.selects if t == table)
+
+
+def _favorite(id_: str, updated_at: str) -> dict:
+    return {
+        "id": id_,
+        "paper_id": f"arxiv:{id_}",
+        "title": f"Paper {id_}",
+        "authors": ["A. Author"],
+        "updated_at": updated_at,
+    }
+
+
+@pytest.fixture()
+def fake_db():
+    db = FakeSupabase()
+    with patch("app.routers.favorites.user_client", return_value=db):
+        yield db
+
+
+async def test_sync_requires_auth(client):
+    resp = await client.get("/api/favorites/sync")
+    assert resp.status_code == 401
+
+
+async def test_initial_sync_returns_everything(client, auth_header, fake_db):
+    fake_db.rows["favorites"] = [_favorite("f1", "2026-10-01T10:00:00+00:00")]
+    fake_db.rows["favorite_tombstones"] = [
+        {"id": "f0", "paper_id": "arxiv:f0", "deleted_at": "2026-10-02T10:00:00+00:00"},
+    ]
+    resp = await client.get("/api/favorites/sync", headers=auth_header)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [f["id"] for f in data["changes"]] == ["f1"]
+    assert [t["id"] for t in data["deleted"]] == ["f0"]
+    assert data["has_more"] is False
+    assert "or" not in fake_db.params("favorites")
+    assert _decode_cursor(data["next_cursor"]) == {
+        "f": ["2026-10-01T10:00:00+00:00", "f1"],
+        "t": ["2026-10-02T10:00:00+00:00", "f0"],
+    }
+
+
+async def test_sync_resumes_after_cursor(client, auth_header, fake_db):
+    cursor = _encode_cursor({"f": ["2026-10-01T10:00:00+00:00", "f1"], "t": None})
+    resp = await client.get(
+        "/api/favorites/sync", params={"cursor": cursor}, headers=auth_header
+    )
+    assert resp.status_code == 200
+    params = fake_db.params("favorites")
+    assert params["user_id"] == "eq.test-user-id-123"
+    assert params["order"] == "updated_at.asc,id.asc"
+    assert params["or"] == (
+        '(updated_at.gt."2026-10-01T10:00:00+00:00",'
+        'and(updated_at.eq."2026-10-01T10:00:00+00:00",id.gt.f1))'
+    )
+    assert "or" not in fake_db.params("favorite_tombstones")
+    # Nothing new: the cursor is handed back unchanged
+    assert _decode_cursor(resp.json()["next_cursor"])["f"] == ["2026-10-01T10:00:00+00:00", "f1"]
+
+
+async def test_sync_pages_with_limit(client, auth_header, fake_db):
+    fake_db.rows["favorites"] = [
+        _favorite(f"f{i}", f"2026-10-0{i}T10:00:00+00:00") for i in range(1, 4)
+    ]
+    resp = await client.get(
+        "/api/favorites/sync", params={"limit": 2}, headers=auth_header
+    )
+    data = resp.json()
+    assert fake_db.params("favorites")["limit"] == 3
+    assert [f["id"] for f in data["changes"]] == ["f1", "f2"]
+    assert data["has_more"] is True
+    assert _decode_cursor(data["next_cursor"])["f"][1] == "f2"
+
+
+async def test_invalid_cursor_returns_400(client, auth_header, fake_db):
+    resp = await client.get(
+        "/api/favorites/sync", params={"cursor": "not-a-cursor"}, headers=auth_header
+    )
+    assert resp.status_code == 400
+
+
+_COLLECTION = "8b0d7c7e-3f51-4c1e-9a55-2f4e6d1b2a90"
+
+
+async def test_search_runs_ranked_rpc(client, auth_header, fake_db):
+    fake_db.rows["search_favorites"] = [
+        {**_favorite(f"f{i}", "2026-10-01T10:00:00+00:00"), "rank": 1.0 / i}
+        for i in range(1, 4)
+    ]
+    resp = await client.get(
+        "/api/favorites/search",
+        params={"q": "graph neural", "collection_id": _COLLECTION, "page": 2, "per_page": 2},
+        headers=auth_header,
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [f["id"] for f in data["results"]] == ["f1", "f2"]
+    assert data["has_more"] is True
+    function, args = fake_db.rpcs[0]
+    assert function == "search_favorites"
+    assert args == {
+        "q": "graph neural", "collection": _COLLECTION, "result_limit": 3, "result_offset": 2,
+    }
+
+
+async def test_search_passes_exclusions_through(client, auth_header, fake_db):
+    # search_favorites ANDs its 'english' and 'simple' parses when q has a
+    # "-term", so the exclusion must reach the RPC untouched
+    resp = await client.get(
+        "/api/favorites/search", params={"q": "vaswani -transformers"}, headers=auth_header
+    )
+    assert resp.status_code == 200
+    assert fake_db.rpcs[0][1]["q"] == "vaswani -transformers"
+
+
+async def test_search_validates_params(client, auth_header, fake_db):
+    resp = await client.get("/api/favorites/search", headers=auth_header)
+    assert resp.status_code == 422
+    resp = await client.get(
+        "/api/favorites/search", params={"q": "x", "collection_id": "c1"}, headers=auth_header
+    )
+    assert resp.status_code == 422
+    assert fake_db.rpcs == []
+
+
+# ── is_favorite on search results ─────────────────────────────
+
+
+@pytest.fixture()
+def index_db():
+    db = FakeSupabase()
+    favorites._sets.clear()
+    with patch("app.services.favorites.user_client", return_value=db):
+        yield db
+    favorites._sets.clear()
+
+
+async def test_search_flags_favorites_for_signed_in_user(client, auth_header, index_db):
+    index_db.rows["favorites"] = [
+        {"id": "f1", "paper_id": "arxiv:1", "updated_at": "2026-10-01T10:00:00+00:00"},
+    ]
+    page = PaperSearchResult(
+        total=2, page=1, per_page=2,
+        papers=[Paper(paper_id="arxiv:1", title="Saved"), Paper(paper_id="arxiv:2", title="New")],
+    )
+    with patch("app.routers.papers.search_papers", new_callable=AsyncMock, return_value=page):
+        mine = await client.get("/api/papers/search", params={"query": "q"}, headers=auth_header)
+        again = await client.get("/api/papers/search", params={"query": "q"}, headers=auth_header)
+        trimmed = await client.get(
+            "/api/papers/search", params={"query": "q", "fields": "paper_id,is_favorite"},
+            headers=auth_header,
+        )
+        anonymous = await client.get("/api/papers/search", params={"query": "q"})
+
+    assert [p["is_favorite"] for p in mine.json()["papers"]] == [True, False]
+    assert mine.headers["Cache-Control"].startswith("private")
+    assert again.json() == mine.json()
+    assert trimmed.json()["papers"] == [
+        {"paper_id": "arxiv:1", "is_favorite": True}, {"paper_id": "arxiv:2", "is_favorite": False},
+    ]
+    assert len(index_db.selects) == 2  # one refresh (favorites + tombstones) for all three
+    assert all("is_favorite" not in p for p in anonymous.json()["papers"])
+    assert all("is_favorite" not in p for p in page.model_dump()["papers"])  # shared page untouched
+    assert anonymous.headers["Cache-Control"].startswith("public")
+
+
+async def test_favorites_index_applies_changes_since_last_refresh(index_db):
+    index_db.rows["favorites"] = [
+        {"id": "f1", "paper_id": "arxiv:1", "updated_at": "2026-10-01T10:00:00+00:00"},
+        {"id": "f2", "paper_id": "arxiv:2", "updated_at": "2026-10-02T10:00:00+00:00"},
+    ]
+    with patch("app.services.favorites.get_settings",
+               return_value=Settings(favorites_index_refresh=0)):
+        assert await favorites.favorite_ids("u1", "token") == {"arxiv:1", "arxiv:2"}
+
+        # arxiv:1 removed; arxiv:2 removed and saved again as a new row
+        index_db.rows["favorites"] = [
+            {"id": "f3", "paper_id": "arxiv:2", "updated_at": "2026-10-03T10:00:00+00:00"},
+        ]
+        index_db.rows["favorite_tombstones"] = [
+            {"id": "f1", "deleted_at": "2026-10-03T09:00:00+00:00"},
+            {"id": "f2", "deleted_at": "2026-10-03T09:30:00+00:00"},
+        ]
+        index_db.selects.clear()
+        assert await favorites.favorite_ids("u1", "token") == {"arxiv:2"}
+
+    assert index_db.params("favorites")["or"] == (
+        '(updated_at.gt."2026-10-02T10:00:00+00:00",'
+        'and(updated_at.eq."2026-10-02T10:00:00+00:00",id.gt.f2))'
+    )
+
+
+async def test_favorites_index_flags_unsettled_rows_without_passing_them(index_db):
+    just_now = datetime.now(timezone.utc).isoformat()
+    index_db.rows["favorites"] = [
+        {"id": "f1", "paper_id": "arxiv:1", "updated_at": "2026-10-01T10:00:00+00:00"},
+        {"id": "f2", "paper_id": "arxiv:2", "updated_at": just_now},
+    ]
+    with patch("app.services.favorites.get_settings",
+               return_value=Settings(favorites_index_refresh=0)):
+        assert await favorites.favorite_ids("u1", "token") == {"arxiv:1", "arxiv:2"}
+        index_db.selects.clear()
+        await favorites.favorite_ids("u1", "token")
+
+    params = index_db.params("favorites")
+    assert "updated_at" not in params  # no settle bound on the flag set
+    assert params["or"] == (
+        '(updated_at.gt."2026-10-01T10:00:00+00:00",'
+        'and(updated_at.eq."2026-10-01T10:00:00+00:00",id.gt.f1))'
+    )
@@ -0,0 +1,84 @@
+"""Tests for the event-loop watchdog, request IDs and /metrics."""
+
+import asyncio
+import time
+
+from fastapi import FastAPI, Request
+from httpx import ASGITransport, AsyncClient
+
+from app import loop_watchdog
+from app.disconnect import until_disconnect
+from app.request_id import RequestIdMiddleware
+
+
+def _blocking_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestIdMiddleware)
+
+    @app.get("/block/{ms}")
+    async def block(ms: int):
+        time.sleep(ms / 1000)  # deliberately blocks the loop
+        return {"ok": True}
+
+    @app.get("/block-in-task/{ms}")
+    async def block_in_task(request: Request, ms: int):
+        async def work() -> dict:
+            time.sleep(ms / 1000)
+            return {"ok": True}
+
+        return await until_disconnect(request, work())
+
+    return app
+
+
+async def test_blocking_callback_is_reported_with_route_and_request_id():
+    watchdog = loop_watchdog.LoopWatchdog(threshold=0.05)
+    watchdog.start()
+    try:
+        transport = ASGITransport(app=_blocking_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            resp = await ac.get("/block/300", headers={"X-Request-ID": "req-42"})
+    finally:
+        watchdog.stop()
+
+    assert resp.headers["X-Request-ID"] == "req-42"
+    assert len(watchdog.reports) == 1
+    report = watchdog.reports[0]
+    assert report.route == "/block/{ms}"
+    assert report.request_id == "req-42"
+    assert "time.sleep" in report.stack
+    assert report.blocked_ms >= 50
+
+
+async def test_blocking_work_in_a_request_task_is_attributed():
+    watchdog = loop_watchdog.LoopWatchdog(threshold=0.05)
+    watchdog.start()
+    try:
+        transport = ASGITransport(app=_blocking_app())
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            await ac.get("/block-in-task/300", headers={"X-Request-ID": "req-43"})
+    finally:
+        watchdog.stop()
+
+    [report] = watchdog.reports
+    assert (report.route, report.request_id) == ("/block-in-task/{ms}", "req-43")
+
+
+async def test_invalid_request_id_is_replaced(client):
+    resp = await client.get("/health", headers={"X-Request-ID": "bad id\twith spaces"})
+    generated = resp.headers["X-Request-ID"]
+    assert generated != "bad id\twith spaces"
+    assert len(generated) == 32
+
+
+async def test_metrics_export_loop_lag(client):
+    loop_watchdog.start(threshold_ms=100)
+    try:
+        await asyncio.sleep(0.1)  # a few heartbeats
+        resp = await client.get("/metrics")
+    finally:
+        loop_watchdog.stop()
+
+    assert resp.status_code == 200
+    assert 'event_loop_lag_seconds{quantile="0.99"}' in resp.text
+    assert "event_loop_blocked_total" in resp.text
@@ -0,0 +1,56 @@
+"""Tests for the CPU offload executor."""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from app import offload
+from app.config import Settings
+from app.services.paper_aggregator import _parse_arxiv_feed, _to_paper
+
+_FEED = (
+    b'<feed xmlns="http://www.w3.org/2005/Atom"><entry>'
+    b"<id>http://arxiv.org/abs/2401.00001v1</id>"
+    b"<published>2024-01-02T00:00:00Z</published>"
+    b"<title>Offloaded\n parsing</title><summary>Abstract</summary>"
+    b"<author><name>A. Author</name></author>"
+    b'<link title="pdf" href="http://arxiv.org/pdf/2401.00001v1"/>'
+    b"</entry></feed>"
+)
+
+
+def _thread_name() -> str:
+    return threading.current_thread().name
+
+
+def _settings(**overrides):
+    return patch("app.offload.get_settings", return_value=Settings(**overrides))
+
+
+@pytest.fixture(autouse=True)
+def _shutdown_executor():
+    yield
+    offload.shutdown()
+
+
+async def test_small_payloads_run_inline():
+    with _settings(offload_executor="thread", offload_min_bytes=1024):
+        name = await offload.run_cpu(_thread_name, size=100)
+    assert name == threading.current_thread().name
+
+
+async def test_large_payloads_run_in_thread_pool():
+    with _settings(offload_executor="thread", offload_min_bytes=1024):
+        name = await offload.run_cpu(_thread_name, size=4096)
+    assert name.startswith("offload")
+
+
+async def test_process_pool_returns_plain_rows():
+    with _settings(offload_executor="process", offload_workers=1, offload_min_bytes=0):
+        rows = await offload.run_cpu(_parse_arxiv_feed, _FEED, 10, 2020, None, size=len(_FEED))
+    assert rows == _parse_arxiv_feed(_FEED, 10, 2020, None)
+    paper = _to_paper(rows[0])
+    assert paper.paper_id == "arxiv:2401.00001v1"
+    assert paper.title == "Offloaded  parsing"
+    assert paper.authors == ["A. Author"]
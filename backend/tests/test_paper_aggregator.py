@@ -1,12 +1,22 @@
 """Tests for paper_aggregator service."""
 
+import asyncio
 from unittest.mock import AsyncMock, patch
 
 import httpx
 import pytest
 
-from app.models.paper import Paper
-from app.services.paper_aggregator import _reconstruct_abstract, search_papers
+from app.cache import get_cache
+from app.config import Settings
+from app.models.paper import Paper, PaperSearchResult, SearchSpec
+from app.services.paper_aggregator import (
+    _reconstruct_abstract,
+    fetch_papers_by_ids,
+    get_facets,
+    search_many,
+    search_papers,
+)
+from app.services.source_routing import SourceStats
 
 
 class TestReconstructAbstract:
@@ -110,3 +120,297 @@ class TestSearchPapers:
             openalex = next(s for s in result.sources if s.name == "openalex")
             assert openalex.ok is False
             assert openalex.error is not None
+
+
+def _papers(source: str, n: int) -> list[Paper]:
+    return [Paper(paper_id=f"{source}:{i}", title=f"{source} paper {i}") for i in range(n)]
+
+
+def _warm(stats: SourceStats, name: str, latency: float, count: int, duplicates: int = 0):
+    for _ in range(10):
+        stats.record(name, latency, count=count, duplicates=duplicates)
+
+
+class TestAdaptiveRouting:
+    def test_cold_sources_are_all_queried_first(self):
+        first, fallback = SourceStats().plan(["arxiv", "openalex"], per_page=10)
+        assert first == ["arxiv", "openalex"]
+        assert fallback == []
+
+    def test_fast_high_yield_sources_go_first(self):
+        stats = SourceStats()
+        _warm(stats, "arxiv", latency=2.0, count=10)
+        _warm(stats, "openalex", latency=0.2, count=10)
+        _warm(stats, "semantic_scholar", latency=0.2, count=10, duplicates=5)
+        first, fallback = stats.plan(["arxiv", "openalex", "semantic_scholar"], per_page=10)
+        assert first == ["openalex"]
+        assert fallback == ["semantic_scholar", "arxiv"]
+
+    def test_long_skipped_source_is_resampled(self):
+        stats = SourceStats()
+        _warm(stats, "arxiv", latency=2.0, count=10)
+        _warm(stats, "openalex", latency=0.2, count=10)
+        for _ in range(20):
+            stats.skip("arxiv")
+        first, _ = stats.plan(["arxiv", "openalex"], per_page=10)
+        assert "arxiv" in first
+
+    def test_errors_are_penalised_once(self):
+        stats = SourceStats()
+        _warm(stats, "arxiv", latency=1.0, count=10)
+        for _ in range(10):
+            stats.record("arxiv", 1.0, error=True)
+        summary = stats.summary("arxiv")
+        assert (summary.mean_count, summary.error_rate) == (10, 0.5)
+        assert summary.expected_unique == 5
+
+    @pytest.fixture()
+    def adaptive(self):
+        stats = SourceStats()
+        _warm(stats, "arxiv", latency=2.0, count=10)
+        _warm(stats, "openalex", latency=0.2, count=10)
+        _warm(stats, "semantic_scholar", latency=1.0, count=10)
+        with (
+            patch("app.services.paper_aggregator._source_stats", stats),
+            patch(
+                "app.services.paper_aggregator.get_settings",
+                return_value=Settings(search_routing="adaptive"),
+            ),
+        ):
+            yield stats
+
+    async def test_full_page_skips_remaining_sources(self, adaptive):
+        with (
+            patch("app.services.paper_aggregator._search_arxiv", new_callable=AsyncMock) as arxiv,
+            patch(
+                "app.services.paper_aggregator._search_openalex",
+                new_callable=AsyncMock,
+                return_value=_papers("openalex", 10),
+            ),
+            patch(
+                "app.services.paper_aggregator._search_semantic_scholar", new_callable=AsyncMock
+            ) as s2,
+        ):
+            result = await search_papers(query="adaptive-full", per_page=10)
+        arxiv.assert_not_called()
+        s2.assert_not_called()
+        routing = {s.name: s.routing for s in result.sources}
+        assert routing == {"arxiv": "skipped", "openalex": "primary", "semantic_scholar": "skipped"}
+        assert result.has_more is True
+        assert next(s for s in result.sources if s.name == "openalex").latency_ms is not None
+
+    async def test_short_page_calls_fallbacks(self, adaptive):
+        with (
+            patch(
+                "app.services.paper_aggregator._search_arxiv",
+                new_callable=AsyncMock,
+                return_value=_papers("arxiv", 10),
+            ),
+            patch(
+                "app.services.paper_aggregator._search_openalex",
+                new_callable=AsyncMock,
+                return_value=_papers("openalex", 3),
+            ),
+            patch(
+                "app.services.paper_aggregator._search_semantic_scholar",
+                new_callable=AsyncMock,
+                return_value=_papers("semantic_scholar", 10),
+            ),
+        ):
+            result = await search_papers(query="adaptive-short", per_page=10)
+        assert len(result.papers) == 10
+        routing = {s.name: s.routing for s in result.sources}
+        assert routing == {"arxiv": "fallback", "openalex": "primary", "semantic_scholar": "fallback"}
+        assert adaptive.summary("openalex").mean_count < 10
+
+    async def test_pages_of_a_query_share_one_plan(self, adaptive):
+        with (
+            patch(
+                "app.services.paper_aggregator._search_arxiv",
+                new_callable=AsyncMock,
+                return_value=_papers("arxiv", 10),
+            ) as arxiv,
+            patch(
+                "app.services.paper_aggregator._search_openalex",
+                new_callable=AsyncMock,
+                return_value=_papers("openalex", 10),
+            ),
+            patch(
+                "app.services.paper_aggregator._search_semantic_scholar", new_callable=AsyncMock
+            ),
+        ):
+            await search_papers(query="Paged Query", per_page=10)
+            assert any(k.startswith("search-plan:") for k in get_cache()._entries)
+            # Another worker, whose stats rank arxiv first, serves page 2
+            other = SourceStats()
+            for _ in range(5):
+                _warm(other, "arxiv", latency=0.01, count=10)
+            with patch("app.services.paper_aggregator._source_stats", other):
+                await search_papers(query="paged query", page=2, per_page=10)
+                assert arxiv.await_count == 0
+                await search_papers(query="another query", per_page=10)
+                assert arxiv.await_count == 1
+
+
+async def test_upstream_urls_come_from_settings():
+    seen: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(str(request.url.copy_with(query=None)))
+        if "arxiv" in request.url.path:
+            return httpx.Response(200, text='<feed xmlns="http://www.w3.org/2005/Atom"/>')
+        return httpx.Response(200, json={"results": [], "data": []})
+
+    settings = Settings(
+        arxiv_api_url="http://stub/arxiv/api/query",
+        openalex_api_url="http://stub/openalex",
+        semantic_scholar_api_url="http://stub/s2/graph/v1",
+    )
+    real_client = httpx.AsyncClient
+    with (
+        patch("app.services.paper_aggregator.get_settings", return_value=settings),
+        patch(
+            "app.services.paper_aggregator.httpx.AsyncClient",
+            lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+        ),
+    ):
+        await search_papers(query="stub-urls")
+    assert sorted(seen) == [
+        "http://stub/arxiv/api/query",
+        "http://stub/openalex/works",
+        "http://stub/s2/graph/v1/paper/search",
+    ]
+
+
+class TestFetchPapersByIds:
+    async def test_groups_ids_per_source(self):
+        with (
+            patch(
+                "app.services.paper_aggregator._fetch_arxiv_ids",
+                new_callable=AsyncMock,
+                return_value=[Paper(paper_id="arxiv:1", title="A")],
+            ) as arxiv,
+            patch(
+                "app.services.paper_aggregator._fetch_openalex_ids",
+                new_callable=AsyncMock,
+                return_value=[Paper(paper_id="openalex:W1", title="O")],
+            ) as openalex,
+            patch(
+                "app.services.paper_aggregator._fetch_s2_ids",
+                new_callable=AsyncMock,
+                side_effect=httpx.ConnectError("down"),
+            ),
+        ):
+            found = await fetch_papers_by_ids(
+                ["arxiv:1", "openalex:W1", "openalex:W2", "s2:x", "arxiv:1", "bogus"]
+            )
+        arxiv.assert_awaited_once_with(["1"])
+        openalex.assert_awaited_once_with(["W1", "W2"])
+        assert set(found) == {"arxiv:1", "openalex:W1"}
+
+    async def test_splits_large_batches(self):
+        ids = [f"openalex:W{i}" for i in range(120)]
+        with patch(
+            "app.services.paper_aggregator._fetch_openalex_ids",
+            new_callable=AsyncMock,
+            return_value=[],
+        ) as openalex:
+            await fetch_papers_by_ids(ids)
+        assert [len(c.args[0]) for c in openalex.await_args_list] == [50, 50, 20]
+
+
+async def test_search_many_shares_a_concurrency_budget():
+    running = peak = 0
+
+    async def fake_search(query: str, **kwargs) -> PaperSearchResult:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if query == "broken":
+            raise RuntimeError("boom")
+        papers = [
+            Paper(paper_id=f"{query}:1", title="Shared Survey"),
+            Paper(paper_id=f"{query}:2", title=f"Only {query}"),
+        ]
+        return PaperSearchResult(total=2, page=1, per_page=10, papers=papers)
+
+    specs = [SearchSpec(query=q) for q in ("a", "b", "c", "d", "broken")]
+    with (
+        patch("app.services.paper_aggregator.search_papers", side_effect=fake_search),
+        patch(
+            "app.services.paper_aggregator.get_settings",
+            return_value=Settings(multi_search_concurrency=2),
+        ),
+    ):
+        result = await search_many(specs)
+    assert peak == 2
+    assert [r.paper_ids[0] for r in result.results[:4]] == ["a:1"] * 4  # deduped by title
+    assert result.results[4].error == "RuntimeError"
+    assert len(result.papers) == 5
+
+
+async def test_search_many_coalesces_on_normalized_query_but_sends_it_as_written():
+    page = PaperSearchResult(total=0, page=1, per_page=10, papers=[])
+    specs = [SearchSpec(query=q) for q in ('"Graph  Nets" AND gnn', '"graph nets" and GNN')]
+    with patch(
+        "app.services.paper_aggregator.search_papers", new_callable=AsyncMock, return_value=page
+    ) as search:
+        result = await search_many(specs)
+    assert len(result.results) == 2
+    search.assert_awaited_once()
+    assert search.await_args.kwargs["query"] == '"Graph  Nets" AND gnn'
+
+
+class TestFacets:
+    @staticmethod
+    def _upstream(requests: list[httpx.Request], s2_status: int = 200):
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if "arxiv" in request.url.host:
+                return httpx.Response(200, text=(
+                    '<feed xmlns="http://www.w3.org/2005/Atom" '
+                    'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+                    "<opensearch:totalResults>1234</opensearch:totalResults></feed>"
+                ))
+            if "semanticscholar" in request.url.host:
+                return httpx.Response(s2_status, json={"total": 5678, "data": [{"paperId": "x"}]})
+            if request.url.params["group_by"] == "publication_year":
+                groups = [{"key": "2021", "count": 40}, {"key": "2019", "count": 10}]
+            else:
+                groups = [{"key": "true", "count": 30}, {"key": "false", "count": 20}]
+            return httpx.Response(200, json={"meta": {"count": 50}, "results": [], "group_by": groups})
+
+        real_client = httpx.AsyncClient
+        return patch(
+            "app.services.paper_aggregator.httpx.AsyncClient",
+            lambda **kw: real_client(transport=httpx.MockTransport(handler), **kw),
+        )
+
+    async def test_counts_without_fetching_result_pages(self):
+        requests: list[httpx.Request] = []
+        with self._upstream(requests):
+            facets = await get_facets("Graph  Neural Networks")
+            again = await get_facets("graph neural networks")
+        assert again == facets.model_copy(update={"query": "graph neural networks"})
+        assert len(requests) == 4  # second call served from the cache
+        assert facets.query == "Graph  Neural Networks"
+        s2 = next(r for r in requests if "semanticscholar" in r.url.host)
+        assert s2.url.params["query"] == "Graph  Neural Networks"  # sent as written
+        assert [(y.year, y.count) for y in facets.years] == [(2019, 10), (2021, 40)]
+        assert (facets.open_access, facets.closed_access) == (30, 20)
+        totals = {s.name: s.total for s in facets.sources}
+        assert totals == {"openalex": 50, "arxiv": 1234, "semantic_scholar": 5678}
+        arxiv = next(r for r in requests if "arxiv" in r.url.host)
+        assert arxiv.url.params["max_results"] == "0"
+
+    async def test_failed_source_is_reported_and_not_cached(self):
+        requests: list[httpx.Request] = []
+        with self._upstream(requests, s2_status=429):
+            facets = await get_facets("flaky")
+            await get_facets("flaky")
+        s2 = next(s for s in facets.sources if s.name == "semantic_scholar")
+        assert not s2.ok and s2.total is None
+        assert facets.years  # the other sources still answered
+        assert len(requests) == 8
@@ -2,9 +2,10 @@
 
 from unittest.mock import AsyncMock, patch
 
+import msgpack
 import pytest
 
-from app.models.paper import Paper
+from app.models.paper import Paper, PaperFacets, YearCount
 
 
 def _fake_papers(source: str, count: int = 2) -> list[Paper]:
@@ -117,3 +118,144 @@ async def test_search_deduplicates_by_title(client):
         resp = await client.get("/api/papers/search", params={"query": "dup"})
         data = resp.json()
         assert data["total"] == 1
+
+
+# ── Conditional GET / compression ────────────────────────────
+
+
+async def test_search_sets_etag_and_cache_control(client, mock_search_sources):
+    resp = await client.get("/api/papers/search", params={"query": "quantum"})
+    assert resp.status_code == 200
+    assert resp.headers["etag"].startswith('W/"')
+    assert "max-age=" in resp.headers["cache-control"]
+
+
+async def test_search_etag_is_stable(client, mock_search_sources):
+    first = await client.get("/api/papers/search", params={"query": "quantum"})
+    second = await client.get("/api/papers/search", params={"query": "quantum"})
+    assert first.headers["etag"] == second.headers["etag"]
+
+
+async def test_search_if_none_match_returns_304(client, mock_search_sources):
+    first = await client.get("/api/papers/search", params={"query": "quantum"})
+    resp = await client.get(
+        "/api/papers/search",
+        params={"query": "quantum"},
+        headers={"If-None-Match": first.headers["etag"]},
+    )
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["etag"] == first.headers["etag"]
+
+
+async def test_search_stale_etag_returns_full_page(client, mock_search_sources):
+    resp = await client.get(
+        "/api/papers/search",
+        params={"query": "quantum"},
+        headers={"If-None-Match": 'W/"outdated"'},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["papers"]
+
+
+async def test_large_search_response_is_gzipped(client):
+    papers = [
+        Paper(paper_id=f"arxiv:{i}", title=f"Paper {i}", abstract="word " * 200, source="arxiv")
+        for i in range(10)
+    ]
+    with (
+        patch("app.services.paper_aggregator._search_arxiv", new_callable=AsyncMock, return_value=papers),
+        patch("app.services.paper_aggregator._search_openalex", new_callable=AsyncMock, return_value=[]),
+        patch("app.services.paper_aggregator._search_semantic_scholar", new_callable=AsyncMock, return_value=[]),
+    ):
+        resp = await client.get(
+            "/api/papers/search",
+            params={"query": "big"},
+            headers={"Accept-Encoding": "gzip"},
+        )
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert len(resp.json()["papers"]) == 10
+
+
+async def test_small_response_is_not_compressed(client):
+    resp = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in resp.headers
+
+
+# ── Projection and encodings ─────────────────────────────────
+
+
+async def test_search_projects_fields_for_list_views(client, mock_search_sources):
+    long_abstract = "word " * 100
+    mock_search_sources["arxiv"].return_value = [
+        Paper(paper_id="arxiv:9", title="Long", authors=["A", "B", "C"], abstract=long_abstract),
+    ]
+    resp = await client.get(
+        "/api/papers/search",
+        params={
+            "query": "projection",
+            "source": "arxiv",
+            "fields": "paper_id,title,authors,abstract",
+            "abstract_chars": 20,
+            "max_authors": 2,
+        },
+    )
+    assert resp.status_code == 200
+    paper = resp.json()["papers"][0]
+    assert paper == {
+        "paper_id": "arxiv:9",
+        "title": "Long",
+        "authors": ["A", "B"],
+        "abstract": "word word word word…",
+    }
+
+
+async def test_search_rejects_unknown_fields(client):
+    resp = await client.get("/api/papers/search", params={"query": "q", "fields": "title,secret"})
+    assert resp.status_code == 400
+    assert "secret" in resp.json()["detail"]
+
+
+async def test_search_negotiates_msgpack(client, mock_search_sources):
+    resp = await client.get(
+        "/api/papers/search",
+        params={"query": "msgpack", "fields": "paper_id,title"},
+        headers={"Accept": "application/msgpack"},
+    )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"] == "application/msgpack"
+    assert resp.headers["vary"] == "Accept, Authorization"
+    data = msgpack.unpackb(resp.content)
+    assert data["total"] == 6
+    assert set(data["papers"][0]) == {"paper_id", "title"}
+
+
+async def test_facets_endpoint_is_cacheable(client):
+    facets = PaperFacets(query="llm", years=[YearCount(year=2024, count=3)], open_access=2)
+    with patch(
+        "app.routers.papers.get_facets", new_callable=AsyncMock, return_value=facets
+    ) as get_facets:
+        resp = await client.get("/api/papers/facets", params={"query": "LLM"})
+    assert resp.status_code == 200
+    assert resp.json()["years"] == [{"year": 2024, "count": 3}]
+    assert "ETag" in resp.headers
+    get_facets.assert_awaited_once_with("LLM")
+
+
+async def test_multi_search_coalesces_and_dedupes(client, mock_search_sources):
+    queries = [
+        {"query": "quantum"},
+        {"query": "  Quantum "},
+        {"query": "quantum", "source": "arxiv"},
+    ]
+    resp = await client.post("/api/papers/search/multi", json={"queries": queries})
+    assert resp.status_code == 200
+    data = resp.json()
+    first, second, arxiv_only = data["results"]
+    assert first == second
+    assert set(arxiv_only["paper_ids"]) <= set(first["paper_ids"])
+    assert len(data["papers"]) == 6
+    # Two distinct searches: the combined one and the arXiv-only one
+    assert mock_search_sources["arxiv"].await_count == 2
+    assert mock_search_sources["openalex"].await_count == 1
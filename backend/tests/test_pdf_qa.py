@@ -0,0 +1,114 @@
+"""Tests for PDF question answering (app.services.pdf_qa, POST /api/ai/ask-pdf)."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.paper import GeneratedText
+from app.services import pdf_qa
+from app.services.pdf_qa import ChunkIndex, chunk_text
+
+_PAPER = " ".join(
+    ["We study graph neural networks for molecule property prediction."] * 30
+    + ["The training used a learning rate of 0.001 with the Adam optimizer."] * 3
+    + ["Limitations include small datasets and missing 3D conformers."] * 30
+)
+
+
+@pytest.fixture(autouse=True)
+def _no_built_indexes():
+    pdf_qa._indexes.clear()
+    yield
+    pdf_qa._indexes.clear()
+
+
+def test_chunks_overlap_and_cover_the_text():
+    words = [f"w{i}" for i in range(450)]
+    chunks = chunk_text(" ".join(words), words=200, overlap=40)
+    assert [len(c.split()) for c in chunks] == [200, 200, 130]
+    assert chunks[1].split()[0] == "w160"
+    assert chunks[-1].split()[-1] == "w449"
+
+
+def test_bm25_ranks_rare_terms_first():
+    index = ChunkIndex(chunk_text(_PAPER, words=40, overlap=0))
+    (best, score), *_ = index.search("Which optimizer and learning rate?", k=3)
+    assert "Adam optimizer" in index.chunks[best]
+    assert score > 0
+    assert index.search("quantum chromodynamics", k=3) == []
+
+
+async def test_later_questions_reuse_the_index(client, auth_header):
+    with (
+        patch("app.services.pdf_qa.get_settings") as settings,
+        patch("app.services.pdf_qa.download_pdf", new_callable=AsyncMock,
+              return_value=b"%PDF-1.7 ...") as download,
+        patch("app.services.pdf_qa.extract_pdf_text", new_callable=AsyncMock,
+              return_value=GeneratedText(text=_PAPER, model="m")) as extract,
+        patch("app.services.pdf_qa.answer_from_passages", new_callable=AsyncMock,
+              return_value=GeneratedText(text="Adam, lr 0.001 [1].", model="m")) as answer,
+    ):
+        settings.return_value.pdf_chunk_words = 40
+        settings.return_value.pdf_chunk_overlap = 0
+        settings.return_value.pdf_top_k = 2
+        settings.return_value.ai_cache_ttl = 60
+        body = {"pdf_url": "https://arxiv.org/pdf/2301.00001", "question": "Which optimizer?"}
+        first = await client.post("/api/ai/ask-pdf", json=body, headers=auth_header)
+        pdf_qa._indexes.clear()  # another worker: index comes from the shared cache
+        second = await client.post(
+            "/api/ai/ask-pdf", json={**body, "question": "What are the limitations?"},
+            headers=auth_header,
+        )
+
+    assert first.status_code == 200 and second.status_code == 200
+    assert first.json()["answer"] == "Adam, lr 0.001 [1]."
+    assert any("Adam" in p["text"] for p in first.json()["passages"])
+    assert all("Limitations" in p["text"] for p in second.json()["passages"])
+    download.assert_awaited_once()
+    extract.assert_awaited_once()
+    question, passages, language = answer.await_args_list[1].args
+    assert len(passages) == 2  # top-k only, not the whole document
+
+
+async def test_fallback_transcription_is_not_cached():
+    extract = AsyncMock(side_effect=[
+        GeneratedText(text=_PAPER, model="backup", fallback=True),
+        GeneratedText(text=_PAPER, model="primary"),
+    ])
+    with (
+        patch("app.services.pdf_qa.get_settings") as settings,
+        patch("app.services.pdf_qa.download_pdf", new_callable=AsyncMock, return_value=b"%PDF"),
+        patch("app.services.pdf_qa.extract_pdf_text", extract),
+    ):
+        settings.return_value.pdf_chunk_words = 40
+        settings.return_value.pdf_chunk_overlap = 0
+        settings.return_value.ai_cache_ttl = 60
+        for _ in range(3):
+            await pdf_qa.load_index("https://arxiv.org/pdf/2301.00002")
+    assert extract.await_count == 2  # retried after the fallback, then cached
+
+
+async def test_shared_build_is_cancelled_only_with_its_last_question():
+    started = asyncio.Event()
+
+    async def slow_build(pdf_url: str):
+        started.set()
+        await asyncio.sleep(10)
+
+    with patch("app.services.pdf_qa._build", side_effect=slow_build):
+        first = asyncio.ensure_future(pdf_qa.load_index("https://x/a.pdf"))
+        second = asyncio.ensure_future(pdf_qa.load_index("https://x/a.pdf"))
+        await started.wait()
+        build = pdf_qa._building["https://x/a.pdf"]
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert not build.cancelled()  # the other question still wants it
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+    assert build.cancelled()
+    assert "https://x/a.pdf" not in pdf_qa._building
@@ -0,0 +1,134 @@
+"""Tests for the similar-papers vector index and /api/papers/{id}/similar."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+
+from app.models.paper import Paper
+from app.services import similarity
+from app.services.similarity import IndexLockedError, SimilarityIndex
+
+
+def _paper(id_: str, title: str, abstract: str = "") -> Paper:
+    return Paper(paper_id=id_, title=title, abstract=abstract, source="arxiv")
+
+
+_CORPUS = [
+    _paper("p1", "Graph neural networks for molecules", "message passing on molecular graphs"),
+    _paper("p2", "Molecular property prediction with graph networks", "graph neural message passing"),
+    _paper("p3", "Medieval trade routes in Central Asia", "caravans, silk and commerce"),
+    _paper("p4", "Silk road commerce and caravan cities", "trade routes of central asia"),
+]
+
+
+@pytest.fixture()
+def index(tmp_path):
+    index = SimilarityIndex(tmp_path / "index", dim=128)
+    index.add(_CORPUS)
+    return index
+
+
+def test_similar_ranks_topical_neighbour_first(index):
+    results = index.similar("p1", 3)
+    assert [p.paper_id for p, _ in results][0] == "p2"
+    assert "p1" not in [p.paper_id for p, _ in results]
+    assert index.similar("p3", 1)[0][0].paper_id == "p4"
+    assert index.similar("unknown", 3) is None
+
+
+def test_add_skips_known_papers(index):
+    assert index.add([_CORPUS[0], _paper("p5", "New paper")]) == 1
+    assert len(index) == 5
+
+
+def test_index_grows_and_reopens(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "_INITIAL_CAPACITY", 2)
+    path = tmp_path / "index"
+    index = SimilarityIndex(path, dim=128)
+    index.add(_CORPUS[:2])
+    index.add(_CORPUS[2:])
+    before = [(p.paper_id, s) for p, s in index.similar("p3", 3)]
+    with pytest.raises(IndexLockedError):
+        SimilarityIndex(path, dim=128)  # e.g. a second worker
+    index.close()
+
+    reopened = SimilarityIndex(path, dim=128)
+    assert len(reopened) == 4
+    assert [(p.paper_id, s) for p, s in reopened.similar("p3", 3)] == before
+    reopened.close()
+    with pytest.raises(ValueError):
+        SimilarityIndex(path, dim=64)
+
+
+def test_chunked_search_matches_brute_force(tmp_path, monkeypatch):
+    monkeypatch.setattr(similarity, "_CHUNK_ROWS", 7)
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(300)]
+    index = SimilarityIndex(tmp_path / "index", dim=64)
+    index.add(
+        _paper(f"r{i}", " ".join(rng.choice(words, 5)), " ".join(rng.choice(words, 30)))
+        for i in range(50)
+    )
+    queries = np.asarray(index._matrix[:3])
+    rows, scores = index.search(queries, 5)
+
+    expected = queries @ np.asarray(index._matrix[:50]).T
+    for q in range(3):
+        np.testing.assert_allclose(scores[q], np.sort(expected[q])[::-1][:5], rtol=1e-5)
+        assert rows[q][0] == q
+
+
+# ── Router ─────────────────────────────────────────────────────
+
+
+async def test_similar_endpoint(client, index):
+    similarity.set_index(index)
+    resp = await client.get("/api/papers/p1/similar", params={"limit": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["paper_id"] == "p1"
+    assert data["results"][0]["paper"]["paper_id"] == "p2"
+    assert len(data["results"]) <= 2
+
+
+async def test_unindexed_paper_is_fetched_and_added(client, index):
+    similarity.set_index(index)
+    paper = _paper("arxiv:9", "Graph networks for molecular graphs")
+    with patch(
+        "app.routers.papers.fetch_papers_by_ids",
+        new_callable=AsyncMock,
+        return_value={"arxiv:9": paper},
+    ):
+        resp = await client.get("/api/papers/arxiv:9/similar")
+    assert resp.status_code == 200
+    assert "arxiv:9" in index
+    assert resp.json()["results"][0]["paper"]["paper_id"] in {"p1", "p2"}
+
+
+async def test_disabled_index_returns_503(client):
+    fetch = AsyncMock(return_value={})
+    with patch("app.routers.papers.fetch_papers_by_ids", fetch):
+        resp = await client.get("/api/papers/p1/similar")
+    assert resp.status_code == 503
+    assert "not available" in resp.json()["detail"]
+    fetch.assert_not_awaited()
+
+
+async def test_unknown_paper_returns_404(client, index):
+    similarity.set_index(index)
+    with patch(
+        "app.routers.papers.fetch_papers_by_ids", new_callable=AsyncMock, return_value={}
+    ):
+        resp = await client.get("/api/papers/nope/similar")
+    assert resp.status_code == 404
+
+
+async def test_observe_indexes_in_background(index):
+    similarity.set_index(index)
+    similarity.observe([_paper("p9", "Caravan trade")])
+    await asyncio.gather(*similarity._pending)
+    assert "p9" in index
@@ -0,0 +1,44 @@
+"""Tests for lazy loading of heavy SDKs at start-up."""
+
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+from app.services import gemini_service
+from benchmarks.startup_report import measure
+
+_BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def test_importing_app_does_not_load_gemini_sdk_or_numpy():
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-W",
+            "ignore",
+            "-c",
+            "import sys, main; print('google.generativeai' in sys.modules, 'numpy' in sys.modules)",
+        ],
+        cwd=_BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert proc.stdout.strip() == "False False"
+
+
+def test_startup_report_parses_importtime():
+    rows = measure("app.config")
+    names = {name for name, *_ in rows}
+    assert "app.config" in names
+    assert all(cumulative >= self_us for _, self_us, cumulative, _ in rows)
+
+
+async def test_warm_up_loads_sdk_once():
+    with patch.object(gemini_service, "_genai_module", None):
+        await gemini_service.warm_up()
+        first = gemini_service._genai_module
+        assert first is not None
+        await gemini_service.warm_up()
+        assert gemini_service._genai_module is first
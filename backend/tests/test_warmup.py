@@ -0,0 +1,120 @@
+"""Tests for popularity tracking and cache warming."""
+
+from __future__ import annotations
+
+import json
+from collections import Counter
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.config import Settings
+from app.models.paper import Paper
+from app.services import warmup
+
+
+@pytest.fixture(autouse=True)
+def _fresh_counts():
+    warmup._counts.clear()
+    yield
+    warmup._counts.clear()
+
+
+def _search_key(query: str) -> str:
+    return warmup._entry("search", {
+        "query": query, "page": 1, "per_page": 10,
+        "source": None, "year_from": None, "year_to": None,
+    })
+
+
+def test_merge_decays_and_keeps_top(tmp_path):
+    path = tmp_path / "data" / "warmup.json"
+    warmup.merge_counts(path, Counter({_search_key("old"): 10}), keep=10, now=100.0)
+    scores = warmup.merge_counts(
+        path, Counter({_search_key("new"): 8, _search_key("rare"): 1}), keep=2, now=200.0
+    )
+    assert scores == {_search_key("new"): [8, 200.0], _search_key("old"): [7.0, 100.0]}
+    assert json.loads(path.read_text()) == scores
+    assert path.stat().st_mode & 0o777 == 0o600
+
+    top = warmup.top_entries(scores, limit=1)
+    assert [e["query"] for e in top["search"]] == ["new"]
+    assert top["summary"] == []
+
+
+def test_idle_entries_decay_out_and_are_not_refreshed(tmp_path):
+    path = tmp_path / "warmup.json"
+    warmup.merge_counts(path, Counter({_search_key("fad"): 1, _search_key("hot"): 3}), 10, 100.0)
+    scores = warmup.merge_counts(path, Counter({_search_key("hot"): 1}), keep=10, now=200.0)
+    assert scores[_search_key("fad")] == [0.7, 100.0]
+
+    top = warmup.top_entries(scores, limit=2, hit_after=100.0)
+    assert [e["query"] for e in top["search"]] == ["hot"]  # "fad" not asked for since
+
+    scores = warmup.merge_counts(path, Counter(), keep=10, now=300.0)
+    assert _search_key("fad") not in scores  # 0.49 is below _MIN_SCORE
+
+
+def test_unreadable_state_is_replaced(tmp_path):
+    path = tmp_path / "warmup.json"
+    path.write_text("{not json")
+    assert warmup.merge_counts(path, Counter({"k": 1}), keep=5, now=1.0) == {"k": [1, 1.0]}
+
+
+@pytest.fixture()
+def sources():
+    arxiv = AsyncMock(return_value=[Paper(paper_id="arxiv:1", title="A")])
+    with (
+        patch("app.services.paper_aggregator._search_arxiv", arxiv),
+        patch("app.services.paper_aggregator._search_openalex", AsyncMock(return_value=[])),
+        patch("app.services.paper_aggregator._search_semantic_scholar", AsyncMock(return_value=[])),
+        patch(
+            "app.services.warmup.get_settings",
+            return_value=Settings(warmup_top_n=5, warmup_rate=0, gemini_api_key=""),
+        ),
+    ):
+        yield arxiv
+
+
+async def test_startup_warm_skips_cached_and_refresh_recomputes(sources):
+    entries = {"search": [json.loads(_search_key("popular"))[1]], "summary": []}
+
+    assert await warmup.warm(entries, refresh_searches=False) == 0
+    assert await warmup.warm(entries, refresh_searches=False) == 0
+    assert sources.await_count == 1  # second pass was a cache hit
+
+    await warmup.warm(entries, refresh_searches=True)
+    assert sources.await_count == 2
+
+
+async def test_summaries_need_a_gemini_key(sources):
+    entries = {"search": [], "summary": [{"title": "T", "abstract": "A", "language": "en"}]}
+    with patch("app.services.warmup.summarize_paper", new_callable=AsyncMock) as summarize:
+        await warmup.warm(entries, refresh_searches=False)
+    summarize.assert_not_called()
+
+
+async def test_search_endpoint_records_queries(client, sources):
+    await client.get("/api/papers/search", params={"query": "popular"})
+    await client.get("/api/papers/search", params={"query": "popular"})
+    assert warmup._counts[_search_key("popular")] == 2
+
+
+def test_nothing_is_recorded_with_warmup_off():
+    with patch("app.services.warmup.get_settings", return_value=Settings(warmup_top_n=0)):
+        warmup.record_search("q", 1, 10, None, None, None)
+        warmup.record_summary("T", "A long abstract", "en")
+    assert not warmup._counts
+
+
+def test_pending_counts_are_capped():
+    with (
+        patch("app.services.warmup.get_settings", return_value=Settings(warmup_top_n=5)),
+        patch("app.services.warmup._MAX_PENDING", 10),
+    ):
+        for _ in range(3):
+            warmup.record_search("popular", 1, 10, None, None, None)
+        for i in range(20):
+            warmup.record_search(f"once {i}", 1, 10, None, None, None)
+    assert len(warmup._counts) <= 10
+    assert warmup._counts[_search_key("popular")] == 3
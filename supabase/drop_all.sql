@@ -6,13 +6,22 @@
 
 -- 1. Drop triggers first (they depend on functions and tables)
 DROP TRIGGER IF EXISTS profiles_updated_at   ON public.profiles;
+DROP TRIGGER IF EXISTS favorites_updated_at  ON public.favorites;
+DROP TRIGGER IF EXISTS favorites_tombstone   ON public.favorites;
+DROP TRIGGER IF EXISTS favorites_search_vector ON public.favorites;
 DROP TRIGGER IF EXISTS on_auth_user_created  ON auth.users;
 
 -- 2. Drop tables with CASCADE (auto-removes RLS policies, indexes, FKs)
+DROP TABLE IF EXISTS public.saved_search_hits CASCADE;
+DROP TABLE IF EXISTS public.saved_searches    CASCADE;
+DROP TABLE IF EXISTS public.favorite_tombstones CASCADE;
 DROP TABLE IF EXISTS public.favorites   CASCADE;
 DROP TABLE IF EXISTS public.collections CASCADE;
 DROP TABLE IF EXISTS public.profiles    CASCADE;
 
 -- 3. Drop functions
+DROP FUNCTION IF EXISTS public.search_favorites(TEXT, UUID, INT, INT);
+DROP FUNCTION IF EXISTS public.update_favorite_search_vector();
+DROP FUNCTION IF EXISTS public.record_favorite_tombstone();
 DROP FUNCTION IF EXISTS public.update_updated_at();
 DROP FUNCTION IF EXISTS public.handle_new_user();
@@ -39,11 +39,61 @@ CREATE TABLE public.favorites (
   pdf_url        TEXT NOT NULL DEFAULT '',
   collection_id  UUID REFERENCES public.collections(id) ON DELETE SET NULL,
   created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  search_vector  TSVECTOR,                 -- maintained by favorites_search_vector trigger
   UNIQUE(user_id, paper_id)
 );
 
--- Index for fast lookup of a user's favorites
-CREATE INDEX idx_favorites_user_id ON public.favorites(user_id);
+-- Keyset index for incremental sync: a user's favorites in change order.
+-- Also serves plain "all favorites of a user" lookups.
+CREATE INDEX idx_favorites_user_sync ON public.favorites(user_id, updated_at, id);
+
+-- Full-text search over title, authors and abstract
+CREATE INDEX idx_favorites_search ON public.favorites USING GIN (search_vector);
+
+-- Favorite tombstones (deleted favorites, so clients can sync removals)
+CREATE TABLE public.favorite_tombstones (
+  id          UUID PRIMARY KEY,             -- id of the deleted favorite
+  user_id     UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+  paper_id    TEXT NOT NULL,
+  deleted_at  TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_favorite_tombstones_user_sync
+  ON public.favorite_tombstones(user_id, deleted_at, id);
+
+-- 4. Saved searches (alerts for newly published papers)
+CREATE TABLE public.saved_searches (
+  id              UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id         UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+  query           TEXT NOT NULL CHECK (length(query) BETWEEN 1 AND 300),
+  source          TEXT CHECK (source IN ('arxiv', 'openalex', 'semantic_scholar')),
+  year_from       INT,
+  year_to         INT,
+  high_water_mark TIMESTAMPTZ NOT NULL DEFAULT now(), -- papers newer than this are "new"
+  last_polled_at  TIMESTAMPTZ,
+  created_at      TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX idx_saved_searches_user_id ON public.saved_searches(user_id);
+-- The poller picks up the least recently polled searches first
+CREATE INDEX idx_saved_searches_last_polled_at
+  ON public.saved_searches(last_polled_at NULLS FIRST);
+
+-- 5. Saved-search hits (new papers waiting to be delivered)
+CREATE TABLE public.saved_search_hits (
+  saved_search_id UUID NOT NULL REFERENCES public.saved_searches(id) ON DELETE CASCADE,
+  user_id         UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+  paper_id        TEXT NOT NULL,
+  paper           JSONB NOT NULL,            -- Paper snapshot, so delivery needs no refetch
+  found_at        TIMESTAMPTZ NOT NULL DEFAULT now(),
+  delivered_at    TIMESTAMPTZ,
+  PRIMARY KEY (saved_search_id, paper_id)
+);
+
+CREATE INDEX idx_saved_search_hits_undelivered
+  ON public.saved_search_hits(user_id, found_at DESC)
+  WHERE delivered_at IS NULL;
 
 -- ============================================================
 -- Row-Level Security
@@ -52,6 +102,9 @@ CREATE INDEX idx_favorites_user_id ON public.favorites(user_id);
 ALTER TABLE public.profiles    ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.collections ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.favorites   ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.favorite_tombstones ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.saved_searches    ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.saved_search_hits ENABLE ROW LEVEL SECURITY;
 
 -- Profiles: users can only access their own row
 CREATE POLICY "profiles_select_own"
@@ -83,6 +136,11 @@ CREATE POLICY "favorites_delete_own"
   ON public.favorites FOR DELETE
   USING (auth.uid() = user_id);
 
+-- Favorite tombstones: read-only for users, written by trigger
+CREATE POLICY "favorite_tombstones_select_own"
+  ON public.favorite_tombstones FOR SELECT
+  USING (auth.uid() = user_id);
+
 -- Collections: users can only access their own rows
 CREATE POLICY "collections_select_own"
   ON public.collections FOR SELECT
@@ -100,6 +158,33 @@ CREATE POLICY "collections_delete_own"
   ON public.collections FOR DELETE
   USING (auth.uid() = user_id);
 
+-- Saved searches: users manage their own rows
+CREATE POLICY "saved_searches_select_own"
+  ON public.saved_searches FOR SELECT
+  USING (auth.uid() = user_id);
+
+CREATE POLICY "saved_searches_insert_own"
+  ON public.saved_searches FOR INSERT
+  WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "saved_searches_update_own"
+  ON public.saved_searches FOR UPDATE
+  USING (auth.uid() = user_id);
+
+CREATE POLICY "saved_searches_delete_own"
+  ON public.saved_searches FOR DELETE
+  USING (auth.uid() = user_id);
+
+-- Saved-search hits: written by the backend poller (service role),
+-- users can read them and mark them delivered
+CREATE POLICY "saved_search_hits_select_own"
+  ON public.saved_search_hits FOR SELECT
+  USING (auth.uid() = user_id);
+
+CREATE POLICY "saved_search_hits_update_own"
+  ON public.saved_search_hits FOR UPDATE
+  USING (auth.uid() = user_id);
+
 -- ============================================================
 -- Trigger: auto-create profile on sign-up
 -- ============================================================
@@ -129,7 +214,7 @@ CREATE TRIGGER on_auth_user_created
   EXECUTE FUNCTION public.handle_new_user();
 
 -- ============================================================
--- Trigger: auto-update updated_at on profiles
+-- Trigger: auto-update updated_at on profiles and favorites
 -- ============================================================
 
 CREATE OR REPLACE FUNCTION public.update_updated_at()
@@ -146,3 +231,111 @@ CREATE TRIGGER profiles_updated_at
   BEFORE UPDATE ON public.profiles
   FOR EACH ROW
   EXECUTE FUNCTION public.update_updated_at();
+
+CREATE TRIGGER favorites_updated_at
+  BEFORE UPDATE ON public.favorites
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_updated_at();
+
+-- ============================================================
+-- Trigger: record a tombstone when a favorite is deleted
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.record_favorite_tombstone()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = ''
+AS $$
+BEGIN
+  -- Skip when the whole account is being removed (cascade from profiles)
+  IF EXISTS (SELECT 1 FROM public.profiles WHERE id = OLD.user_id) THEN
+    INSERT INTO public.favorite_tombstones (id, user_id, paper_id)
+    VALUES (OLD.id, OLD.user_id, OLD.paper_id)
+    ON CONFLICT (id) DO UPDATE SET deleted_at = now();
+  END IF;
+  RETURN OLD;
+END;
+$$;
+
+CREATE TRIGGER favorites_tombstone
+  AFTER DELETE ON public.favorites
+  FOR EACH ROW
+  EXECUTE FUNCTION public.record_favorite_tombstone();
+
+-- ============================================================
+-- Trigger: keep favorites.search_vector current
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION public.update_favorite_search_vector()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  NEW.search_vector :=
+    setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+    setweight(to_tsvector('simple', array_to_string(NEW.authors, ' ')), 'B') ||
+    setweight(to_tsvector('english', coalesce(NEW.abstract, '')), 'C');
+  RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER favorites_search_vector
+  BEFORE INSERT OR UPDATE OF title, authors, abstract ON public.favorites
+  FOR EACH ROW
+  EXECUTE FUNCTION public.update_favorite_search_vector();
+
+-- ============================================================
+-- RPC: ranked full-text search over the caller's favorites
+-- ============================================================
+-- SECURITY INVOKER: runs under the caller's RLS policies.
+
+CREATE OR REPLACE FUNCTION public.search_favorites(
+  q              TEXT,
+  collection     UUID DEFAULT NULL,
+  result_limit   INT  DEFAULT 20,
+  result_offset  INT  DEFAULT 0
+)
+RETURNS TABLE (
+  id             UUID,
+  paper_id       TEXT,
+  title          TEXT,
+  authors        TEXT[],
+  abstract       TEXT,
+  published_date DATE,
+  source         TEXT,
+  url            TEXT,
+  pdf_url        TEXT,
+  collection_id  UUID,
+  created_at     TIMESTAMPTZ,
+  updated_at     TIMESTAMPTZ,
+  rank           REAL
+)
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+SET search_path = ''
+AS $$
+  SELECT f.id, f.paper_id, f.title, f.authors, f.abstract, f.published_date,
+         f.source, f.url, f.pdf_url, f.collection_id, f.created_at, f.updated_at,
+         ts_rank_cd(f.search_vector, parsed.query) AS rank
+  FROM public.favorites f,
+       -- Titles and abstracts are stemmed ('english'), authors are not
+       -- ('simple'): match either form so surnames are found as typed.
+       -- OR-ing the parses would let one side's "!term" be satisfied by the
+       -- other side's positive terms ('vaswani -transformers' would still
+       -- match a Transformers paper), so a query with an exclusion must
+       -- satisfy both parses instead.
+       (SELECT CASE WHEN q ~ '(^|\s)-\S'
+                    THEN en && simple
+                    ELSE en || simple
+               END AS query
+          FROM websearch_to_tsquery('english', q) AS en,
+               websearch_to_tsquery('simple', q) AS simple) AS parsed
+  WHERE f.user_id = auth.uid()
+    AND f.search_vector @@ parsed.query
+    AND (collection IS NULL OR f.collection_id = collection)
+  ORDER BY rank DESC, f.id
+  LIMIT result_limit
+  OFFSET result_offset;
+$$;